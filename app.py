@@ -18,6 +18,27 @@ st.set_page_config(
 with open(os.path.join(ROOT_PATH, "static", "css", "styles.css")) as css:
     st.markdown(f'<style>{css.read()}</style>', unsafe_allow_html=True)
 
+@st.cache_resource
+def start_background_jobs():
+    """Starts the periodic maintenance jobs once per server process."""
+    from core.config import QUEUE_EXPIRY_INTERVAL, ROLLUP_INTERVAL, SHARED_CACHE_DIR
+    from core.jobs import PeriodicJob
+    from services.queue_service import QueueService
+    from services.rollup_service import RollupService
+    from services.shared_reference_service import SharedReferenceService
+
+    jobs = []
+    if QUEUE_EXPIRY_INTERVAL > 0:
+        jobs.append(PeriodicJob("expire-stale-queues", QueueService().expire_stale_queues, QUEUE_EXPIRY_INTERVAL).start())
+    if ROLLUP_INTERVAL > 0:
+        jobs.append(PeriodicJob("refresh-rollups", RollupService().refresh, ROLLUP_INTERVAL).start())
+    if SHARED_CACHE_DIR:
+        # Every process tries; only the holder of the writer lease rebuilds the shared entries
+        jobs.append(PeriodicJob("refresh-shared-cache", SharedReferenceService().refresh, SharedReferenceService.CHECK_SECONDS).start())
+    return jobs
+
+start_background_jobs()
+
 # Initialize session state for admin authentication
 if "admin" not in st.session_state:
     st.session_state["admin"] = None
@@ -27,13 +48,20 @@ user = st.Page("views/user_content.py", title="Welcome", default=True)
 admin_auth = st.Page("views/admin_auth.py", title="Admin")
 client = st.Page("views/client_content.py", title="Client")
 employee = st.Page("views/employee_content.py", title="Employee")
+queue_board = st.Page("views/queue_board.py", title="Queue Board")
 
 # Admin pages
 admin_dashboard = st.Page("views/admin_dashboard.py", title="Admin Dashboard")
 admin_manage_users = st.Page("views/admin_manage.py", title="Employees Management")
+admin_search = st.Page("views/admin_search.py", title="Feedback Search")
+
+admin_pages = [admin_dashboard, admin_manage_users]
+# Citizen comments are searchable only once an admin has signed in
+if st.session_state.get("admin"):
+    admin_pages.append(admin_search)
 
 
-pg = st.navigation([user, admin_auth, client, employee, admin_dashboard, admin_manage_users], position="hidden")
+pg = st.navigation([user, admin_auth, client, employee, queue_board, *admin_pages], position="hidden")
 
 # Run the selected page
 pg.run()
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Cold-start profile of the Streamlit pages, run from the project root:
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --check
+    python -m benchmarks.import_profile --update-budgets
+
+A page's module-level imports run every time a fresh server process renders it
+first, e.g. after a restart or when autoscaling adds an instance. For each page in
+views/, the imports are run in a new interpreter several times and timed. The
+report gives the median time, the heavy libraries the page pulled in and the
+slowest top-level imports (from `python -X importtime`).
+
+--check compares the medians with benchmarks/import_budgets.json and exits
+non-zero when a page goes over its budget. --update-budgets stores the current
+medians with headroom as the new budgets.
+"""
+import argparse
+import ast
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIEWS_PATH = os.path.join(ROOT_PATH, "views")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budgets.json")
+# Libraries that should only load on the pages that use them
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "matplotlib", "wordcloud", "supabase", "postgrest", "httpx", "pyarrow"]
+# Budgets are stored as the measured time times this, rounded up to 50 ms
+BUDGET_HEADROOM = 1.5
+
+# Runs in the child interpreter: times the page's imports, then lists what got loaded
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec(compile(sys.argv[1], "<page imports>", "exec"), {})
+elapsed = (time.perf_counter() - started) * 1000
+heavy = sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules)
+print(json.dumps({"ms": elapsed, "heavy": heavy}))
+"""
+
+
+def page_imports(path: str) -> str:
+    """The module-level import statements of a page, as source code."""
+    with open(path) as page_file:
+        tree = ast.parse(page_file.read(), path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def slowest_imports(stderr: str, limit: int = 3) -> List[str]:
+    """The top-level modules with the largest cumulative time in `-X importtime` output."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented under the module that triggered them
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        timings.append((int(cumulative) / 1000, name.strip()))
+    return [f"{name} {ms:.0f} ms" for ms, name in sorted(timings, reverse=True)[:limit]]
+
+
+def profile_page(path: str, repeat: int) -> Dict[str, Any]:
+    source = page_imports(path)
+    command = [sys.executable, "-c", _PROBE, source, json.dumps(HEAVY_MODULES)]
+    timings, heavy = [], []
+    for _ in range(repeat):
+        result = subprocess.run(command, cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(probe["ms"])
+        heavy = probe["heavy"]
+    # One more run under -X importtime to attribute the cost
+    traced = subprocess.run([sys.executable, "-X", "importtime"] + command[1:], cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+    return {"median_ms": round(statistics.median(timings), 1), "heavy": heavy, "slowest": slowest_imports(traced.stderr)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of every page")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per page")
+    parser.add_argument("--only", help="Only profile pages whose file name contains this text")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a page exceeds its budget")
+    parser.add_argument("--update-budgets", action="store_true", help="Store the measured times with headroom as budgets")
+    args = parser.parse_args(argv)
+
+    budgets = {}
+    if os.path.exists(BUDGET_PATH):
+        with open(BUDGET_PATH) as budget_file:
+            budgets = json.load(budget_file)
+
+    results = {}
+    print(f"{'page':<24} {'median ms':>10} {'budget ms':>10}  heavy libraries / slowest imports")
+    for file_name in sorted(os.listdir(VIEWS_PATH)):
+        if not file_name.endswith(".py") or (args.only and args.only not in file_name):
+            continue
+        page = f"views/{file_name}"
+        results[page] = profile_page(os.path.join(VIEWS_PATH, file_name), args.repeat)
+        budget = budgets.get(page)
+        print(f"{page:<24} {results[page]['median_ms']:>10.1f} {budget if budget is not None else '-':>10}  "
+              f"{', '.join(results[page]['heavy']) or 'none'}")
+        print(f"{'':<47}{'; '.join(results[page]['slowest'])}")
+
+    if args.update_budgets:
+        for page, result in results.items():
+            budgets[page] = int(math.ceil(result["median_ms"] * BUDGET_HEADROOM / 50) * 50)
+        with open(BUDGET_PATH, "w") as budget_file:
+            json.dump(budgets, budget_file, indent=2, sort_keys=True)
+        print("Budgets updated.")
+        return 0
+
+    if not args.check:
+        return 0
+    over = [f"{page}: {result['median_ms']:.0f} ms, budget {budgets[page]} ms" for page, result in results.items() if page in budgets and result["median_ms"] > budgets[page]]
+    missing = [page for page in results if page not in budgets]
+    for page in missing:
+        print(f"NO BUDGET {page}, run with --update-budgets to record one")
+    for failure in over:
+        print(f"OVER BUDGET {failure}")
+    return 1 if over or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Load test of the kiosk registration path, run from the project root:
+
+    python -m benchmarks.load_registration --workers 16 --registrations 2000 --latency-ms 30
+
+Each worker repeats what views/client_content.py does for one visitor:
+register the client together with a queue number, then submit a rating. The steps
+run against an SQLiteBackend with simulated per-request latency. The report
+gives throughput, p50/p95/p99 latency and the error rate per step. It then
+checks the data invariants: unique queue ids and exactly one active queue
+per registered client. The exit code is non-zero when an invariant fails.
+"""
+import argparse
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from core.backends import SQLiteBackend
+from core.db import set_backend
+from models.models import Client
+from utils.data.synthetic import generate_dataset
+
+
+class StepRecorder:
+    """Thread-safe latency and error collection per step."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.exceptions: Dict[str, int] = defaultdict(int)
+
+    def record(self, step: str, seconds: float, ok: bool, exception: Exception = None):
+        with self._lock:
+            self.latencies[step].append(seconds)
+            if not ok:
+                self.errors[step] += 1
+            if exception is not None:
+                self.exceptions[f"{step}: {type(exception).__name__}: {exception}"] += 1
+
+
+def timed(recorder: StepRecorder, step: str, function, *args):
+    started = time.perf_counter()
+    try:
+        result = function(*args)
+    except Exception as e:
+        recorder.record(step, time.perf_counter() - started, ok=False, exception=e)
+        return None
+    recorder.record(step, time.perf_counter() - started, ok=result is not None)
+    return result
+
+
+def register_visitor(services, recorder: StepRecorder, emp_ids: List[uuid.UUID], rng: np.random.Generator, client_ids: List[uuid.UUID]):
+    """One kiosk visit, following views/client_content.py step by step."""
+    client = Client(client_id=uuid.uuid4(), first_name="Load", last_name="Test")
+    created_client, queue = timed(recorder, "register_client_with_queue", services["client"].register_client_with_queue, client) or (None, None)
+    if not created_client:
+        return
+    client_ids.append(created_client.client_id)
+    if not queue:
+        return
+
+    criteria = {key: int(rng.integers(1, 6)) for key in ("first", "second", "third", "fourth")}
+    emp_id = emp_ids[int(rng.integers(len(emp_ids)))]
+    timed(recorder, "create_rating", services["rating"].create_rating, queue.queue_id, emp_id, criteria, "load test")
+
+
+def check_invariants(backend: SQLiteBackend, client_ids: List[uuid.UUID]) -> List[str]:
+    failures = []
+    duplicates = backend.query("queues", "select queue_id, count(*) as n from queues group by queue_id having n > 1")
+    if duplicates:
+        failures.append(f"{len(duplicates)} queue ids are used more than once")
+
+    active = {
+        row["client_id"]: row["n"]
+        for row in backend.query("queues", "select client_id, count(*) as n from queues where ended_at is null group by client_id")
+    }
+    wrong = [str(client_id) for client_id in client_ids if active.get(str(client_id), 0) != 1]
+    if wrong:
+        counts = sorted({active.get(client_id, 0) for client_id in wrong})
+        failures.append(f"{len(wrong)} of {len(client_ids)} clients do not have exactly one active queue (found {counts})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent kiosk registration load test")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent kiosks (threads)")
+    parser.add_argument("--registrations", type=int, default=1000, help="Total visitors to register")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated backend latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Extra random latency per request")
+    parser.add_argument("--seed-rows", type=int, default=1000, help="Existing registrations to generate first")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    backend = SQLiteBackend()
+    set_backend(backend)
+    generate_dataset(backend, rows=args.seed_rows, seed=args.seed)
+    backend.latency, backend.jitter = args.latency_ms / 1000, args.jitter_ms / 1000
+
+    from services.client_service import ClientService
+    from services.rating_service import RatingService
+
+    # Shared like the module-level services of the Streamlit page
+    services = {"client": ClientService(), "rating": RatingService()}
+    emp_ids = [uuid.UUID(row["emp_id"]) for row in backend.query("employees", "select emp_id from employees")]
+
+    recorder = StepRecorder()
+    client_ids: List[uuid.UUID] = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for idx in range(args.registrations):
+            pool.submit(register_visitor, services, recorder, emp_ids, np.random.default_rng(args.seed + idx), client_ids)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.registrations} registrations, {args.workers} workers, {args.latency_ms:g}+{args.jitter_ms:g} ms latency: "
+          f"{elapsed:.1f} s, {args.registrations / elapsed:.1f} registrations/s")
+    print(f"{'step':<28} {'calls':>7} {'per s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for step in ("register_client_with_queue", "create_rating"):
+        samples = np.array(recorder.latencies.get(step, [])) * 1000
+        if not len(samples):
+            continue
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        error_rate = recorder.errors[step] / len(samples)
+        print(f"{step:<28} {len(samples):>7} {len(samples) / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {error_rate:>7.1%}")
+    print(f"backend requests: {backend.call_count}")
+    for message, count in sorted(recorder.exceptions.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count}x {message}")
+
+    failures = check_invariants(backend, client_ids)
+    for failure in failures:
+        print(f"INVARIANT FAILED {failure}")
+    if not failures:
+        print("Invariants hold: unique queue ids, one active queue per client.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Service-layer benchmarks against a synthetic dataset in an embedded SQLite
+backend, run from the project root:
+
+    python -m benchmarks.run_benchmarks --rows 10000 --latency-ms 20
+    python -m benchmarks.run_benchmarks --rows 100000 --update-baseline
+
+Each case is timed over several runs and its request count is recorded.
+Results are compared with benchmarks/baselines.json for the same rows and
+latency; the run exits non-zero when a case got slower than the tolerance
+allows or started issuing more backend requests.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.backends import SQLiteBackend
+from core.db import set_backend
+from utils.data.synthetic import DEFAULT_END, generate_dataset
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Differences below this are timer noise, whatever the relative change
+NOISE_FLOOR_MS = 2.0
+
+
+def setup(rows: int, seed: int) -> Tuple[SQLiteBackend, Dict[str, Any]]:
+    """Generates the dataset, builds the rating summaries and returns the services under test."""
+    backend = SQLiteBackend()
+    set_backend(backend)
+    generate_dataset(backend, rows=rows, seed=seed)
+
+    from services.employee_service import AsyncEmployeeService, EmployeeService
+    from services.leaderboard_service import LeaderboardService
+    from services.queue_service import QueueService
+    from services.rating_service import AsyncRatingService, RatingService
+    from services.rollup_service import AsyncRollupService, RollupService
+
+    context = {
+        "employee_service": EmployeeService(),
+        "queue_service": QueueService(),
+        "rating_service": RatingService(),
+        "rollup_service": RollupService(),
+        "leaderboard_service": LeaderboardService(),
+        "async_employee_service": AsyncEmployeeService(),
+        "async_rating_service": AsyncRatingService(),
+        "async_rollup_service": AsyncRollupService(),
+    }
+    context["rating_service"].summary_service.reconcile()
+    context["rollup_service"].refresh(DEFAULT_END + timedelta(days=1))
+    employees = context["employee_service"].get_all_employees()
+    context["emp_ids"] = [emp.emp_id for emp in employees]
+    context["sample_emp_id"] = employees[0].emp_id
+    context["sample_office"] = employees[0].office
+    return backend, context
+
+
+def benchmark_cases() -> List[Tuple[str, Callable[[Dict[str, Any]], Any]]]:
+    from core import aio
+    from utils.data.prepare import prepare_employee_data, prepare_employee_data_async, prepare_office_page_table
+
+    rating_start = DEFAULT_END.date() - timedelta(days=29)
+
+    # The Offices tab: one page of the office's employees, read and tabulated
+    def office_page_table(ctx):
+        return prepare_office_page_table(ctx["employee_service"].get_office_drilldown(ctx["sample_office"], page_size=25))
+
+    # The admin dashboard's reads, one after another and fanned out
+    def dashboard_data(ctx):
+        return (
+            ctx["employee_service"].get_all_employees(),
+            ctx["rollup_service"].get_daily_activity(),
+            ctx["rollup_service"].get_employee_aggregates(rating_start, DEFAULT_END.date()),
+        )
+
+    def dashboard_data_async(ctx):
+        return aio.run(aio.gather(
+            ctx["async_employee_service"].get_all_employees(),
+            ctx["async_rollup_service"].get_daily_activity(),
+            ctx["async_rollup_service"].get_employee_aggregates(rating_start, DEFAULT_END.date()),
+        ))
+
+    return [
+        ("rating.calculate_all_employee_average_ratings", lambda ctx: ctx["rating_service"].calculate_all_employee_average_ratings()),
+        ("rating.calculate_employee_average_rating", lambda ctx: ctx["rating_service"].calculate_employee_average_rating(ctx["sample_emp_id"])),
+        ("rating.get_top_employees", lambda ctx: ctx["rating_service"].get_top_employees(ctx["emp_ids"])),
+        ("rating.get_employee_ratings", lambda ctx: ctx["rating_service"].get_employee_ratings(ctx["sample_emp_id"])),
+        ("rating.get_employee_comments", lambda ctx: ctx["rating_service"].get_employee_comments(ctx["sample_emp_id"])),
+        ("rating.get_all_ratings", lambda ctx: ctx["rating_service"].get_all_ratings()),
+        ("rating.get_rating_matrix", lambda ctx: ctx["rating_service"].get_rating_matrix()),
+        ("rating.get_rating_trend", lambda ctx: ctx["rating_service"].get_rating_trend("week")),
+        ("queue.get_active_queues", lambda ctx: ctx["queue_service"].get_active_queues()),
+        ("queue.get_all_queues", lambda ctx: ctx["queue_service"].get_all_queues()),
+        ("queue.get_queue_stats", lambda ctx: ctx["queue_service"].get_queue_stats()),
+        ("rollup.get_daily_activity", lambda ctx: ctx["rollup_service"].get_daily_activity()),
+        ("rollup.get_employee_aggregates", lambda ctx: ctx["rollup_service"].get_employee_aggregates(rating_start, DEFAULT_END.date())),
+        ("employee.get_all_employees", lambda ctx: ctx["employee_service"].get_all_employees()),
+        ("employee.get_all_offices", lambda ctx: ctx["employee_service"].get_all_offices()),
+        ("employee.get_employee_by_id", lambda ctx: ctx["employee_service"].get_employee_by_id(ctx["sample_emp_id"])),
+        ("employee.get_office_metrics", lambda ctx: ctx["employee_service"].get_office_metrics()),
+        ("view.prepare_employee_data", lambda ctx: prepare_employee_data(ctx["employee_service"], ctx["rating_service"])),
+        ("view.prepare_employee_data_leaderboard", lambda ctx: prepare_employee_data(ctx["employee_service"], ctx["rating_service"], ctx["leaderboard_service"])),
+        ("leaderboard.rank", lambda ctx: ctx["leaderboard_service"].rank(ctx["sample_emp_id"])),
+        ("leaderboard.top", lambda ctx: ctx["leaderboard_service"].top(3)),
+        ("view.prepare_employee_data_async", lambda ctx: aio.run(prepare_employee_data_async(ctx["async_employee_service"], ctx["async_rating_service"]))),
+        ("view.office_drilldown", lambda ctx: ctx["employee_service"].get_office_drilldown(ctx["sample_office"], page_size=10)),
+        ("view.office_page_table", office_page_table),
+        ("view.dashboard_data", dashboard_data),
+        ("view.dashboard_data_async", dashboard_data_async),
+    ]
+
+
+def run_case(backend: SQLiteBackend, context: Dict[str, Any], case: Callable, repeat: int) -> Dict[str, float]:
+    case(context)  # warm up imports and SQLite's page cache
+    timings, calls = [], 0
+    for _ in range(repeat):
+        calls_before = backend.call_count
+        started = time.perf_counter()
+        case(context)
+        timings.append((time.perf_counter() - started) * 1000)
+        calls = backend.call_count - calls_before
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3), "calls": calls}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        slower = result["median_ms"] - expected["median_ms"]
+        if slower > NOISE_FLOOR_MS and result["median_ms"] > expected["median_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: {result['median_ms']:.1f} ms vs baseline {expected['median_ms']:.1f} ms")
+        if result["calls"] > expected["calls"]:
+            regressions.append(f"{name}: {result['calls']} backend requests vs baseline {expected['calls']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the service layer against synthetic data")
+    parser.add_argument("--rows", type=int, default=10_000, help="Registrations to generate (1k to 1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated backend latency per request")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    print(f"Generating {args.rows} rows (seed {args.seed})...")
+    backend, context = setup(args.rows, args.seed)
+    backend.latency = args.latency_ms / 1000
+
+    results = {}
+    print(f"{'case':<50} {'median ms':>10} {'min ms':>10} {'requests':>9}")
+    for name, case in benchmark_cases():
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(backend, context, case, args.repeat)
+        print(f"{name:<50} {results[name]['median_ms']:>10.2f} {results[name]['min_ms']:>10.2f} {results[name]['calls']:>9}")
+
+    key = f"rows={args.rows},latency_ms={args.latency_ms:g}"
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baselines = json.load(baseline_file)
+
+    if args.update_baseline:
+        baselines.setdefault(key, {}).update(results)
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        print(f"Baseline {key} updated.")
+        return 0
+
+    if key not in baselines:
+        print(f"No baseline for {key}, run with --update-baseline to record one.")
+        return 0
+    regressions = compare(results, baselines[key], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Runs the async repositories and services from synchronous Streamlit code.
+
+Coroutines run on one event loop per process, on a daemon thread, rather
+than on a fresh loop per call: the async HTTP client keeps its pooled
+connections bound to the loop that opened them, so they are reused across
+page loads only while that loop lives.
+
+    employees, offices = aio.run(aio.gather(
+        employee_service.get_all_employees(),
+        employee_service.get_all_offices(),
+    ))
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Coroutine, List, Optional
+
+from core import config
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop, started on its thread on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                # Threaded backends run each request in a worker; the default pool is sized by CPU count
+                loop.set_default_executor(ThreadPoolExecutor(config.ASYNC_CONCURRENCY, thread_name_prefix="aio-worker"))
+                threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run(coroutine: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """Runs a coroutine on the process-wide loop and blocks the calling thread until it returns."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop()).result(timeout)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created on the loop's thread, the only place it is used
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(config.ASYNC_CONCURRENCY)
+    return _semaphore
+
+
+async def limited(awaitable: Awaitable[Any]) -> Any:
+    """
+    Awaits one backend request under the process-wide limit
+    (PALAYAN_ASYNC_CONCURRENCY). The async backends wrap each request's
+    execute in it; limiting requests rather than gathered tasks means a
+    task that fans out again can never wait on slots its parents hold.
+    """
+    async with _get_semaphore():
+        return await awaitable
+
+
+async def gather(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    Awaits independent reads concurrently and returns their results in
+    order. The first error is raised once the others have finished, so no
+    request is left running against a page that already failed.
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
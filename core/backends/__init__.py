@@ -0,0 +1,21 @@
+from core.backends.base import StorageBackend
+
+# The concrete backends pull in their client libraries (postgrest, httpx), so
+# they are imported on first access rather than with the package
+_BACKENDS = {
+    "SupabaseBackend": "core.backends.supabase_backend",
+    "SQLiteBackend": "core.backends.sqlite_backend",
+    "ReplicatedBackend": "core.backends.replica",
+    "InstrumentedBackend": "core.backends.instrumented",
+    "BackendUnavailableError": "core.backends.instrumented",
+    "AsyncStorageBackend": "core.backends.async_backend",
+    "ThreadedAsyncBackend": "core.backends.async_backend",
+    "AsyncSupabaseBackend": "core.backends.supabase_backend",
+}
+
+
+def __getattr__(name):
+    if name in _BACKENDS:
+        import importlib
+        return getattr(importlib.import_module(_BACKENDS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,71 @@
+import asyncio
+
+from core import aio
+from core.backends.base import StorageBackend
+
+
+class AsyncStorageBackend:
+    """
+    The async counterpart of StorageBackend used by the async repositories:
+    the same query builder, but `execute()` returns an awaitable. Every
+    request runs under the process-wide concurrency limit of core.aio.
+    """
+
+    supports_aggregates = False
+
+    def table(self, name: str):
+        raise NotImplementedError
+
+    def rpc(self, name: str, params: dict = None):
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class ThreadedAsyncBackend(AsyncStorageBackend):
+    """
+    Runs the requests of a synchronous backend in worker threads, so the
+    SQLite backend, the local replica and the instrumentation wrapper all
+    serve the async repositories unchanged.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @property
+    def supports_aggregates(self) -> bool:
+        return self.backend.supports_aggregates
+
+    def table(self, name: str):
+        return AsyncRequest(self.backend.table(name), in_thread=True)
+
+    def rpc(self, name: str, params: dict = None):
+        return AsyncRequest(self.backend.rpc(name, params), in_thread=True)
+
+
+class AsyncRequest:
+    """
+    Follows a builder chain of the wrapped backend; `execute` waits for a
+    slot under the concurrency limit, then awaits the request, or runs it in
+    a worker thread if the builder is synchronous.
+    """
+
+    def __init__(self, builder, in_thread: bool = False):
+        self._builder = builder
+        self._in_thread = in_thread
+
+    def __getattr__(self, attribute):
+        method = getattr(self._builder, attribute)
+        if not callable(method):
+            return method
+
+        def chained(*args, **kwargs):
+            self._builder = method(*args, **kwargs)
+            return self
+        return chained
+
+    async def execute(self):
+        if self._in_thread:
+            return await aio.limited(asyncio.to_thread(self._builder.execute))
+        return await aio.limited(self._builder.execute())
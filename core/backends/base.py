@@ -0,0 +1,26 @@
+class StorageBackend:
+    """
+    The storage interface the repositories depend on.
+
+    It mirrors the PostgREST query builder used by supabase-py, so repository
+    code reads the same against any backend:
+
+        backend.table("ratings").select("*").eq("emp_id", emp_id).order("rating_id").limit(100).execute()
+
+    `table()` returns a builder supporting select/insert/upsert/update/delete,
+    the eq/neq/gt/gte/lt/lte/is_/in_ filters, order, limit and range, and whose
+    `execute()` returns a response with `.data` (a list of row dicts) and
+    `.count`. `rpc()` calls a named database function the same way.
+    """
+
+    # Whether select() understands PostgREST aggregates such as "first_criteria.sum()"
+    supports_aggregates = False
+
+    def table(self, name: str):
+        raise NotImplementedError
+
+    def rpc(self, name: str, params: dict = None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
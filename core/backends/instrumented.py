@@ -0,0 +1,215 @@
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from core.backends.async_backend import AsyncStorageBackend
+from core.backends.base import StorageBackend
+from core.metrics import BackendMetrics, get_metrics
+
+# Builder methods that pick the kind of request; selects are the only idempotent reads
+_OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+_READ_OPERATIONS = ("select",)
+# SQLSTATEs worth retrying: connection failures (class 08), serialization failures and
+# deadlocks, too many connections, statement timeouts and an administrator shutdown
+_TRANSIENT_SQLSTATES = {"40001", "40P01", "53300", "57014", "57P01"}
+
+
+class BackendUnavailableError(Exception):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error may go away on its own: network failures, timeouts and overload."""
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        return code in _TRANSIENT_SQLSTATES or code.startswith("08")
+    return False
+
+
+class CircuitBreaker:
+    """
+    Fails requests at once while the backend is down instead of letting
+    each one wait out its timeout and hold a Streamlit script thread.
+
+    After `failure_threshold` transient failures in a row the breaker opens
+    and requests raise BackendUnavailableError. After `reset_seconds` one
+    trial request is let through (half-open): success closes the breaker,
+    failure opens it again. Errors the backend answered with, such as a
+    constraint violation, count as successes.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    raise BackendUnavailableError("Storage backend unavailable, retrying shortly")
+                self.state = "half_open"
+                self._trial_running = False
+            if self._trial_running:
+                raise BackendUnavailableError("Storage backend unavailable, retrying shortly")
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class InstrumentedBackend(StorageBackend):
+    """
+    Wraps a backend to time every request per table and operation (see
+    core.metrics), retry idempotent reads that fail transiently with
+    exponential backoff and jitter, and fail fast through a CircuitBreaker
+    while the backend is down.
+
+    Writes and RPCs are never retried: a request that timed out may still
+    have been applied.
+
+    The inner backend may also be an AsyncStorageBackend; requests then
+    return awaitables and go through `execute_async`.
+
+    Args:
+        inner: The backend doing the work.
+        read_retries: Extra attempts for a select that failed transiently.
+        breaker: Circuit breaker shared by all requests; one with defaults if omitted.
+        metrics: Where to record; the process-wide metrics if omitted.
+    """
+
+    def __init__(self, inner: StorageBackend, read_retries: int = 2, breaker: Optional[CircuitBreaker] = None, metrics: Optional[BackendMetrics] = None):
+        self.inner = inner
+        self.read_retries = read_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or get_metrics()
+        self.is_async = isinstance(inner, AsyncStorageBackend)
+
+    @property
+    def supports_aggregates(self) -> bool:
+        return self.inner.supports_aggregates
+
+    def table(self, name: str):
+        return _InstrumentedRequest(self, name, None, self.inner.table(name))
+
+    def rpc(self, name: str, params: dict = None):
+        return _InstrumentedRequest(self, name, "rpc", self.inner.rpc(name, params))
+
+    def close(self):
+        self.inner.close()
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+    def execute(self, table: str, operation: str, call: Callable[[], Any]) -> Any:
+        """Runs one request through the breaker, the metrics and, for reads, the retry policy."""
+        def attempt():
+            self._before_call(table, operation)
+            started = time.perf_counter()
+            try:
+                response = call()
+            except Exception as error:
+                self._record_failure(table, operation, started, error)
+                raise
+            self._record_success(table, operation, started)
+            return response
+
+        if operation not in _READ_OPERATIONS or self.read_retries <= 0:
+            return attempt()
+        from tenacity import Retrying
+        return self._retry_policy(Retrying, table, operation)(attempt)
+
+    async def execute_async(self, table: str, operation: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """`execute` for an async inner backend, whose `call` returns an awaitable."""
+        async def attempt():
+            self._before_call(table, operation)
+            started = time.perf_counter()
+            try:
+                response = await call()
+            except Exception as error:
+                self._record_failure(table, operation, started, error)
+                raise
+            self._record_success(table, operation, started)
+            return response
+
+        if operation not in _READ_OPERATIONS or self.read_retries <= 0:
+            return await attempt()
+        from tenacity import AsyncRetrying
+        return await self._retry_policy(AsyncRetrying, table, operation)(attempt)
+
+    def _before_call(self, table: str, operation: str):
+        try:
+            self.breaker.before_call()
+        except BackendUnavailableError:
+            self.metrics.record_rejected(table, operation)
+            raise
+
+    def _record_failure(self, table: str, operation: str, started: float, error: Exception):
+        self.metrics.record(table, operation, time.perf_counter() - started, error=True)
+        if is_transient(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _record_success(self, table: str, operation: str, started: float):
+        self.metrics.record(table, operation, time.perf_counter() - started)
+        self.breaker.record_success()
+
+    def _retry_policy(self, retrying_class, table: str, operation: str):
+        from tenacity import retry_if_exception, stop_after_attempt, wait_exponential_jitter
+        return retrying_class(
+            stop=stop_after_attempt(self.read_retries + 1),
+            wait=wait_exponential_jitter(initial=0.1, max=2),
+            retry=retry_if_exception(is_transient),
+            before_sleep=lambda state: self.metrics.record_retry(table, operation),
+            reraise=True,
+        )
+
+
+class _InstrumentedRequest:
+    """Follows a builder chain to learn the operation, then routes `execute` through the backend."""
+
+    def __init__(self, backend: InstrumentedBackend, table: str, operation: Optional[str], builder):
+        self._backend = backend
+        self._table = table
+        self._operation = operation
+        self._builder = builder
+
+    def __getattr__(self, attribute):
+        method = getattr(self._builder, attribute)
+        if not callable(method):
+            return method
+
+        def chained(*args, **kwargs):
+            if self._operation is None and attribute in _OPERATIONS:
+                self._operation = attribute
+            self._builder = method(*args, **kwargs)
+            return self
+        return chained
+
+    def execute(self):
+        if self._backend.is_async:
+            return self._backend.execute_async(self._table, self._operation or "select", self._builder.execute)
+        return self._backend.execute(self._table, self._operation or "select", self._builder.execute)
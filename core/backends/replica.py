@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, Optional
+
+from core.backends.base import StorageBackend
+from core.backends.sqlite_backend import SQLiteBackend
+
+
+class ReplicatedBackend(StorageBackend):
+    """
+    Serves hot reference tables from a node-local SQLite replica and sends
+    everything else to the primary backend.
+
+    Reads of a replicated table never leave the node. Writes to it still go
+    to the primary, and the rows the primary returns are mirrored into the
+    replica so this process reads its own writes. `sync()` refreshes the
+    replica from the primary, e.g. from `python manage.py sync-replica`.
+    """
+
+    def __init__(self, primary: StorageBackend, replica: SQLiteBackend, tables: Iterable[str]):
+        self.primary = primary
+        self.replica = replica
+        self.tables = set(tables)
+
+    @property
+    def supports_aggregates(self) -> bool:
+        return self.primary.supports_aggregates
+
+    def table(self, name: str):
+        if name not in self.tables:
+            return self.primary.table(name)
+        return _ReplicatedTable(self, name)
+
+    def rpc(self, name: str, params: dict = None):
+        return self.primary.rpc(name, params)
+
+    def close(self):
+        self.primary.close()
+        self.replica.close()
+
+    def sync(self, tables: Optional[Iterable[str]] = None, page_size: int = 1000) -> Dict[str, int]:
+        """
+        Copies the replicated tables from the primary with keyset pagination.
+        Each table is swapped inside one replica transaction, so readers see
+        either the old or the new copy. Returns the row count per table.
+        """
+        counts = {}
+        for name in tables or sorted(self.tables):
+            key = self.replica.table_info(name)["primary_key"][0]
+            rows, last_key = [], None
+            while True:
+                query = self.primary.table(name).select("*")
+                if last_key is not None:
+                    query = query.gt(key, last_key)
+                page = query.order(key).limit(page_size).execute().data
+                rows.extend(page)
+                if len(page) < page_size:
+                    break
+                last_key = page[-1][key]
+            with self.replica.transaction():
+                self.replica.table(name).delete(returning="minimal").execute()
+                if rows:
+                    self.replica.table(name).insert(rows, returning="minimal").execute()
+            counts[name] = len(rows)
+        return counts
+
+
+class _ReplicatedTable:
+    """Picks the replica for selects and a mirrored primary write otherwise."""
+
+    def __init__(self, backend: ReplicatedBackend, name: str):
+        self.backend = backend
+        self.name = name
+
+    def select(self, *args, **kwargs):
+        return self.backend.replica.table(self.name).select(*args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        return _MirroredWrite(self.backend, self.name, "upsert", self.backend.primary.table(self.name).insert(*args, **kwargs))
+
+    def upsert(self, *args, **kwargs):
+        return _MirroredWrite(self.backend, self.name, "upsert", self.backend.primary.table(self.name).upsert(*args, **kwargs))
+
+    def update(self, *args, **kwargs):
+        return _MirroredWrite(self.backend, self.name, "upsert", self.backend.primary.table(self.name).update(*args, **kwargs))
+
+    def delete(self, *args, **kwargs):
+        return _MirroredWrite(self.backend, self.name, "delete", self.backend.primary.table(self.name).delete(*args, **kwargs))
+
+
+class _MirroredWrite:
+    """Wraps a primary write builder and applies its returned rows to the replica."""
+
+    def __init__(self, backend: ReplicatedBackend, name: str, mirror: str, builder):
+        self._backend = backend
+        self._name = name
+        self._mirror = mirror
+        self._builder = builder
+
+    def __getattr__(self, attribute):
+        method = getattr(self._builder, attribute)
+
+        def chained(*args, **kwargs):
+            self._builder = method(*args, **kwargs)
+            return self
+        return chained
+
+    def execute(self):
+        response = self._builder.execute()
+        if response.data:
+            replica = self._backend.replica.table(self._name)
+            if self._mirror == "upsert":
+                replica.upsert(response.data, returning="minimal").execute()
+            else:
+                key = self._backend.replica.table_info(self._name)["primary_key"][0]
+                replica.delete(returning="minimal").in_(key, [row[key] for row in response.data]).execute()
+        return response
@@ -0,0 +1,450 @@
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from postgrest import APIResponse
+from postgrest.exceptions import APIError
+
+from core.backends import sqlite_functions
+from core.backends.base import StorageBackend
+from core.config import TIMEZONE
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqlite_schema.sql")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# [alias:]column, [alias:]column.func() or [alias:]count()
+_SELECT_ITEM = re.compile(r"^(?:(?P<alias>\w+):)?(?:(?P<column>\w+)(?:\.(?P<func>sum|avg|count|min|max)\(\))?|(?P<count>count)\(\))$")
+# ISO-8601 timestamp with a UTC offset, e.g. 2026-10-17T04:00:00+00:00 or 2026-10-17T04:00Z
+_AWARE_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}(:?\d{2})?)$")
+
+
+def _quote(identifier: str) -> str:
+    if not _IDENTIFIER.match(identifier):
+        raise APIError({"code": "42703", "message": f"Invalid column name: {identifier}"})
+    return f'"{identifier}"'
+
+
+def _local_timestamp(value: datetime) -> str:
+    return value.astimezone(ZoneInfo(TIMEZONE)).replace(tzinfo=None).isoformat()
+
+
+def _to_param(value: Any) -> Any:
+    # Timestamps are stored as naive local wall-clock text and compared as text, so
+    # aware values are converted to local time first (Postgres compares instants)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return _local_timestamp(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) >= 16 and value[10:11] in ("T", " ") and _AWARE_TIMESTAMP.match(value):
+        return _local_timestamp(datetime.fromisoformat(value))
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _api_error(error: sqlite3.Error) -> APIError:
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        if "UNIQUE" in message:
+            code = "23505"
+        elif "NOT NULL" in message:
+            code = "23502"
+        else:
+            code = "23503"
+    elif "no such column" in message:
+        code = "42703"
+    elif "no such table" in message:
+        code = "42P01"
+    else:
+        code = "XX000"
+    return APIError({"code": code, "message": message})
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded storage with the same query-builder surface as Supabase.
+
+    One connection is shared by all threads and guarded by a lock, so the
+    backend is safe to use from Streamlit script threads and load-test workers.
+    The schema in sqlite_schema.sql is applied on open and the database
+    functions in sqlite_functions.py are registered for rpc().
+
+    Args:
+        path: Database file, or ":memory:" for a throwaway database.
+        latency: Seconds added to every request, to stand in for the network
+                 round trip of the hosted backend in benchmarks and load tests.
+        jitter: Extra random latency of up to this many seconds per request.
+    """
+
+    supports_aggregates = True
+
+    def __init__(self, path: str = ":memory:", latency: float = 0.0, jitter: float = 0.0):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        # Requests executed so far; benchmarks use it to catch N+1 query patterns
+        self.call_count = 0
+        self._lock = threading.RLock()
+        self._functions: Dict[str, Callable] = {}
+        self._table_info: Dict[str, Dict[str, Any]] = {}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("uuid4", 0, lambda: str(uuid.uuid4()))
+        self._conn.create_function("now_iso", 0, lambda: datetime.now(ZoneInfo(TIMEZONE)).replace(tzinfo=None).isoformat())
+        if path != ":memory:":
+            self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute("pragma synchronous=normal")
+        with open(SCHEMA_PATH) as schema:
+            self._conn.executescript(schema.read())
+        sqlite_functions.register_all(self)
+
+    # --- StorageBackend ---
+
+    def table(self, name: str) -> "SQLiteQuery":
+        return SQLiteQuery(self, name)
+
+    def rpc(self, name: str, params: dict = None) -> "SQLiteRpc":
+        return SQLiteRpc(self, name, params or {})
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Helpers for queries and registered functions ---
+
+    def register_function(self, name: str, function: Callable):
+        """
+        Registers a Python implementation of a database function for rpc().
+        It is called as function(backend, **params) inside a transaction and
+        returns the response data.
+        """
+        self._functions[name] = function
+
+    def simulate_request(self):
+        """Counts a request and sleeps for the configured latency, outside the lock so requests overlap."""
+        with self._lock:
+            self.call_count += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def transaction(self):
+        """Runs the block atomically; nested use joins the outer transaction."""
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self
+                return
+            self._conn.execute("begin immediate")
+            try:
+                yield self
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+            self._conn.execute("commit")
+
+    def query(self, table: str, sql: str, params: List[Any] = ()) -> List[Dict[str, Any]]:
+        """Runs one statement and returns its rows decoded for `table`."""
+        with self._lock:
+            try:
+                cursor = self._conn.execute(sql, [_to_param(p) for p in params])
+                rows = cursor.fetchall()
+            except sqlite3.Error as error:
+                raise _api_error(error) from error
+        return [self.decode(table, row) for row in rows]
+
+    def table_info(self, table: str) -> Dict[str, Any]:
+        """Columns, primary key and JSON columns of a table, cached after the first lookup."""
+        info = self._table_info.get(table)
+        if info is None:
+            with self._lock:
+                rows = self._conn.execute(f"pragma table_info({_quote(table)})").fetchall()
+            if not rows:
+                raise APIError({"code": "42P01", "message": f"relation \"{table}\" does not exist"})
+            info = {
+                "columns": [row["name"] for row in rows],
+                "primary_key": [row["name"] for row in sorted(rows, key=lambda r: r["pk"]) if row["pk"]],
+                "json_columns": {row["name"] for row in rows if row["type"].upper() == "JSON"},
+            }
+            self._table_info[table] = info
+        return info
+
+    def decode(self, table: str, row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        json_columns = self._table_info.get(table, {}).get("json_columns") if table else None
+        for column in json_columns or ():
+            if isinstance(data.get(column), str):
+                data[column] = json.loads(data[column])
+        return data
+
+
+class SQLiteRpc:
+    def __init__(self, backend: SQLiteBackend, name: str, params: dict):
+        self.backend = backend
+        self.name = name
+        self.params = params
+
+    def execute(self) -> APIResponse:
+        function = self.backend._functions.get(self.name)
+        if function is None:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function {self.name}"})
+        self.backend.simulate_request()
+        with self.backend.transaction():
+            data = function(self.backend, **self.params)
+        return APIResponse(data=data if data is not None else [], count=None)
+
+
+class SQLiteQuery:
+    """A PostgREST-style request builder that compiles to one SQLite statement."""
+
+    def __init__(self, backend: SQLiteBackend, table: str):
+        self.backend = backend
+        self.table = table
+        self._operation = "select"
+        self._columns = "*"
+        self._count = None
+        self._head = False
+        self._payload = None
+        self._returning = True
+        self._on_conflict = ""
+        self._ignore_duplicates = False
+        self._where: List[str] = []
+        self._params: List[Any] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+
+    # --- Operations ---
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> "SQLiteQuery":
+        self._operation = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json: Any, *, count: Optional[str] = None, returning: Any = "representation", upsert: bool = False, default_to_null: bool = True) -> "SQLiteQuery":
+        self._operation = "upsert" if upsert else "insert"
+        self._payload = json
+        self._count = count
+        self._returning = self._wants_rows(returning)
+        return self
+
+    def upsert(self, json: Any, *, count: Optional[str] = None, returning: Any = "representation", ignore_duplicates: bool = False, on_conflict: str = "", default_to_null: bool = True) -> "SQLiteQuery":
+        self._operation = "upsert"
+        self._payload = json
+        self._count = count
+        self._returning = self._wants_rows(returning)
+        self._ignore_duplicates = ignore_duplicates
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, json: dict, *, count: Optional[str] = None, returning: Any = "representation") -> "SQLiteQuery":
+        self._operation = "update"
+        self._payload = json
+        self._count = count
+        self._returning = self._wants_rows(returning)
+        return self
+
+    def delete(self, *, count: Optional[str] = None, returning: Any = "representation") -> "SQLiteQuery":
+        self._operation = "delete"
+        self._count = count
+        self._returning = self._wants_rows(returning)
+        return self
+
+    @staticmethod
+    def _wants_rows(returning: Any) -> bool:
+        return str(getattr(returning, "value", returning)) != "minimal"
+
+    # --- Filters ---
+
+    def _compare(self, column: str, operator: str, value: Any) -> "SQLiteQuery":
+        self._where.append(f"{_quote(column)} {operator} ?")
+        self._params.append(value)
+        return self
+
+    def eq(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, "=", value)
+
+    def neq(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, "!=", value)
+
+    def gt(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, ">", value)
+
+    def gte(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, ">=", value)
+
+    def lt(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, "<", value)
+
+    def lte(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._compare(column, "<=", value)
+
+    def like(self, column: str, pattern: str) -> "SQLiteQuery":
+        return self._compare(column, "like", pattern.replace("*", "%"))
+
+    def ilike(self, column: str, pattern: str) -> "SQLiteQuery":
+        # SQLite's LIKE is already case-insensitive for ASCII
+        return self.like(column, pattern)
+
+    def is_(self, column: str, value: Any) -> "SQLiteQuery":
+        literal = {"null": "null", "none": "null", "true": "1", "false": "0"}.get(str(value).lower())
+        if literal is None:
+            raise APIError({"code": "PGRST100", "message": f"Unsupported is_ value: {value}"})
+        self._where.append(f"{_quote(column)} is {literal}")
+        return self
+
+    def in_(self, column: str, values: Any) -> "SQLiteQuery":
+        values = list(values)
+        if not values:
+            self._where.append("0")
+            return self
+        self._where.append(f"{_quote(column)} in ({','.join('?' * len(values))})")
+        self._params.extend(values)
+        return self
+
+    # --- Ordering and pagination ---
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, foreign_table: Optional[str] = None) -> "SQLiteQuery":
+        clause = f"{_quote(column)} {'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            clause += " nulls first" if nullsfirst else " nulls last"
+        self._order.append(clause)
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> "SQLiteQuery":
+        self._limit = size
+        return self
+
+    def offset(self, size: int) -> "SQLiteQuery":
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> "SQLiteQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # --- Execution ---
+
+    def execute(self) -> APIResponse:
+        self.backend.simulate_request()
+        self.backend.table_info(self.table)
+        handler = getattr(self, f"_execute_{self._operation}")
+        data, count = handler()
+        return APIResponse(data=data, count=count)
+
+    def _where_sql(self) -> str:
+        return f" where {' and '.join(self._where)}" if self._where else ""
+
+    def _execute_select(self):
+        select_sql, group_by = self._select_list()
+        sql = f"select {select_sql} from {_quote(self.table)}{self._where_sql()}"
+        if group_by:
+            sql += f" group by {', '.join(group_by)}"
+        if self._order:
+            sql += f" order by {', '.join(self._order)}"
+        if self._limit is not None or self._offset is not None:
+            sql += f" limit {int(self._limit if self._limit is not None else -1)} offset {int(self._offset or 0)}"
+
+        count = None
+        if self._count:
+            count_sql = f"select count(*) as n from {_quote(self.table)}{self._where_sql()}"
+            if group_by:
+                count_sql = f"select count(*) as n from (select 1 from {_quote(self.table)}{self._where_sql()} group by {', '.join(group_by)})"
+            count = self.backend.query(self.table, count_sql, self._params)[0]["n"]
+        if self._head:
+            return [], count
+        return self.backend.query(self.table, sql, self._params), count
+
+    def _select_list(self):
+        """Translates a PostgREST select list, including aggregates, to SQL and its GROUP BY columns."""
+        items = [item.strip() for item in self._columns.split(",") if item.strip()]
+        if items == ["*"]:
+            return "*", []
+        expressions, plain, has_aggregate = [], [], False
+        for item in items:
+            match = _SELECT_ITEM.match(item)
+            if not match:
+                raise APIError({"code": "PGRST100", "message": f"Unsupported select item: {item}"})
+            alias, column, func = match.group("alias"), match.group("column"), match.group("func")
+            if match.group("count"):
+                expressions.append(f"count(*) as {_quote(alias or 'count')}")
+                has_aggregate = True
+            elif func:
+                expressions.append(f"{func}({_quote(column)}) as {_quote(alias or func)}")
+                has_aggregate = True
+            else:
+                expressions.append(f"{_quote(column)} as {_quote(alias or column)}")
+                plain.append(_quote(column))
+        return ", ".join(expressions), plain if has_aggregate else []
+
+    def _rows(self) -> List[dict]:
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def _insert_sql(self, columns: List[str], conflict: str) -> str:
+        column_sql = ", ".join(_quote(c) for c in columns)
+        sql = f"insert into {_quote(self.table)} ({column_sql}) values ({', '.join('?' * len(columns))})"
+        if conflict is not None:
+            target = ", ".join(_quote(c.strip()) for c in conflict.split(","))
+            updates = [c for c in columns if c not in conflict.split(",")]
+            if self._ignore_duplicates or not updates:
+                sql += f" on conflict ({target}) do nothing"
+            else:
+                sql += f" on conflict ({target}) do update set " + ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in updates)
+        return sql
+
+    def _execute_insert(self, conflict: Optional[str] = None):
+        rows = self._rows()
+        if not rows:
+            return [], 0
+        data = []
+        with self.backend.transaction():
+            if not self._returning:
+                # Bulk path: group rows by their column set and use executemany
+                groups: Dict[tuple, list] = {}
+                for row in rows:
+                    groups.setdefault(tuple(row.keys()), []).append([_to_param(row[c]) for c in row])
+                for columns, values in groups.items():
+                    try:
+                        self.backend._conn.executemany(self._insert_sql(list(columns), conflict), values)
+                    except sqlite3.Error as error:
+                        raise _api_error(error) from error
+                return [], len(rows)
+            for row in rows:
+                columns = list(row.keys())
+                data.extend(self.backend.query(self.table, self._insert_sql(columns, conflict) + " returning *", [row[c] for c in columns]))
+        return data, len(data)
+
+    def _execute_upsert(self):
+        conflict = self._on_conflict or ",".join(self.backend.table_info(self.table)["primary_key"])
+        return self._execute_insert(conflict)
+
+    def _execute_update(self):
+        if not self._payload:
+            return [], 0
+        columns = list(self._payload.keys())
+        set_sql = ", ".join(f"{_quote(c)} = ?" for c in columns)
+        sql = f"update {_quote(self.table)} set {set_sql}{self._where_sql()} returning *"
+        data = self.backend.query(self.table, sql, [self._payload[c] for c in columns] + self._params)
+        return (data if self._returning else []), len(data)
+
+    def _execute_delete(self):
+        sql = f"delete from {_quote(self.table)}{self._where_sql()} returning *"
+        data = self.backend.query(self.table, sql, self._params)
+        return (data if self._returning else []), len(data)
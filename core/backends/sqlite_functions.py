@@ -0,0 +1,109 @@
+"""
+Python implementations of the database functions in supabase/migrations,
+registered on every SQLiteBackend so rpc() behaves the same offline. Each
+runs inside the backend's transaction and returns the rpc response rows.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from postgrest.exceptions import APIError
+
+from models.models import OFFICE_DRILLDOWN_SORTS, RATING_CRITERIA, CommentTerms, Rating, RatingSummary
+
+
+def register_client_with_queue(backend, p_client_id: str, p_first_name: str, p_last_name: str, p_created_at: str = None) -> List[Dict[str, Any]]:
+    created_at = p_created_at or datetime.now().isoformat()
+    client = backend.query(
+        "clients",
+        "insert into clients (client_id, first_name, last_name, created_at) values (?, ?, ?, ?) returning *",
+        [p_client_id or str(uuid.uuid4()), p_first_name, p_last_name, created_at],
+    )[0]
+    queue = backend.query(
+        "queues",
+        "insert into queues (client_id, created_at) values (?, ?) returning *",
+        [client["client_id"], created_at],
+    )[0]
+    return [{"client": client, "queue": queue}]
+
+
+def record_rating_summary(backend, p_emp_id: str, p_scores: Dict[str, Any]) -> List[Dict[str, Any]]:
+    backend.table_info("rating_summaries")
+    rows = backend.query("rating_summaries", "select * from rating_summaries where emp_id = ?", [p_emp_id])
+    summary = RatingSummary.from_dict(rows[0]) if rows else RatingSummary(emp_id=p_emp_id)
+    summary.add_rating(Rating(**{criterion: p_scores.get(criterion) for criterion in RATING_CRITERIA}))
+    summary.updated_at = datetime.now(timezone.utc)
+    row = summary.to_dict()
+    return backend.query(
+        "rating_summaries",
+        """
+        insert into rating_summaries (emp_id, rating_count, sums, counts, histograms, updated_at) values (?, ?, ?, ?, ?, ?)
+        on conflict (emp_id) do update set rating_count = excluded.rating_count, sums = excluded.sums,
+            counts = excluded.counts, histograms = excluded.histograms, updated_at = excluded.updated_at
+        returning *
+        """,
+        [p_emp_id, row["rating_count"], row["sums"], row["counts"], row["histograms"], row["updated_at"]],
+    )
+
+
+def record_comment_terms(backend, p_emp_id: str, p_tokens: List[str]) -> List[Dict[str, Any]]:
+    backend.table_info("comment_terms")
+    rows = backend.query("comment_terms", "select * from comment_terms where emp_id = ?", [p_emp_id])
+    terms = CommentTerms.from_dict(rows[0]) if rows else CommentTerms(emp_id=p_emp_id)
+    terms.add_terms(p_tokens)
+    terms.updated_at = datetime.now(timezone.utc)
+    row = terms.to_dict()
+    return backend.query(
+        "comment_terms",
+        """
+        insert into comment_terms (emp_id, terms, comment_count, version, updated_at) values (?, ?, ?, ?, ?)
+        on conflict (emp_id) do update set terms = excluded.terms, comment_count = excluded.comment_count,
+            version = excluded.version, updated_at = excluded.updated_at
+        returning *
+        """,
+        [p_emp_id, row["terms"], row["comment_count"], row["version"], row["updated_at"]],
+    )
+
+
+def office_drilldown(backend, p_office: str, p_sort: str = "overall", p_descending: bool = True, p_limit: int = 25, p_offset: int = 0) -> List[Dict[str, Any]]:
+    averages = ",\n".join(
+        f"coalesce(json_extract(s.sums, '$.{criterion}') * 1.0 / nullif(json_extract(s.counts, '$.{criterion}'), 0), 0) as {criterion}"
+        for criterion in RATING_CRITERIA
+    )
+    if p_sort == "name":
+        order = "e.last_name || ' ' || e.first_name"
+    elif p_sort in OFFICE_DRILLDOWN_SORTS:
+        order = p_sort
+    else:
+        raise APIError({"code": "22023", "message": f"Unknown sort key: {p_sort}"})
+    return backend.query(
+        None,
+        f"""
+        with averages as (
+            select e.emp_id, e.first_name, e.last_name, e.position, coalesce(s.rating_count, 0) as rating_count,
+                   {averages}
+            from employees e
+            left join rating_summaries s on s.emp_id = e.emp_id
+            where e.office = ?
+        )
+        select e.*, (first_criteria + second_criteria + third_criteria + fourth_criteria) / 4.0 as overall,
+               count(*) over () as total_count
+        from averages e
+        order by {order} {"desc" if p_descending else "asc"}, emp_id
+        limit ? offset ?
+        """,
+        [p_office, p_limit, p_offset],
+    )
+
+
+FUNCTIONS = {
+    "register_client_with_queue": register_client_with_queue,
+    "office_drilldown": office_drilldown,
+    "record_rating_summary": record_rating_summary,
+    "record_comment_terms": record_comment_terms,
+}
+
+
+def register_all(backend):
+    for name, function in FUNCTIONS.items():
+        backend.register_function(name, function)
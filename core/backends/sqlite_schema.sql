@@ -0,0 +1,104 @@
+-- Embedded SQLite mirror of the Supabase schema, used by SQLiteBackend for
+-- local read replicas, offline development and load/benchmark runs.
+-- Columns declared JSON are stored as text and decoded by the backend.
+
+create table if not exists admins (
+    admin_id text primary key default (uuid4()),
+    email_address text not null unique,
+    first_name text,
+    last_name text,
+    created_at text default (now_iso())
+);
+
+create table if not exists offices (
+    office_id text primary key default (uuid4()),
+    name text not null
+);
+
+create table if not exists employees (
+    emp_id text primary key default (uuid4()),
+    first_name text not null,
+    last_name text not null,
+    office text,
+    position text,
+    created_at text default (now_iso())
+);
+create index if not exists employees_office_idx on employees (office);
+
+create table if not exists clients (
+    client_id text primary key default (uuid4()),
+    first_name text not null,
+    last_name text not null,
+    created_at text default (now_iso())
+);
+create index if not exists clients_created_at_idx on clients (created_at);
+
+create table if not exists queues (
+    queue_id integer primary key autoincrement,
+    client_id text references clients (client_id),
+    created_at text default (now_iso()),
+    ended_at text
+);
+create index if not exists queues_client_id_idx on queues (client_id);
+create index if not exists queues_created_at_idx on queues (created_at);
+create index if not exists queues_ended_at_idx on queues (ended_at);
+create index if not exists queues_open_created_at_idx on queues (created_at) where ended_at is null;
+
+create table if not exists ratings (
+    rating_id text primary key default (uuid4()),
+    queue_id integer references queues (queue_id),
+    emp_id text references employees (emp_id),
+    first_criteria integer,
+    second_criteria integer,
+    third_criteria integer,
+    fourth_criteria integer,
+    comments text,
+    created_at text default (now_iso())
+);
+create index if not exists ratings_emp_id_idx on ratings (emp_id);
+create index if not exists ratings_queue_id_idx on ratings (queue_id);
+create index if not exists ratings_created_at_idx on ratings (created_at);
+
+create table if not exists rating_summaries (
+    emp_id text primary key,
+    rating_count integer not null default 0,
+    sums JSON not null default '{}',
+    counts JSON not null default '{}',
+    histograms JSON not null default '{}',
+    updated_at text default (now_iso())
+);
+create index if not exists rating_summaries_updated_at_idx on rating_summaries (updated_at);
+
+create table if not exists daily_activity (
+    day text primary key,
+    clients integer not null default 0,
+    queues integer not null default 0,
+    closed_queues integer not null default 0,
+    ratings integer not null default 0,
+    updated_at text default (now_iso())
+);
+
+create table if not exists daily_employee_ratings (
+    day text not null,
+    emp_id text not null,
+    rating_count integer not null default 0,
+    sums JSON not null default '{}',
+    counts JSON not null default '{}',
+    histograms JSON not null default '{}',
+    updated_at text default (now_iso()),
+    primary key (day, emp_id)
+);
+
+create table if not exists rollup_watermarks (
+    name text primary key,
+    watermark text,
+    updated_at text default (now_iso())
+);
+
+create table if not exists comment_terms (
+    emp_id text primary key,
+    terms JSON not null default '{}',
+    comment_count integer not null default 0,
+    version integer not null default 0,
+    updated_at text default (now_iso())
+);
@@ -0,0 +1,114 @@
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.utils import AsyncClient, SyncClient
+
+from core.backends.async_backend import AsyncRequest, AsyncStorageBackend
+from core.backends.base import StorageBackend
+
+
+class SupabaseBackend(StorageBackend):
+    """
+    Storage backed by the hosted Supabase (PostgREST) API.
+
+    With `timeout` or `limits` given, requests go through a PostgREST client
+    of our own whose keep-alive connection pool and timeouts are set from
+    core.config, instead of supabase-py's defaults (a 120 s timeout and an
+    unbounded wait for a free connection).
+    """
+
+    def __init__(self, client, supports_aggregates: bool = False, timeout=None, limits=None):
+        self.client = client
+        # PostgREST only accepts aggregate selects when db-aggregates-enabled is set on the project
+        self.supports_aggregates = supports_aggregates
+        self.postgrest = client.postgrest
+        if timeout is not None or limits is not None:
+            self.postgrest = PooledPostgrestClient(
+                client.rest_url,
+                headers=client.options.headers,
+                schema=client.options.schema,
+                timeout=timeout if timeout is not None else client.options.postgrest_client_timeout,
+                limits=limits,
+            )
+
+    def table(self, name: str):
+        return self.postgrest.from_(name)
+
+    def rpc(self, name: str, params: dict = None):
+        return self.postgrest.rpc(name, params or {})
+
+    def close(self):
+        if self.postgrest is not self.client.postgrest:
+            self.postgrest.session.close()
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """SyncPostgrestClient whose HTTP session has explicit connection pool limits (an httpx.Limits)."""
+
+    def __init__(self, base_url: str, *, limits=None, **kwargs):
+        self._limits = limits
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> SyncClient:
+        options = {"limits": self._limits} if self._limits is not None else {}
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            **options,
+        )
+
+
+class AsyncSupabaseBackend(AsyncStorageBackend):
+    """
+    The async repositories' access to the hosted Supabase API, through
+    postgrest's async client with its own keep-alive pool.
+
+    Args:
+        client: The synchronous supabase Client, for the URL, headers and schema.
+        supports_aggregates: As for SupabaseBackend.
+        timeout: An httpx.Timeout or seconds; supabase-py's default if omitted.
+        limits: An httpx.Limits bounding the connection pool.
+    """
+
+    def __init__(self, client, supports_aggregates: bool = False, timeout=None, limits=None):
+        self.supports_aggregates = supports_aggregates
+        self.postgrest = PooledAsyncPostgrestClient(
+            client.rest_url,
+            headers=client.options.headers,
+            schema=client.options.schema,
+            timeout=timeout if timeout is not None else client.options.postgrest_client_timeout,
+            limits=limits,
+        )
+
+    def table(self, name: str):
+        return AsyncRequest(self.postgrest.from_(name))
+
+    def rpc(self, name: str, params: dict = None):
+        return AsyncRequest(self.postgrest.rpc(name, params or {}))
+
+    async def aclose(self):
+        await self.postgrest.aclose()
+
+
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose HTTP session has explicit connection pool limits (an httpx.Limits)."""
+
+    def __init__(self, base_url: str, *, limits=None, **kwargs):
+        self._limits = limits
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> AsyncClient:
+        options = {"limits": self._limits} if self._limits is not None else {}
+        return AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            **options,
+        )
@@ -0,0 +1,148 @@
+"""
+Process-wide read-through cache for repository reads of slowly changing
+tables (employees, offices, admins) and for point lookups by id.
+
+Each table has its own TTL and LRU-bounded cachetools.TTLCache. Writes made
+through a repository in this process clear the table's entries at once;
+writes from other processes are seen once the TTL runs out.
+"""
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+from core import config
+
+
+class ReadCache:
+    """
+    Per-table TTL and LRU cache of repository results.
+
+    A read that started before an invalidation does not store its (possibly
+    stale) result afterwards: every table has a generation counter that
+    `invalidate` bumps, and a load only fills the cache if the generation is
+    unchanged when it returns.
+
+    Cached values are shared, so `get_or_load` hands out shallow copies of
+    models and lists of models; callers may edit what they get back.
+
+    Args:
+        ttls: Seconds entries of each table stay fresh; tables not listed are not cached.
+        max_entries: Entries kept per table before the least recently used are evicted.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024):
+        self.ttls = {table: ttl for table, ttl in (ttls or {}).items() if ttl > 0}
+        self.max_entries = max_entries
+        self._caches: Dict[str, TTLCache] = {}
+        self._generations: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enabled(self, table: str) -> bool:
+        return table in self.ttls
+
+    def _cache(self, table: str) -> TTLCache:
+        cache = self._caches.get(table)
+        if cache is None:
+            cache = self._caches[table] = TTLCache(self.max_entries, self.ttls[table])
+        return cache
+
+    def get_or_load(self, table: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result of `key` for `table`, calling `load` on a
+        miss. None results are not cached, so a row created elsewhere is
+        found on the next read.
+        """
+        if not self.enabled(table):
+            return load()
+        found, generation = self._lookup(table, key)
+        if found is not _MISSING:
+            return _copy(found)
+        return self._store(table, key, load(), generation)
+
+    async def get_or_load_async(self, table: str, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """`get_or_load` for the async repositories, whose `load` returns an awaitable."""
+        if not self.enabled(table):
+            return await load()
+        found, generation = self._lookup(table, key)
+        if found is not _MISSING:
+            return _copy(found)
+        return self._store(table, key, await load(), generation)
+
+    def _lookup(self, table: str, key: Hashable) -> Tuple[Any, int]:
+        """The cached value (or _MISSING) and the table's generation when it was looked up."""
+        with self._lock:
+            found = self._cache(table).get(key, _MISSING)
+            if found is not _MISSING:
+                self._hits[table] = self._hits.get(table, 0) + 1
+            else:
+                self._misses[table] = self._misses.get(table, 0) + 1
+            return found, self._generations.get(table, 0)
+
+    def _store(self, table: str, key: Hashable, value: Any, generation: int) -> Any:
+        if value is None:
+            return None
+        with self._lock:
+            if self._generations.get(table, 0) == generation:
+                self._cache(table)[key] = value
+        return _copy(value)
+
+    def invalidate(self, *tables: str):
+        """Drops the cached reads of the tables, or of every table when none are given."""
+        with self._lock:
+            for table in tables or list(self._caches):
+                self._generations[table] = self._generations.get(table, 0) + 1
+                cache = self._caches.get(table)
+                if cache is not None:
+                    cache.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per cached table: hits, misses, hit rate, live entries and TTL."""
+        with self._lock:
+            result = {}
+            for table, ttl in self.ttls.items():
+                hits, misses = self._hits.get(table, 0), self._misses.get(table, 0)
+                cache = self._caches.get(table)
+                if cache is not None:
+                    cache.expire()
+                result[table] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                    "entries": len(cache) if cache is not None else 0,
+                    "ttl": ttl,
+                }
+            return result
+
+
+_MISSING = object()
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, list):
+        return [copy.copy(item) for item in value]
+    return copy.copy(value)
+
+
+_read_cache: Optional[ReadCache] = None
+_read_cache_lock = threading.Lock()
+
+
+def get_read_cache() -> ReadCache:
+    """Returns the process-wide read cache, configured from core.config on first use."""
+    global _read_cache
+    if _read_cache is None:
+        with _read_cache_lock:
+            if _read_cache is None:
+                _read_cache = ReadCache(config.CACHE_TTLS, config.CACHE_MAX_ENTRIES)
+    return _read_cache
+
+
+def set_read_cache(cache: Optional[ReadCache]):
+    """Replaces the process-wide read cache; None rebuilds it from core.config on next use."""
+    global _read_cache
+    with _read_cache_lock:
+        _read_cache = cache
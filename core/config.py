@@ -0,0 +1,107 @@
+# app/core/config.py
+import os
+
+# Local timezone of the city hall counters, used when bucketing timestamps
+TIMEZONE = os.environ.get("PALAYAN_TIMEZONE", "Asia/Manila")
+
+# Rows fetched per request when repositories page through a table. Keep it at or
+# below the PostgREST max-rows setting (1000 on Supabase) so pages are never truncated.
+REPOSITORY_PAGE_SIZE = int(os.environ.get("PALAYAN_PAGE_SIZE", 1000))
+
+# Storage backend used by the repositories: "supabase" (default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("PALAYAN_STORAGE_BACKEND", "supabase")
+# Database file for the sqlite backend
+SQLITE_PATH = os.environ.get("PALAYAN_SQLITE_PATH", "palayan.db")
+# Whether the Supabase project has PostgREST aggregates (db-aggregates-enabled) turned on
+SUPABASE_AGGREGATES = os.environ.get("PALAYAN_SUPABASE_AGGREGATES", "false").lower() == "true"
+
+# HTTP client of the Supabase backend: seconds to connect, to wait for a response, and to wait
+# for a free pooled connection before failing (so a slow backend cannot pile up script threads)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("PALAYAN_HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("PALAYAN_HTTP_READ_TIMEOUT", 15))
+HTTP_POOL_TIMEOUT = float(os.environ.get("PALAYAN_HTTP_POOL_TIMEOUT", 3))
+# Keep-alive connections per process, shared by every session
+HTTP_POOL_SIZE = int(os.environ.get("PALAYAN_HTTP_POOL_SIZE", 20))
+
+# Backend requests the concurrent page loads of a server process may have in flight at once,
+# across all sessions (see core.aio); at or below HTTP_POOL_SIZE they never wait for a connection
+ASYNC_CONCURRENCY = int(os.environ.get("PALAYAN_ASYNC_CONCURRENCY", 8))
+
+# Request metrics, read retries and the circuit breaker around the storage backend
+BACKEND_INSTRUMENTATION = os.environ.get("PALAYAN_BACKEND_INSTRUMENTATION", "true").lower() == "true"
+# Extra attempts for a read that failed with a timeout or network error; writes are never retried
+READ_RETRIES = int(os.environ.get("PALAYAN_READ_RETRIES", 2))
+# Transient failures in a row that open the circuit breaker, and seconds before it tries again
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("PALAYAN_CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("PALAYAN_CIRCUIT_RESET_SECONDS", 30))
+
+# Optional node-local SQLite replica for hot reference tables, refreshed with
+# `python manage.py sync-replica`. Leave the path empty to read everything from the primary.
+REPLICA_PATH = os.environ.get("PALAYAN_REPLICA_PATH", "")
+REPLICA_TABLES = [t for t in os.environ.get("PALAYAN_REPLICA_TABLES", "employees,offices,admins").split(",") if t]
+
+# Seconds repository reads of each table are cached in process, as "table=seconds" pairs;
+# tables left out are always read from the database. Queues are left out by default because
+# other processes end them and the queue pages need the current state.
+CACHE_TTLS = {
+    table: float(ttl)
+    for table, ttl in (
+        pair.split("=") for pair in os.environ.get(
+            "PALAYAN_CACHE_TTLS", "employees=300,offices=3600,admins=300,clients=60,ratings=300"
+        ).split(",") if pair
+    )
+}
+# Cached reads kept per table; the least recently used are evicted beyond this
+CACHE_MAX_ENTRIES = int(os.environ.get("PALAYAN_CACHE_MAX_ENTRIES", 1024))
+
+# Folder of the node-local cache that the server processes of one host share (employees,
+# offices and the leaderboard as memory-mapped Arrow files); empty disables it
+SHARED_CACHE_DIR = os.environ.get("PALAYAN_SHARED_CACHE_DIR", "")
+# Seconds between refreshes of the shared cache by the process holding the writer lease
+SHARED_CACHE_INTERVAL = float(os.environ.get("PALAYAN_SHARED_CACHE_INTERVAL", 60))
+
+# Queues still open after this many hours are ended by the expiry job
+QUEUE_MAX_AGE_HOURS = float(os.environ.get("PALAYAN_QUEUE_MAX_AGE_HOURS", 12))
+# Seconds between runs of the stale-queue expiry job; 0 disables the in-app job
+QUEUE_EXPIRY_INTERVAL = float(os.environ.get("PALAYAN_QUEUE_EXPIRY_INTERVAL", 300))
+
+# Where the live queue board hears about queue changes from other processes:
+# "realtime" subscribes to Supabase Realtime, "none" relies on in-process hooks and
+# sees other processes' changes only at the next periodic re-read
+QUEUE_EVENTS = os.environ.get("PALAYAN_QUEUE_EVENTS", "none")
+# Seconds between re-reads of the open queues when QUEUE_EVENTS is "none"; 0 disables them,
+# which leaves the board blind to queues opened or ended by other server processes
+QUEUE_RESYNC_INTERVAL = float(os.environ.get("PALAYAN_QUEUE_RESYNC_INTERVAL", 30))
+# Seconds between queue board redraws; redraws read the in-memory index, not the database
+QUEUE_BOARD_REFRESH = float(os.environ.get("PALAYAN_QUEUE_BOARD_REFRESH", 3))
+
+# Seconds between incremental refreshes of the daily dashboard rollups; 0 disables the in-app job
+ROLLUP_INTERVAL = float(os.environ.get("PALAYAN_ROLLUP_INTERVAL", 600))
+# Seconds a row may still be in flight from other servers. The rollups, the Parquet export and the
+# comment search index leave rows this recent to their next run; the leaderboard re-reads them.
+SETTLE_SECONDS = float(os.environ.get("PALAYAN_SETTLE_SECONDS", 120))
+
+# Seconds after which the Employee page first pulls rating summary changes made by other
+# processes into its leaderboard; ratings written by this process show up at once
+LEADERBOARD_SYNC_INTERVAL = float(os.environ.get("PALAYAN_LEADERBOARD_SYNC_INTERVAL", 10))
+
+# Employees are ranked by a Bayesian average: their overall rating pulled towards the prior
+# mean as if they also had PRIOR_WEIGHT ratings of that value, so a few ratings cannot
+# outrank many. The prior is fixed, so a new rating moves only its own employee.
+RANKING_PRIOR_MEAN = float(os.environ.get("PALAYAN_RANKING_PRIOR_MEAN", 3.0))
+RANKING_PRIOR_WEIGHT = float(os.environ.get("PALAYAN_RANKING_PRIOR_WEIGHT", 10))
+
+# Rendered word clouds kept in the LRU cache, and an optional folder to also keep them on disk
+WORD_CLOUD_CACHE_SIZE = int(os.environ.get("PALAYAN_WORD_CLOUD_CACHE_SIZE", 256))
+WORD_CLOUD_CACHE_DIR = os.environ.get("PALAYAN_WORD_CLOUD_CACHE_DIR", "")
+# Most frequent words drawn in a word cloud
+WORD_CLOUD_MAX_WORDS = int(os.environ.get("PALAYAN_WORD_CLOUD_MAX_WORDS", 200))
+
+# Folder of the Parquet archive written by `python manage.py export-parquet`; empty disables it.
+# When set, dashboard reads of months already archived come from the files instead of the tables.
+EXPORT_DIR = os.environ.get("PALAYAN_EXPORT_DIR", "")
+
+# File the comment search index is saved to and loaded from; empty keeps it in memory only
+SEARCH_INDEX_PATH = os.environ.get("PALAYAN_SEARCH_INDEX_PATH", "")
+# Seconds after which a search first pulls comments written by other processes into the index
+SEARCH_SYNC_INTERVAL = float(os.environ.get("PALAYAN_SEARCH_SYNC_INTERVAL", 60))
@@ -1,11 +1,106 @@
 # app/core/db.py
-import streamlit as st
-from supabase import create_client
+import threading
+
+from core import config
+from core.cache import get_read_cache
+from core.backends import StorageBackend
+
+_backend = None
+_async_backend = None
+_backend_lock = threading.Lock()
+
 
-@st.cache_resource
 def init_connection():
+    # Imported on first connection: the Supabase client takes longer to import than most pages
+    # to render. The client is created once per process, get_backend() keeps it.
+    import streamlit as st
+    from supabase import create_client
+
     url = st.secrets["SUPABASE_URL"]
     key = st.secrets["SUPABASE_KEY"]
     return create_client(url, key)
 
-supabase = init_connection()
\ No newline at end of file
+
+def _http_options() -> dict:
+    """Timeouts and connection pool limits of the Supabase clients, from core.config."""
+    import httpx
+    return {
+        "timeout": httpx.Timeout(config.HTTP_READ_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT, pool=config.HTTP_POOL_TIMEOUT),
+        "limits": httpx.Limits(max_connections=config.HTTP_POOL_SIZE, max_keepalive_connections=config.HTTP_POOL_SIZE),
+    }
+
+
+def create_backend() -> StorageBackend:
+    """
+    Builds the backend selected in core.config, wrapped with the local replica
+    if one is configured and with request metrics, retries and the circuit
+    breaker unless PALAYAN_BACKEND_INSTRUMENTATION is false.
+    """
+    from core.backends import InstrumentedBackend, ReplicatedBackend, SQLiteBackend, SupabaseBackend
+    from core.backends.instrumented import CircuitBreaker
+
+    if config.STORAGE_BACKEND == "sqlite":
+        backend = SQLiteBackend(config.SQLITE_PATH)
+    elif config.STORAGE_BACKEND == "supabase":
+        backend = SupabaseBackend(init_connection(), supports_aggregates=config.SUPABASE_AGGREGATES, **_http_options())
+    else:
+        raise ValueError(f"Unknown storage backend: {config.STORAGE_BACKEND}")
+
+    if config.REPLICA_PATH:
+        backend = ReplicatedBackend(backend, SQLiteBackend(config.REPLICA_PATH), config.REPLICA_TABLES)
+    if config.BACKEND_INSTRUMENTATION:
+        breaker = CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_SECONDS)
+        backend = InstrumentedBackend(backend, read_retries=config.READ_RETRIES, breaker=breaker)
+    return backend
+
+
+def get_backend() -> StorageBackend:
+    """Returns the process-wide backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def create_async_backend(backend: StorageBackend):
+    """
+    Builds the async backend matching a synchronous one. A plain Supabase
+    backend gets postgrest's async client with the same pool settings and
+    circuit breaker; anything else (SQLite, the local replica) runs its
+    requests in worker threads.
+    """
+    from core.backends import AsyncSupabaseBackend, InstrumentedBackend, SupabaseBackend, ThreadedAsyncBackend
+
+    inner = getattr(backend, "inner", backend)
+    if not isinstance(inner, SupabaseBackend):
+        return ThreadedAsyncBackend(backend)
+
+    async_backend = AsyncSupabaseBackend(inner.client, supports_aggregates=inner.supports_aggregates, **_http_options())
+    if isinstance(backend, InstrumentedBackend):
+        # One breaker for both clients: an outage seen by either fails both fast
+        async_backend = InstrumentedBackend(async_backend, read_retries=backend.read_retries, breaker=backend.breaker, metrics=backend.metrics)
+    return async_backend
+
+
+def get_async_backend():
+    """Returns the process-wide async backend (see core.aio), built from get_backend() on first use."""
+    global _async_backend
+    if _async_backend is None:
+        backend = get_backend()
+        with _backend_lock:
+            if _async_backend is None:
+                _async_backend = create_async_backend(backend)
+    return _async_backend
+
+
+def set_backend(backend: StorageBackend):
+    """Replaces the process-wide backend, e.g. with a SQLiteBackend for offline runs."""
+    global _backend, _async_backend
+    with _backend_lock:
+        _backend = backend
+        # Rebuilt from the new backend on next use
+        _async_backend = None
+    # Reads cached so far came from the old backend
+    get_read_cache().invalidate()
@@ -0,0 +1,131 @@
+"""
+Row change event sources for in-memory indexes such as ActiveQueueIndex.
+
+A source calls its callback with one dict per change, in the shape of a
+Supabase Realtime postgres_changes payload:
+
+    {"type": "INSERT" | "UPDATE" | "DELETE", "table": "queues", "record": {...}, "old_record": {...}}
+
+Changes made while a source is disconnected are never delivered, so after it
+reconnects it calls its `on_resync` callback for the index to re-read its rows.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[Dict[str, Any]], None]
+ResyncCallback = Callable[[], None]
+# Seconds between attempts to reconnect a dropped subscription, doubling up to the maximum
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+
+
+def normalize_change(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattens a Realtime payload (which nests the change under "data") into the event shape above."""
+    data = payload.get("data", payload)
+    return {
+        "type": (data.get("type") or data.get("eventType") or "").upper(),
+        "table": data.get("table"),
+        "record": data.get("record") or data.get("new") or {},
+        "old_record": data.get("old_record") or data.get("old") or {},
+    }
+
+
+class FakeEventSource:
+    """In-process event source for tests and offline runs: `emit()` delivers a change synchronously."""
+
+    def __init__(self):
+        self.callbacks: List[ChangeCallback] = []
+        self.resync_callbacks: List[ResyncCallback] = []
+
+    def start(self, callback: ChangeCallback, on_resync: ResyncCallback = None) -> "FakeEventSource":
+        self.callbacks.append(callback)
+        if on_resync is not None:
+            self.resync_callbacks.append(on_resync)
+        return self
+
+    def emit(self, event_type: str, record: Dict[str, Any] = None, old_record: Dict[str, Any] = None, table: str = "queues"):
+        event = {"type": event_type.upper(), "table": table, "record": record or {}, "old_record": old_record or {}}
+        for callback in self.callbacks:
+            callback(event)
+
+    def reconnect(self):
+        """Simulates a dropped and restored connection: the events in between are lost, then listeners resync."""
+        for on_resync in self.resync_callbacks:
+            on_resync()
+
+    def close(self):
+        self.callbacks.clear()
+        self.resync_callbacks.clear()
+
+
+class SupabaseRealtimeSource:
+    """
+    Streams postgres_changes for one table from Supabase Realtime on a
+    background thread with its own event loop. The table must be in the
+    supabase_realtime publication (see supabase/migrations). A dropped
+    connection is retried with backoff and `on_resync` runs after every
+    reconnect.
+    """
+
+    def __init__(self, url: str, key: str, table: str, schema: str = "public"):
+        self.url = f"{url.rstrip('/')}/realtime/v1"
+        self.key = key
+        self.table = table
+        self.schema = schema
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._closed = False
+
+    def start(self, callback: ChangeCallback, on_resync: ResyncCallback = None) -> "SupabaseRealtimeSource":
+        ready = threading.Event()
+        thread = threading.Thread(target=self._run, args=(callback, on_resync, ready), name=f"realtime-{self.table}", daemon=True)
+        thread.start()
+        ready.wait(timeout=10)
+        return self
+
+    def _run(self, callback: ChangeCallback, on_resync: Optional[ResyncCallback], ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        subscribed, delay = ready, RECONNECT_DELAY
+        while not self._closed:
+            try:
+                # The first subscription comes before the seed read; later ones follow a gap in the events
+                self._loop.run_until_complete(self._listen(callback, subscribed, None if subscribed is ready else on_resync))
+            except Exception:
+                logger.exception("Realtime subscription to %s ended", self.table)
+            delay = RECONNECT_DELAY if subscribed.is_set() else min(delay * 2, MAX_RECONNECT_DELAY)
+            ready.set()
+            if self._closed:
+                break
+            time.sleep(delay)
+            subscribed = threading.Event()
+
+    async def _listen(self, callback: ChangeCallback, subscribed: threading.Event, on_resync: Optional[ResyncCallback]):
+        from realtime import AsyncRealtimeClient
+
+        def on_change(payload):
+            try:
+                callback(normalize_change(payload))
+            except Exception:
+                logger.exception("Failed to apply %s change", self.table)
+
+        self._client = AsyncRealtimeClient(self.url, self.key)
+        await self._client.connect()
+        channel = self._client.channel(f"{self.schema}:{self.table}")
+        await channel.on_postgres_changes("*", callback=on_change, table=self.table, schema=self.schema).subscribe()
+        subscribed.set()
+        if on_resync is not None:
+            try:
+                await asyncio.to_thread(on_resync)
+            except Exception:
+                logger.exception("Failed to resync %s after reconnecting", self.table)
+        await self._client.listen()
+
+    def close(self):
+        self._closed = True
+        if self._loop and self._client:
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop)
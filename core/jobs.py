@@ -0,0 +1,39 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Runs a function every `interval` seconds on a daemon thread.
+
+    Errors are logged and the job keeps its schedule, so one failed run
+    (e.g. a network blip) does not stop later ones. `stop()` ends the loop
+    without waiting for the next tick.
+    """
+
+    def __init__(self, name: str, function: Callable[[], object], interval: float):
+        self.name = name
+        self.function = function
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "PeriodicJob":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.function()
+                logger.debug("%s finished: %s", self.name, result)
+            except Exception:
+                logger.exception("%s failed", self.name)
+            self._stop.wait(self.interval)
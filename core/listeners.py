@@ -0,0 +1,34 @@
+import logging
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class ListenerRegistry:
+    """
+    Class-level listener registry for services that tell other objects in
+    the process about their writes. A service declares its own `_listeners`
+    list, so each service notifies only its own listeners, and calls
+    `notify_listeners(hook, *args)` after a write; every listener implements
+    the hooks of the services it is added to. A failing listener is logged
+    and skipped, since the write it hears about has already been saved.
+    """
+    _listeners: List[Any]
+
+    @classmethod
+    def add_listener(cls, listener):
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener):
+        if listener in cls._listeners:
+            cls._listeners.remove(listener)
+
+    @classmethod
+    def notify_listeners(cls, hook: str, *args):
+        for listener in list(cls._listeners):
+            try:
+                getattr(listener, hook)(*args)
+            except Exception:
+                logger.exception("Listener %r of %s failed in %s", listener, cls.__name__, hook)
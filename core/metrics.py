@@ -0,0 +1,124 @@
+"""
+In-process request metrics of the storage backend: call, error and retry
+counts and a latency histogram per table and operation, recorded by
+InstrumentedBackend and shown on the admin dashboard.
+"""
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds of the latency buckets in milliseconds; one more bucket holds anything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """
+    Counts of latencies in fixed, roughly logarithmic buckets. Memory does
+    not grow with the number of requests; percentiles are read off the
+    buckets, so they are accurate to a bucket's width.
+    """
+
+    def __init__(self, bounds_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The upper bound of the bucket holding the given fraction of requests (the max for the last bucket)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds_ms[index], self.max_ms) if index < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.total_ms / self.count if self.count else None
+
+
+class OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+
+
+class BackendMetrics:
+    """Thread-safe OperationStats per (table, operation), e.g. ("ratings", "select") or ("register_client_with_queue", "rpc")."""
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, table: str, operation: str) -> OperationStats:
+        key = (table, operation)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = OperationStats()
+        return stats
+
+    def record(self, table: str, operation: str, seconds: float, error: bool = False):
+        """Records one request attempt and how long it took."""
+        with self._lock:
+            stats = self._get(table, operation)
+            stats.calls += 1
+            stats.errors += error
+            stats.latency.observe(seconds * 1000)
+
+    def record_retry(self, table: str, operation: str):
+        with self._lock:
+            self._get(table, operation).retries += 1
+
+    def record_rejected(self, table: str, operation: str):
+        """Counts a request refused by the open circuit breaker without reaching the backend."""
+        with self._lock:
+            self._get(table, operation).rejected += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One row per table and operation, the most total time first."""
+        with self._lock:
+            rows = [
+                {
+                    "table": table,
+                    "operation": operation,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "rejected": stats.rejected,
+                    "total_ms": round(stats.latency.total_ms, 1),
+                    "mean_ms": round(stats.latency.mean_ms, 1) if stats.latency.count else None,
+                    "p50_ms": stats.latency.percentile(0.5),
+                    "p95_ms": stats.latency.percentile(0.95),
+                    "p99_ms": stats.latency.percentile(0.99),
+                    "max_ms": round(stats.latency.max_ms, 1),
+                    "histogram": dict(zip([f"<={bound}" for bound in stats.latency.bounds_ms] + [">"], stats.latency.counts)),
+                }
+                for (table, operation), stats in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+_metrics = BackendMetrics()
+
+
+def get_metrics() -> BackendMetrics:
+    """The process-wide backend metrics."""
+    return _metrics
@@ -0,0 +1,225 @@
+"""
+Node-local store of Arrow tables shared by the server processes of one host.
+
+Each entry is an Arrow IPC file that readers memory-map, so every process
+reads the same pages of the OS page cache instead of holding its own copy
+of the table. A small SQLite catalog next to the files keeps each entry's
+version counter, the tables it was built from and a writer lease, so one
+process refreshes the entries while the others only read them.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from core import config
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+CATALOG_NAME = "catalog.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    file TEXT,
+    rows INTEGER,
+    sources TEXT NOT NULL DEFAULT '',
+    -- Bumped by every write to a source table; the entry is fresh while built_generation matches it
+    generation INTEGER NOT NULL DEFAULT 0,
+    built_generation INTEGER NOT NULL DEFAULT -1,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """
+    Versioned Arrow tables in a directory shared by the processes of a node.
+
+    A writer publishes an entry with `begin_build` then `publish`: the table
+    is written to a new file and the catalog row's version is bumped in one
+    transaction. Readers look the version up on every `read` (one indexed
+    SQLite query) and map the file again only when it changed.
+
+    Writes to a table an entry was built from call `invalidate`, which
+    marks the entry stale until it is published again; `read` returns None
+    for stale entries so callers fall back to the database. A build that
+    raced with such a write publishes its table but stays stale.
+
+    Args:
+        directory: Folder for the catalog and the table files, created if missing.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._mapped: Dict[str, Tuple[int, "pa.Table"]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One autocommit connection per thread; the catalog is tiny and only ever locked briefly."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(os.path.join(self.directory, CATALOG_NAME), timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    # --- Reading ---
+
+    def entry(self, name: str) -> Optional[Dict[str, Any]]:
+        """The catalog row of an entry: version, rows, sources, freshness and age in seconds."""
+        row = self._connection().execute(
+            "SELECT version, file, rows, sources, generation, built_generation, updated_at FROM entries WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        version, file_name, rows, sources, generation, built_generation, updated_at = row
+        return {
+            "version": version,
+            "file": file_name,
+            "rows": rows,
+            "sources": [source for source in sources.split(",") if source],
+            "fresh": file_name is not None and built_generation == generation,
+            "age": time.time() - updated_at if updated_at else None,
+        }
+
+    def read(self, name: str) -> Optional["pa.Table"]:
+        """The latest published table of an entry, memory-mapped; None if it is missing or stale."""
+        # Loaded on first read so that repositories, which invalidate entries, import quickly
+        import pyarrow as pa
+
+        entry = self.entry(name)
+        if entry is None or not entry["fresh"]:
+            return None
+        with self._lock:
+            mapped = self._mapped.get(name)
+            if mapped is not None and mapped[0] == entry["version"]:
+                return mapped[1]
+        try:
+            source = pa.memory_map(os.path.join(self.directory, entry["file"]), "r")
+        except FileNotFoundError:
+            return None  # replaced and cleaned up since the catalog was read
+        table = pa.ipc.open_file(source).read_all()
+        with self._lock:
+            self._mapped[name] = (entry["version"], table)
+        return table
+
+    # --- Writing ---
+
+    def begin_build(self, name: str, sources: Iterable[str]) -> int:
+        """Registers an entry and its source tables; returns the generation to hand to `publish`."""
+        connection = self._connection()
+        connection.execute(
+            "INSERT INTO entries (name, sources) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET sources = excluded.sources",
+            (name, ",".join(sources)),
+        )
+        return connection.execute("SELECT generation FROM entries WHERE name = ?", (name,)).fetchone()[0]
+
+    def publish(self, name: str, table: "pa.Table", generation: int) -> int:
+        """Writes the table as the entry's next version and returns that version."""
+        import pyarrow as pa
+
+        temp_path = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}.arrow")
+        with pa.OSFile(temp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("SELECT version FROM entries WHERE name = ?", (name,)).fetchone()[0] + 1
+            file_name = f"{name}-{version}.arrow"
+            os.replace(temp_path, os.path.join(self.directory, file_name))
+            connection.execute(
+                "UPDATE entries SET version = ?, file = ?, rows = ?, built_generation = ?, updated_at = ? WHERE name = ?",
+                (version, file_name, table.num_rows, generation, time.time(), name),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._remove_old_files(name, version)
+        return version
+
+    def _remove_old_files(self, name: str, version: int):
+        # The previous version is kept for readers that looked the catalog up just before the swap
+        for file_name in os.listdir(self.directory):
+            prefix, _, suffix = file_name.rpartition("-")
+            if prefix != name or not suffix.endswith(".arrow"):
+                continue
+            try:
+                if int(suffix[:-len(".arrow")]) < version - 1:
+                    os.remove(os.path.join(self.directory, file_name))
+            except (ValueError, OSError):
+                pass  # not ours, or still mapped on a platform that forbids removing it
+
+    def invalidate(self, *tables: str):
+        """Marks the entries built from any of these tables stale until they are published again."""
+        connection = self._connection()
+        rows = connection.execute("SELECT name, sources FROM entries").fetchall()
+        names = [name for name, sources in rows if set(sources.split(",")) & set(tables)]
+        if names:
+            connection.executemany("UPDATE entries SET generation = generation + 1 WHERE name = ?", [(name,) for name in names])
+
+    def acquire_lease(self, seconds: float, name: str = "writer") -> bool:
+        """Takes or renews the writer lease unless another live process holds it."""
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+            (name, self.owner, now + seconds, now),
+        )
+        return connection.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()[0] == self.owner
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per entry: version, rows, whether it is fresh and when it was last published."""
+        result = {}
+        for (name,) in self._connection().execute("SELECT name FROM entries ORDER BY name").fetchall():
+            entry = self.entry(name)
+            result[name] = {
+                "version": entry["version"],
+                "rows": entry["rows"],
+                "fresh": entry["fresh"],
+                "updated_at": datetime.fromtimestamp(time.time() - entry["age"]) if entry["age"] is not None else None,
+            }
+        return result
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """The node's shared cache when PALAYAN_SHARED_CACHE_DIR is set, otherwise None."""
+    global _shared_cache
+    if _shared_cache is None and config.SHARED_CACHE_DIR:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SharedCache(config.SHARED_CACHE_DIR)
+    return _shared_cache
+
+
+def set_shared_cache(cache: Optional[SharedCache]):
+    """Replaces the process-wide shared cache; None goes back to the configured one."""
+    global _shared_cache
+    with _shared_cache_lock:
+        _shared_cache = cache
@@ -0,0 +1,159 @@
+"""
+Maintenance commands for the Feedback Hub, run from the project root:
+
+    python manage.py reconcile-summaries [--dry-run]
+    python manage.py reconcile-terms [--dry-run]
+    python manage.py sync-replica [--table employees ...]
+    python manage.py expire-queues [--max-age-hours 12]
+    python manage.py refresh-rollups [--rebuild]
+    python manage.py build-search-index [--rebuild]
+    python manage.py export-parquet [--table ratings ...] [--rebuild] [--dir PATH]
+    python manage.py refresh-shared-cache [--force]
+"""
+import argparse
+import sys
+
+
+def reconcile_summaries(args) -> int:
+    from services.rating_summary_service import RatingSummaryService
+
+    drift = RatingSummaryService().reconcile(apply=not args.dry_run)
+    for entry in drift:
+        print(f"{entry['emp_id']}: stored {entry['stored_count']} ratings, expected {entry['expected_count']}")
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(drift)} drifted rating summaries {action}.")
+    # Non-zero exit on a dry run lets a scheduled check alert on drift
+    return 1 if drift and args.dry_run else 0
+
+
+def reconcile_terms(args) -> int:
+    from services.comment_terms_service import CommentTermsService
+
+    drift = CommentTermsService().reconcile(apply=not args.dry_run)
+    for entry in drift:
+        print(f"{entry['emp_id']}: stored {entry['stored_count']} comments, expected {entry['expected_count']}")
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(drift)} drifted comment term tables {action}.")
+    return 1 if drift and args.dry_run else 0
+
+
+def sync_replica(args) -> int:
+    from core.backends import ReplicatedBackend
+    from core.db import get_backend
+
+    backend = get_backend()
+    # Look through the metrics wrapper, if any
+    backend = getattr(backend, "inner", backend)
+    if not isinstance(backend, ReplicatedBackend):
+        print("No replica configured, set PALAYAN_REPLICA_PATH.")
+        return 1
+    for table, count in backend.sync(args.table or None).items():
+        print(f"{table}: {count} rows")
+    return 0
+
+
+def expire_queues(args) -> int:
+    from services.queue_service import QueueService
+
+    expired = QueueService().expire_stale_queues(args.max_age_hours)
+    print(f"{expired} stale queues ended.")
+    return 0
+
+
+def refresh_rollups(args) -> int:
+    from services.rollup_service import RollupService
+
+    service = RollupService()
+    result = service.rebuild() if args.rebuild else service.refresh()
+    print(f"{result['days']} days recomputed, watermark {result['watermark']}.")
+    return 0
+
+
+def build_search_index(args) -> int:
+    from core.config import SEARCH_INDEX_PATH
+    from services.comment_search_service import CommentSearchService
+    from utils.data.search_index import CommentIndex
+
+    if not SEARCH_INDEX_PATH:
+        print("No index file configured, set PALAYAN_SEARCH_INDEX_PATH.")
+        return 1
+    service = CommentSearchService(index=CommentIndex() if args.rebuild else None)
+    added = service.sync()
+    print(f"{added} comments indexed, {len(service.index)} in total, watermark {service.index.watermark_datetime}.")
+    return 0
+
+
+def export_parquet(args) -> int:
+    from core.config import EXPORT_DIR
+    from services.export_service import ExportService
+
+    directory = args.dir or EXPORT_DIR
+    if not directory:
+        print("No export directory configured, set PALAYAN_EXPORT_DIR or pass --dir.")
+        return 1
+    for table, result in ExportService(directory).export(args.table, rebuild=args.rebuild).items():
+        print(f"{table}: {result['rows']} rows in {result['months']} months, watermark {result['watermark']}")
+    return 0
+
+
+def refresh_shared_cache(args) -> int:
+    from core.shared_cache import get_shared_cache
+    from services.shared_reference_service import SharedReferenceService
+
+    cache = get_shared_cache()
+    if cache is None:
+        print("No shared cache configured, set PALAYAN_SHARED_CACHE_DIR.")
+        return 1
+    published = SharedReferenceService(cache).refresh(force=args.force)
+    if not published:
+        print("Nothing published: the entries are fresh or another process holds the writer lease.")
+    for name, entry in cache.stats().items():
+        marker = " (published)" if name in published else ""
+        print(f"{name}: version {entry['version']}, {entry['rows']} rows, {'fresh' if entry['fresh'] else 'stale'}, updated {entry['updated_at']}{marker}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Palayan Citizen Feedback Hub maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = commands.add_parser("reconcile-summaries", help="Rebuild rating summaries from the ratings table and report drift")
+    reconcile.add_argument("--dry-run", action="store_true", help="Only report drift, do not write")
+    reconcile.set_defaults(handler=reconcile_summaries)
+
+    terms = commands.add_parser("reconcile-terms", help="Recount comment word frequencies from the ratings table and report drift")
+    terms.add_argument("--dry-run", action="store_true", help="Only report drift, do not write")
+    terms.set_defaults(handler=reconcile_terms)
+
+    replica = commands.add_parser("sync-replica", help="Refresh the node-local replica of the reference tables")
+    replica.add_argument("--table", action="append", help="Only sync this table (repeatable)")
+    replica.set_defaults(handler=sync_replica)
+
+    expire = commands.add_parser("expire-queues", help="End queues left open longer than the configured age")
+    expire.add_argument("--max-age-hours", type=float, help="Override PALAYAN_QUEUE_MAX_AGE_HOURS")
+    expire.set_defaults(handler=expire_queues)
+
+    rollups = commands.add_parser("refresh-rollups", help="Bring the daily dashboard rollups up to date")
+    rollups.add_argument("--rebuild", action="store_true", help="Recompute from the start of history")
+    rollups.set_defaults(handler=refresh_rollups)
+
+    search = commands.add_parser("build-search-index", help="Index new rating comments into the search index file")
+    search.add_argument("--rebuild", action="store_true", help="Index every comment again from scratch")
+    search.set_defaults(handler=build_search_index)
+
+    export = commands.add_parser("export-parquet", help="Write new months of ratings, queues and clients to the Parquet archive")
+    export.add_argument("--table", action="append", choices=["employees", "clients", "queues", "ratings"], help="Only export this table (repeatable)")
+    export.add_argument("--rebuild", action="store_true", help="Drop the archived tables and export everything again")
+    export.add_argument("--dir", help="Override PALAYAN_EXPORT_DIR")
+    export.set_defaults(handler=export_parquet)
+
+    shared = commands.add_parser("refresh-shared-cache", help="Rebuild the node's shared employees, offices and leaderboard")
+    shared.add_argument("--force", action="store_true", help="Rebuild every entry even if it is fresh")
+    shared.set_defaults(handler=refresh_shared_cache)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from uuid import UUID as PyUUID
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from models.models import Client, Employee, Office, Queue, Rating, RATING_CRITERIA
+from utils.data.timestamps import parse_timestamps
+
+# Rows converted to Python objects at a time when iterating a batch
+_ITER_CHUNK = 1024
+
+# ASCII code -> hex digit value, for decoding UUID strings without parsing each one
+_HEX_VALUES = np.zeros(256, dtype=np.uint8)
+for _digit, _char in enumerate(b"0123456789abcdef"):
+    _HEX_VALUES[_char] = _digit
+    _HEX_VALUES[ord(chr(_char).upper())] = _digit
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+# Positions of the 32 hex digits in the 36-character UUID form
+_UUID_DIGITS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+UUID_TYPE = pa.binary(16)
+# For id columns with few distinct values (e.g. the rated employee): 4 bytes per row instead of 16
+UUID_DICTIONARY_TYPE = pa.dictionary(pa.int32(), UUID_TYPE)
+
+
+def is_uuid_type(data_type: pa.DataType) -> bool:
+    return data_type == UUID_TYPE or data_type == UUID_DICTIONARY_TYPE
+
+
+def encode_uuids(values: List[Any]) -> pa.FixedSizeBinaryArray:
+    """
+    Packs UUIDs (strings or UUID objects, None for null) into a 16-byte
+    fixed-width Arrow array, decoding the hex digits of all values at once.
+    """
+    valid = np.array([value is not None and value != "" for value in values], dtype=bool)
+    text = np.array([str(value) if ok else "0" * 36 for value, ok in zip(values, valid)], dtype="S36")
+    digits = _HEX_VALUES[text.view(np.uint8).reshape(len(values), 36)[:, _UUID_DIGITS]]
+    packed = (digits[:, 0::2] << 4) | digits[:, 1::2]
+    validity = None if valid.all() else pa.py_buffer(np.packbits(valid, bitorder="little"))
+    return pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(values), [validity, pa.py_buffer(packed.tobytes())])
+
+
+def decode_uuid_strings(array: Union[pa.Array, pa.ChunkedArray]) -> np.ndarray:
+    """The canonical string form of a 16-byte UUID column as an object array, None for null."""
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks() if array.num_chunks else pa.array([], array.type)
+    if array.type == UUID_DICTIONARY_TYPE:
+        strings = decode_uuid_strings(array.dictionary)[np.asarray(array.indices.fill_null(0))]
+        if array.null_count:
+            strings[~np.asarray(array.is_valid())] = None
+        return strings
+    count = len(array)
+    packed = np.frombuffer(array.buffers()[1], dtype=np.uint8, count=count * 16, offset=array.offset * 16).reshape(count, 16)
+    text = np.full((count, 36), ord("-"), dtype=np.uint8)
+    text[:, _UUID_DIGITS[0::2]] = _HEX_DIGITS[packed >> 4]
+    text[:, _UUID_DIGITS[1::2]] = _HEX_DIGITS[packed & 0x0F]
+    strings = text.view("S36").ravel().astype(str).astype(object)
+    if array.null_count:
+        strings[~np.asarray(array.is_valid())] = None
+    return strings
+
+
+class RecordBatch:
+    """
+    Columnar rows of one table, held in a pyarrow Table instead of one
+    dataclass per row.
+
+    Id columns are stored as 16-byte binary, timestamps as microsecond
+    timestamps and scores as small integers, all decoded vectorized page by
+    page. A batch behaves like a read-only list of models: `len`, indexing
+    and iteration build `model` objects only for the rows asked for, while
+    `column` and `to_pandas` hand out whole columns for analytics.
+    """
+    model = None
+    # Arrow type of each column, in the model's field order
+    column_types: Dict[str, pa.DataType] = {}
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+
+    @classmethod
+    def empty(cls) -> "RecordBatch":
+        return cls(pa.schema(list(cls.column_types.items())).empty_table())
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "RecordBatch":
+        """Builds a batch from raw rows; columns missing from the rows are left out."""
+        if not rows:
+            return cls.empty()
+        arrays, names = [], []
+        for name, data_type in cls.column_types.items():
+            if name not in rows[0]:
+                continue
+            values = [row.get(name) for row in rows]
+            if data_type == UUID_TYPE:
+                arrays.append(encode_uuids(values))
+            elif data_type == UUID_DICTIONARY_TYPE:
+                arrays.append(encode_uuids(values).dictionary_encode().cast(data_type))
+            elif pa.types.is_timestamp(data_type):
+                arrays.append(pa.array(parse_timestamps(values), type=data_type, from_pandas=True))
+            else:
+                arrays.append(pa.array(values, type=data_type))
+            names.append(name)
+        return cls(pa.Table.from_arrays(arrays, names=names))
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[List[Dict[str, Any]]]) -> "RecordBatch":
+        """Builds a batch from pages of raw rows, converting each page as it arrives."""
+        tables = [cls.from_rows(page).table for page in pages if page]
+        if not tables:
+            return cls.empty()
+        # Each page has its own dictionaries, merge them before combining the pages
+        return cls(pa.concat_tables(tables).unify_dictionaries().combine_chunks())
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    @property
+    def column_names(self) -> List[str]:
+        return self.table.column_names
+
+    def _models(self, table: pa.Table) -> List[Any]:
+        columns = {}
+        # Extra columns, e.g. partition keys read from an archive, are not model fields
+        for name in (name for name in table.column_names if name in self.column_types):
+            values = table.column(name).to_pylist()
+            if is_uuid_type(table.schema.field(name).type):
+                values = [PyUUID(bytes=value) if value is not None else None for value in values]
+            columns[name] = values
+        names = list(columns)
+        return [self.model(**dict(zip(names, row))) for row in zip(*columns.values())]
+
+    def __iter__(self) -> Iterator[Any]:
+        for offset in range(0, len(self), _ITER_CHUNK):
+            yield from self._models(self.table.slice(offset, _ITER_CHUNK))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return type(self)(self.table.take(list(range(start, stop, step))))
+            return type(self)(self.table.slice(start, max(stop - start, 0)))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("batch index out of range")
+        return self._models(self.table.slice(key, 1))[0]
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        One column as a NumPy array: ids as canonical strings (None for null),
+        timestamps as datetime64[us] (NaT for null), numbers as float where
+        the column has nulls.
+        """
+        array = self.table.column(name)
+        if is_uuid_type(array.type):
+            return decode_uuid_strings(array)
+        return array.to_numpy(zero_copy_only=False)
+
+    def filter(self, mask: np.ndarray) -> "RecordBatch":
+        return type(self)(self.table.filter(pa.array(mask, type=pa.bool_())))
+
+    def to_pandas(self):
+        """A DataFrame with one column per stored column; ids become strings."""
+        import pandas as pd
+        return pd.DataFrame({name: self.column(name) for name in self.column_names})
+
+
+class RatingBatch(RecordBatch):
+    model = Rating
+    column_types = {
+        "rating_id": UUID_TYPE,
+        "queue_id": pa.int64(),
+        "emp_id": UUID_DICTIONARY_TYPE,
+        **{criterion: pa.int8() for criterion in RATING_CRITERIA},
+        "comments": pa.string(),
+        "created_at": pa.timestamp("us"),
+    }
+
+    def scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The criteria as an int8 (n, 4) array and the boolean mask of scores present."""
+        columns = [self.table.column(criterion) for criterion in RATING_CRITERIA]
+        mask = np.column_stack([np.asarray(column.is_valid()) for column in columns]).reshape(len(self), len(RATING_CRITERIA))
+        scores = np.column_stack([column.fill_null(0).to_numpy() for column in columns]).reshape(len(self), len(RATING_CRITERIA))
+        return scores.astype(np.int8), mask
+
+    def to_matrix(self):
+        """The RatingMatrix of the rows that name an employee, built from the columns directly."""
+        from utils.data.rating_matrix import RatingMatrix
+
+        rated = self.filter(np.asarray(self.table.column("emp_id").is_valid()))
+        # Re-encoded so the filtered rows' dictionary holds only employees that occur
+        encoded = pc.dictionary_encode(rated.table.column("emp_id").cast(UUID_TYPE)).combine_chunks()
+        emp_ids = [PyUUID(bytes=value) for value in encoded.dictionary.to_pylist()]
+        scores, mask = rated.scores()
+        if "created_at" in rated.column_names:
+            created_at = rated.table.column("created_at").to_numpy(zero_copy_only=False).astype("datetime64[us]")
+        else:
+            created_at = np.full(len(rated), np.datetime64("NaT"), dtype="datetime64[us]")
+        return RatingMatrix(emp_ids, encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32), scores, mask, created_at)
+
+
+class QueueBatch(RecordBatch):
+    model = Queue
+    column_types = {
+        "queue_id": pa.int64(),
+        "client_id": UUID_TYPE,
+        "created_at": pa.timestamp("us"),
+        "ended_at": pa.timestamp("us"),
+    }
+
+    def service_seconds(self) -> np.ndarray:
+        """Seconds from creation to end per queue, NaN for queues still open."""
+        created_at = self.table.column("created_at").to_numpy(zero_copy_only=False).astype("datetime64[us]")
+        ended_at = self.table.column("ended_at").to_numpy(zero_copy_only=False).astype("datetime64[us]")
+        return (ended_at - created_at) / np.timedelta64(1, "s")
+
+
+class ClientBatch(RecordBatch):
+    model = Client
+    column_types = {
+        "client_id": UUID_TYPE,
+        "first_name": pa.string(),
+        "last_name": pa.string(),
+        "created_at": pa.timestamp("us"),
+    }
+
+
+class EmployeeBatch(RecordBatch):
+    model = Employee
+    column_types = {
+        "emp_id": UUID_TYPE,
+        "first_name": pa.string(),
+        "last_name": pa.string(),
+        "office": pa.string(),
+        "position": pa.string(),
+        "created_at": pa.timestamp("us"),
+    }
+
+
+class OfficeBatch(RecordBatch):
+    model = Office
+    column_types = {
+        "office_id": UUID_TYPE,
+        "name": pa.string(),
+    }
@@ -1,9 +1,38 @@
 # app/models/models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID as PyUUID
 
+# Rating columns scored 1-5 by clients, in display order
+RATING_CRITERIA = ("first_criteria", "second_criteria", "third_criteria", "fourth_criteria")
+# Orders of the office drill-down (EmployeeRepository.get_office_drilldown); "name" sorts by last then first name
+OFFICE_DRILLDOWN_SORTS = ("overall", "rating_count") + RATING_CRITERIA + ("name",)
+
+
+def build_aggregate(emp_id: Optional[PyUUID], sums: Dict[str, int], counts: Dict[str, int], rating_count: int) -> Dict[str, Any]:
+    """
+    Builds the per-employee rating aggregate from criteria sums and counts:
+    the criteria averages, the overall score, and the totals they came from.
+    """
+    averages = {
+        criterion: sums.get(criterion, 0) / counts[criterion] if counts.get(criterion) else 0
+        for criterion in RATING_CRITERIA
+    }
+    return {
+        "emp_id": emp_id,
+        "rating_count": rating_count,
+        "sums": dict(sums),
+        "counts": dict(counts),
+        **averages,
+        "overall": sum(averages.values()) / len(RATING_CRITERIA)
+    }
+
+
+def empty_aggregate(emp_id: Optional[PyUUID] = None) -> Dict[str, Any]:
+    """Aggregate for an employee without any ratings."""
+    return build_aggregate(emp_id, dict.fromkeys(RATING_CRITERIA, 0), dict.fromkeys(RATING_CRITERIA, 0), 0)
+
 @dataclass
 class Admin:
     admin_id: PyUUID
@@ -45,7 +74,8 @@ class Employee:
             "last_name": self.last_name,
             "office": self.office,
             "position": self.position,
-            "created_at": self.created_at
+            # Employees read from a batch (e.g. the shared cache) carry datetimes, rows from the API strings
+            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
         }
     
     @classmethod
@@ -137,6 +167,102 @@ class Rating:
             data["emp_id"] = PyUUID(data["emp_id"])
         return cls(**data)
 
+@dataclass
+class RatingSummary:
+    """
+    Running totals of one employee's ratings, updated as each rating is written.
+    histograms[criterion][i] counts the scores equal to i + 1.
+    """
+    emp_id: PyUUID
+    rating_count: int = 0
+    sums: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(RATING_CRITERIA, 0))
+    counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(RATING_CRITERIA, 0))
+    histograms: Dict[str, List[int]] = field(default_factory=lambda: {c: [0] * 5 for c in RATING_CRITERIA})
+    updated_at: Optional[datetime] = None
+    
+    def add_rating(self, rating: Rating):
+        self.rating_count += 1
+        for criterion in RATING_CRITERIA:
+            value = getattr(rating, criterion)
+            if value is None:
+                continue
+            self.sums[criterion] += value
+            self.counts[criterion] += 1
+            if 1 <= value <= 5:
+                self.histograms[criterion][value - 1] += 1
+    
+    def averages(self) -> Dict[str, Any]:
+        return build_aggregate(self.emp_id, self.sums, self.counts, self.rating_count)
+    
+    def median(self, criterion: str) -> Optional[int]:
+        """Lower median score of a criterion, read off the histogram."""
+        histogram = self.histograms[criterion]
+        total = sum(histogram)
+        if total == 0:
+            return None
+        seen = 0
+        for score, count in enumerate(histogram, start=1):
+            seen += count
+            if seen * 2 >= total:
+                return score
+    
+    def to_dict(self):
+        return {
+            "emp_id": str(self.emp_id),
+            "rating_count": self.rating_count,
+            "sums": self.sums,
+            "counts": self.counts,
+            "histograms": self.histograms,
+            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return None
+        if "emp_id" in data and data["emp_id"]:
+            data["emp_id"] = PyUUID(data["emp_id"])
+        return cls(**data)
+
+@dataclass
+class CommentTerms:
+    """
+    Word frequencies over one employee's rating comments, updated as each
+    comment is written. `version` grows with every update and keys caches
+    of anything rendered from the terms, such as the word cloud.
+    """
+    emp_id: PyUUID
+    terms: Dict[str, int] = field(default_factory=dict)
+    comment_count: int = 0
+    version: int = 0
+    updated_at: Optional[datetime] = None
+    
+    def add_terms(self, tokens: List[str]):
+        for token in tokens:
+            self.terms[token] = self.terms.get(token, 0) + 1
+        self.comment_count += 1
+        self.version += 1
+    
+    def top_terms(self, limit: int) -> Dict[str, int]:
+        return dict(sorted(self.terms.items(), key=lambda item: (-item[1], item[0]))[:limit])
+    
+    def to_dict(self):
+        return {
+            "emp_id": str(self.emp_id),
+            "terms": self.terms,
+            "comment_count": self.comment_count,
+            "version": self.version,
+            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return None
+        if "emp_id" in data and data["emp_id"]:
+            data["emp_id"] = PyUUID(data["emp_id"])
+        return cls(**data)
+
 class Office:
     def __init__(self, office_id: PyUUID, name: str):
         self.office_id = office_id
@@ -153,4 +279,36 @@ class Office:
         return {
             'office_id': str(self.office_id),
             'name': self.name
-        }
\ No newline at end of file
+        }
+
+
+@dataclass
+class OfficeEmployeePage:
+    """
+    One page of an office's employees in the requested order, each row with
+    the employee's name and position, rating_count, the criteria averages
+    and the overall score. `total` counts the whole office.
+    """
+    office: str
+    rows: List[Dict[str, Any]]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+    @classmethod
+    def from_rows(cls, office: str, rows: List[Dict[str, Any]], page: int, page_size: int) -> 'OfficeEmployeePage':
+        """Builds the page from office_drilldown rows, which repeat the office total as total_count."""
+        total = rows[0]["total_count"] if rows else 0
+        decoded = []
+        for row in rows:
+            row = {key: value for key, value in row.items() if key != "total_count"}
+            row["emp_id"] = PyUUID(str(row["emp_id"]))
+            row["rating_count"] = int(row["rating_count"])
+            for column in RATING_CRITERIA + ("overall",):
+                row[column] = float(row[column])
+            decoded.append(row)
+        return cls(office=office, rows=decoded, total=total, page=page, page_size=page_size)
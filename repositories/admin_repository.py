@@ -1,36 +1,37 @@
-from core.db import supabase
+from repositories.base_repository import BaseRepository
 from models.models import Admin
 from typing import List, Optional
 from uuid import UUID
 
 
-class AdminRepository:
-    def __init__(self):
-        self.table_name = "admins"
-    
-    def get_all(self) -> List[Admin]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Admin.from_dict(item) for item in response.data]
+class AdminRepository(BaseRepository):
+    table_name = "admins"
+    id_column = "admin_id"
+    model = Admin
     
     def get_by_id(self, admin_id: UUID) -> Optional[Admin]:
-        response = supabase.table(self.table_name).select("*").eq("admin_id", str(admin_id)).execute()
-        return Admin.from_dict(response.data[0]) if response.data else None
+        return self._get_by_id(str(admin_id))
     
     def create(self, admin: Admin) -> Optional[Admin]:
-        response = supabase.table(self.table_name).insert(admin.to_dict()).execute()
+        response = self.backend.table(self.table_name).insert(admin.to_dict()).execute()
+        self._invalidate()
         return Admin.from_dict(response.data[0]) if response.data else None
     
     def update(self, admin: Admin) -> Optional[Admin]:
-        response = supabase.table(self.table_name).update(admin.to_dict()).eq("admin_id", str(admin.admin_id)).execute()
+        response = self.backend.table(self.table_name).update(admin.to_dict()).eq("admin_id", str(admin.admin_id)).execute()
+        self._invalidate()
         return Admin.from_dict(response.data[0]) if response.data else None
     
     def delete(self, admin_id: UUID) -> bool:
-        response = supabase.table(self.table_name).delete().eq("admin_id", str(admin_id)).execute()
+        response = self.backend.table(self.table_name).delete().eq("admin_id", str(admin_id)).execute()
+        self._invalidate()
         return len(response.data) > 0
 
     def get_by_email(self, email: str) -> Optional[Admin]:
-        response = supabase.table(self.table_name).select("*").eq("email_address", email).execute()
-        return Admin.from_dict(response.data[0]) if response.data else None
+        def load():
+            response = self.backend.table(self.table_name).select("*").eq("email_address", email).execute()
+            return Admin.from_dict(response.data[0]) if response.data else None
+        return self._cached(("email", email), load)
 
 
 # Similar repositories for Client, Queue, and Rating
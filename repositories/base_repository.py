@@ -0,0 +1,298 @@
+from core.cache import get_read_cache
+from core.shared_cache import get_shared_cache
+from core.db import get_async_backend, get_backend
+from core.backends import StorageBackend
+from core.config import REPOSITORY_PAGE_SIZE
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def _with_columns(columns: str, *required: str) -> str:
+    """The select list with the columns paging needs appended; "*" already has them."""
+    if columns == "*":
+        return columns
+    names = [c.strip() for c in columns.split(",")]
+    return ",".join(names + [c for c in dict.fromkeys(required) if c not in names])
+
+
+def _range_filter(start: Optional[datetime], end: Optional[datetime], column: str = "created_at", apply_filters: Optional[Callable] = None) -> Callable:
+    def apply(query):
+        if apply_filters:
+            query = apply_filters(query)
+        if start is not None:
+            query = query.gte(column, start.isoformat())
+        if end is not None:
+            query = query.lte(column, end.isoformat())
+        return query
+    return apply
+
+
+class _KeysetCursor:
+    """
+    Keyset paging over a unique column, shared by the sync and async
+    repositories, which only differ in how they execute `query`.
+    """
+
+    def __init__(self, key_column: str, size: int, apply_filters: Optional[Callable] = None):
+        self.key_column = key_column
+        self.size = size
+        self.apply_filters = apply_filters
+        self.last_id = None
+        self.done = False
+
+    def query(self, select):
+        """The request for the next page, built on a fresh select."""
+        if self.apply_filters:
+            select = self.apply_filters(select)
+        if self.last_id is not None:
+            select = select.gt(self.key_column, self.last_id)
+        return select.order(self.key_column).limit(self.size)
+
+    def advance(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Moves past a fetched page and returns the rows to yield."""
+        # Read the cursor before the rows are yielded, callers may decode them in place
+        if rows:
+            self.last_id = rows[-1][self.key_column]
+        self.done = len(rows) < self.size
+        return rows
+
+
+class _RangeCursor:
+    """
+    Paging through a timestamp range keyed on the timestamp column, shared
+    by the sync and async repositories. A full page of a single timestamp
+    is handed back as a tie, for the caller to walk with `tie_filter`.
+    """
+
+    def __init__(self, start: Optional[datetime], end: Optional[datetime], column: str, id_column: str, size: int, apply_filters: Optional[Callable] = None):
+        self.range_filter = _range_filter(start, end, column, apply_filters)
+        self.column = column
+        self.id_column = id_column
+        self.size = size
+        # Rows at `boundary` have not been yielded yet when `inclusive` is set
+        self.boundary, self.inclusive = None, False
+        self.done = False
+
+    def query(self, select):
+        select = self.range_filter(select)
+        if self.boundary is not None:
+            select = select.gte(self.column, self.boundary) if self.inclusive else select.gt(self.column, self.boundary)
+        return select.order(self.column).order(self.id_column).limit(self.size)
+
+    def advance(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Moves past a fetched page; returns the rows to yield and the timestamp of a tie to walk, if any."""
+        if len(rows) < self.size:
+            self.done = True
+            return rows, None
+        # The last timestamp may continue on the next page; hold its rows back
+        last_value = rows[-1][self.column]
+        complete = [row for row in rows if row[self.column] != last_value]
+        if complete:
+            self.boundary, self.inclusive = last_value, True
+            return complete, None
+        # A full page of one timestamp: the caller walks those rows by primary key, then we move past it
+        self.boundary, self.inclusive = last_value, False
+        return [], last_value
+
+    def tie_filter(self, value: Any) -> Callable:
+        return lambda query: self.range_filter(query).eq(self.column, value)
+
+
+class BaseRepository:
+    """
+    Shared table access for the repositories. Subclasses set the table name,
+    its primary key column and the model used to decode rows.
+
+    `get_all` and the point lookups go through the process-wide read cache
+    (core.cache) for tables that have a TTL configured; every write method
+    calls `_invalidate` so this process reads its own writes, and marks the
+    node's shared cache entries built from the table stale.
+
+    Bulk reads never issue a bare select: they walk the table in pages ordered
+    by the primary key (keyset pagination, `WHERE id > last_id LIMIT n`), so
+    results are never cut off at the PostgREST row limit and only one page is
+    held in memory at a time.
+    """
+    table_name: str = None
+    id_column: str = None
+    model = None
+    # Calls of a database function before giving up when the database keeps rolling it back on a conflict
+    MAX_RPC_ATTEMPTS = 5
+    # SQLSTATEs of a rolled back transaction (serialization failure, deadlock): calling again cannot apply it twice
+    _CONFLICT_SQLSTATES = ("40001", "40P01")
+
+    def __init__(self, page_size: Optional[int] = None, backend: Optional[StorageBackend] = None):
+        self.page_size = page_size or REPOSITORY_PAGE_SIZE
+        self._backend = backend
+
+    @property
+    def backend(self) -> StorageBackend:
+        """The storage backend, resolved on first use so constructing a repository never connects."""
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    def _cached(self, key: Any, load: Callable[[], Any]) -> Any:
+        """Returns the cached result of `key` for this table, calling `load` on a miss."""
+        return get_read_cache().get_or_load(self.table_name, key, load)
+
+    def _invalidate(self, *tables: str):
+        """Drops the cached reads of this table and of any other tables a write touched."""
+        get_read_cache().invalidate(self.table_name, *tables)
+        shared = get_shared_cache()
+        if shared is not None:
+            shared.invalidate(self.table_name, *tables)
+
+    def _write_rpc(self, function: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Calls a database function that writes this table and returns its rows.
+        The call is repeated only when the database rolled it back on a
+        conflict; any other error is raised, since the write may have landed.
+        """
+        # Loaded here so importing the repository does not load the PostgREST client
+        from postgrest.exceptions import APIError
+        for attempt in range(1, self.MAX_RPC_ATTEMPTS + 1):
+            try:
+                response = self.backend.rpc(function, params).execute()
+                break
+            except APIError as error:
+                if str(error.code) not in self._CONFLICT_SQLSTATES or attempt == self.MAX_RPC_ATTEMPTS:
+                    raise
+        self._invalidate()
+        return response.data
+
+    def _get_by_id(self, id_value: Any) -> Optional[Any]:
+        """The row with this primary key as a model, through the read cache."""
+        def load():
+            response = self.backend.table(self.table_name).select("*").eq(self.id_column, id_value).execute()
+            return self.model.from_dict(response.data[0]) if response.data else None
+        return self._cached(("id", id_value), load)
+
+    def _iter_pages(self, apply_filters: Optional[Callable] = None, columns: str = "*", page_size: Optional[int] = None, key_column: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the raw rows matching the filters one page at a time.
+
+        Args:
+            apply_filters: Optional function that adds filters to the select query.
+            columns: Columns to fetch; the key column is always included.
+            page_size: Rows per page, defaults to the repository's page size.
+            key_column: Unique column to paginate on, defaults to the primary key.
+        """
+        key_column = key_column or self.id_column
+        columns = _with_columns(columns, key_column)
+        cursor = _KeysetCursor(key_column, page_size or self.page_size, apply_filters)
+        while not cursor.done:
+            rows = cursor.advance(cursor.query(self.backend.table(self.table_name).select(columns)).execute().data)
+            if rows:
+                yield rows
+
+    def _iter_rows(self, apply_filters: Optional[Callable] = None, columns: str = "*", page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for page in self._iter_pages(apply_filters, columns, page_size):
+            yield from page
+
+    def _iter_models(self, apply_filters: Optional[Callable] = None, page_size: Optional[int] = None) -> Iterator[Any]:
+        for row in self._iter_rows(apply_filters, page_size=page_size):
+            yield self.model.from_dict(row)
+
+    def iter_pages(self, columns: str = "*", page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yields every row of the table as raw rows, one page at a time."""
+        return self._iter_pages(columns=columns, page_size=page_size)
+
+    def iter_all(self, page_size: Optional[int] = None) -> Iterator[Any]:
+        """Streams every row of the table as a model, one page at a time."""
+        return self._iter_models(page_size=page_size)
+
+    def iter_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None, column: str = "created_at", page_size: Optional[int] = None) -> Iterator[Any]:
+        """
+        Streams the rows whose `column` timestamp lies within [start, end] in
+        timestamp order; either bound may be omitted.
+        """
+        for page in self.iter_range_pages(start, end, column=column, page_size=page_size):
+            for row in page:
+                yield self.model.from_dict(row)
+
+    def iter_range_pages(self, start: Optional[datetime] = None, end: Optional[datetime] = None, columns: str = "*", column: str = "created_at", page_size: Optional[int] = None, apply_filters: Optional[Callable] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields pages of raw rows whose `column` lies within [start, end] and
+        that match `apply_filters`, if given.
+
+        Pages are keyed on `column` itself rather than the primary key, so
+        each request is a short range scan of the timestamp index. Paging by
+        primary key under a range filter makes the database re-sort the whole
+        remaining range for every page.
+        """
+        size = page_size or self.page_size
+        columns = _with_columns(columns, column, self.id_column)
+        cursor = _RangeCursor(start, end, column, self.id_column, size, apply_filters)
+        while not cursor.done:
+            rows, tie = cursor.advance(cursor.query(self.backend.table(self.table_name).select(columns)).execute().data)
+            if rows:
+                yield rows
+            if tie is not None:
+                yield from self._iter_pages(cursor.tie_filter(tie), columns, size)
+
+    def get_all(self) -> List[Any]:
+        return self._cached("all", lambda: list(self.iter_all()))
+
+
+class AsyncBaseRepository:
+    """
+    The read side of BaseRepository for async code (see core.aio): the same
+    read cache, point lookups and keyset / timestamp-range paging, with every
+    request awaited on the async backend, so a page can fan its independent
+    reads out with `aio.gather`. Writes stay on the synchronous repositories.
+    """
+    table_name: str = None
+    id_column: str = None
+    model = None
+
+    def __init__(self, page_size: Optional[int] = None, backend=None):
+        self.page_size = page_size or REPOSITORY_PAGE_SIZE
+        self._backend = backend
+
+    @property
+    def backend(self):
+        """The async storage backend, resolved on first use."""
+        if self._backend is None:
+            self._backend = get_async_backend()
+        return self._backend
+
+    async def _cached(self, key: Any, load: Callable) -> Any:
+        return await get_read_cache().get_or_load_async(self.table_name, key, load)
+
+    async def _get_by_id(self, id_value: Any) -> Optional[Any]:
+        async def load():
+            response = await self.backend.table(self.table_name).select("*").eq(self.id_column, id_value).execute()
+            return self.model.from_dict(response.data[0]) if response.data else None
+        return await self._cached(("id", id_value), load)
+
+    async def _iter_pages(self, apply_filters: Optional[Callable] = None, columns: str = "*", page_size: Optional[int] = None, key_column: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yields the raw rows matching the filters one page at a time, as BaseRepository._iter_pages."""
+        key_column = key_column or self.id_column
+        columns = _with_columns(columns, key_column)
+        cursor = _KeysetCursor(key_column, page_size or self.page_size, apply_filters)
+        while not cursor.done:
+            rows = cursor.advance((await cursor.query(self.backend.table(self.table_name).select(columns)).execute()).data)
+            if rows:
+                yield rows
+
+    def iter_pages(self, columns: str = "*", page_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self._iter_pages(columns=columns, page_size=page_size)
+
+    async def iter_range_pages(self, start: Optional[datetime] = None, end: Optional[datetime] = None, columns: str = "*", column: str = "created_at", page_size: Optional[int] = None, apply_filters: Optional[Callable] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yields pages of raw rows whose `column` lies within [start, end], as BaseRepository.iter_range_pages."""
+        size = page_size or self.page_size
+        columns = _with_columns(columns, column, self.id_column)
+        cursor = _RangeCursor(start, end, column, self.id_column, size, apply_filters)
+        while not cursor.done:
+            rows, tie = cursor.advance((await cursor.query(self.backend.table(self.table_name).select(columns)).execute()).data)
+            if rows:
+                yield rows
+            if tie is not None:
+                async for page in self._iter_pages(cursor.tie_filter(tie), columns, size):
+                    yield page
+
+    async def get_all(self) -> List[Any]:
+        async def load():
+            return [self.model.from_dict(row) async for page in self.iter_pages() for row in page]
+        return await self._cached("all", load)
@@ -1,21 +1,17 @@
-from core.db import supabase
-from models.models import Client
-from typing import List, Optional
+from repositories.base_repository import BaseRepository
+from models.models import Client, Queue
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 
 
-class ClientRepository:
-    def __init__(self):
-        self.table_name = "clients"
-    
-    def get_all(self) -> List[Client]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Client.from_dict(item) for item in response.data]
+class ClientRepository(BaseRepository):
+    table_name = "clients"
+    id_column = "client_id"
+    model = Client
     
     def get_by_id(self, client_id: UUID) -> Optional[Client]:
-        response = supabase.table(self.table_name).select("*").eq("client_id", str(client_id)).execute()
-        return Client.from_dict(response.data[0]) if response.data else None
+        return self._get_by_id(str(client_id))
     
     def create(self, client: Client) -> Optional[Client]:
         client_dict = client.to_dict()
@@ -24,14 +20,31 @@ class ClientRepository:
         if client_dict.get("created_at") is None:
             client_dict["created_at"] = datetime.now().isoformat()
             
-        response = supabase.table(self.table_name).insert(client_dict).execute()
+        response = self.backend.table(self.table_name).insert(client_dict).execute()
+        self._invalidate()
         return Client.from_dict(response.data[0]) if response.data else None
     
+    def create_with_queue(self, client: Client) -> Tuple[Optional[Client], Optional[Queue]]:
+        """Inserts the client and their queue in one transaction through the register_client_with_queue function."""
+        created_at = client.created_at or datetime.now()
+        response = self.backend.rpc("register_client_with_queue", {
+            "p_client_id": str(client.client_id) if client.client_id else None,
+            "p_first_name": client.first_name,
+            "p_last_name": client.last_name,
+            "p_created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        }).execute()
+        if not response.data:
+            return None, None
+        self._invalidate("queues")
+        return Client.from_dict(response.data[0]["client"]), Queue.from_dict(response.data[0]["queue"])
+    
     def update(self, client: Client) -> Optional[Client]:
-        response = supabase.table(self.table_name).update(client.to_dict()).eq("client_id", str(client.client_id)).execute()
+        response = self.backend.table(self.table_name).update(client.to_dict()).eq("client_id", str(client.client_id)).execute()
+        self._invalidate()
         return Client.from_dict(response.data[0]) if response.data else None
     
     def delete(self, client_id: UUID) -> bool:
-        response = supabase.table(self.table_name).delete().eq("client_id", str(client_id)).execute()
+        response = self.backend.table(self.table_name).delete().eq("client_id", str(client_id)).execute()
+        self._invalidate()
         return len(response.data) > 0
     
\ No newline at end of file
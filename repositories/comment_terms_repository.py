@@ -0,0 +1,45 @@
+from repositories.base_repository import BaseRepository
+from models.models import CommentTerms
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+
+
+class CommentTermsRepository(BaseRepository):
+    table_name = "comment_terms"
+    id_column = "emp_id"
+    model = CommentTerms
+    
+    def get_by_emp_id(self, emp_id: UUID) -> Optional[CommentTerms]:
+        response = self.backend.table(self.table_name).select("*").eq("emp_id", str(emp_id)).execute()
+        return CommentTerms.from_dict(response.data[0]) if response.data else None
+    
+    def record(self, emp_id: UUID, tokens: List[str]) -> Optional[CommentTerms]:
+        """
+        Adds one comment's words to the employee's terms with the
+        record_comment_terms database function, creating the row on the first
+        comment, so concurrent comments all count.
+        """
+        rows = self._write_rpc("record_comment_terms", {"p_emp_id": str(emp_id), "p_tokens": tokens})
+        return CommentTerms.from_dict(rows[0]) if rows else None
+    
+    def upsert(self, terms: CommentTerms, written_before: Optional[datetime] = None) -> Optional[CommentTerms]:
+        """Writes a whole row. With `written_before`, only if nothing wrote it since, as RatingSummaryRepository.upsert."""
+        terms.updated_at = datetime.now(timezone.utc)
+        table = self.backend.table(self.table_name)
+        if written_before is None:
+            response = table.upsert(terms.to_dict()).execute()
+        else:
+            response = table.update(terms.to_dict()).eq("emp_id", str(terms.emp_id)).lt("updated_at", written_before.isoformat()).execute()
+            if not response.data:
+                response = self.backend.table(self.table_name).upsert(terms.to_dict(), ignore_duplicates=True).execute()
+        self._invalidate()
+        return CommentTerms.from_dict(response.data[0]) if response.data else None
+    
+    def delete(self, emp_id: UUID, written_before: Optional[datetime] = None) -> bool:
+        query = self.backend.table(self.table_name).delete().eq("emp_id", str(emp_id))
+        if written_before is not None:
+            query = query.lt("updated_at", written_before.isoformat())
+        response = query.execute()
+        self._invalidate()
+        return len(response.data) > 0
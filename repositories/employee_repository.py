@@ -1,30 +1,66 @@
-from core.db import supabase
-from models.models import Employee
-from typing import List, Optional
+from repositories.base_repository import AsyncBaseRepository, BaseRepository
+from models.models import OFFICE_DRILLDOWN_SORTS, Employee
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 
-class EmployeeRepository:
-    def __init__(self):
-        self.table_name = "employees"
-    
-    def get_all(self) -> List[Employee]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Employee.from_dict(item) for item in response.data]
+class EmployeeRepository(BaseRepository):
+    table_name = "employees"
+    id_column = "emp_id"
+    model = Employee
     
     def get_by_id(self, emp_id: UUID) -> Optional[Employee]:
-        response = supabase.table(self.table_name).select("*").eq("emp_id", str(emp_id)).execute()
-        return Employee.from_dict(response.data[0]) if response.data else None
+        return self._get_by_id(str(emp_id))
+    
+    def get_by_office_name(self, office_name: str) -> List[Employee]:
+        return list(self._iter_models(lambda query: query.eq("office", office_name)))
+    
+    def get_office_drilldown(self, office_name: str, sort: str = "overall", descending: bool = True, limit: int = 25, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        One page of the office's employees with their rating count, criteria
+        averages and overall score, computed from the rating summaries by the
+        office_drilldown database function in a single request. Each row also
+        carries the office's employee count as total_count.
+
+        Args:
+            office_name: The office, as stored on the employees.
+            sort: One of OFFICE_DRILLDOWN_SORTS.
+            descending: Highest (or last alphabetically) first.
+            limit: Rows per page.
+            offset: Rows to skip.
+        """
+        if sort not in OFFICE_DRILLDOWN_SORTS:
+            raise ValueError(f"Unknown sort key {sort!r}, expected one of {', '.join(OFFICE_DRILLDOWN_SORTS)}")
+        response = self.backend.rpc("office_drilldown", {
+            "p_office": office_name,
+            "p_sort": sort,
+            "p_descending": descending,
+            "p_limit": limit,
+            "p_offset": offset,
+        }).execute()
+        return response.data
     
     def create(self, employee: Employee) -> Optional[Employee]:
-        response = supabase.table(self.table_name).insert(employee.to_dict()).execute()
+        response = self.backend.table(self.table_name).insert(employee.to_dict()).execute()
+        self._invalidate()
         return Employee.from_dict(response.data[0]) if response.data else None
     
     def update(self, employee: Employee) -> Optional[Employee]:
-        response = supabase.table(self.table_name).update(employee.to_dict()).eq("emp_id", str(employee.emp_id)).execute()
+        response = self.backend.table(self.table_name).update(employee.to_dict()).eq("emp_id", str(employee.emp_id)).execute()
+        self._invalidate()
         return Employee.from_dict(response.data[0]) if response.data else None
     
     def delete(self, emp_id: UUID) -> bool:
-        response = supabase.table(self.table_name).delete().eq("emp_id", str(emp_id)).execute()
+        response = self.backend.table(self.table_name).delete().eq("emp_id", str(emp_id)).execute()
+        self._invalidate()
         return len(response.data) > 0
     
+
+
+class AsyncEmployeeRepository(AsyncBaseRepository):
+    table_name = EmployeeRepository.table_name
+    id_column = EmployeeRepository.id_column
+    model = Employee
+
+    async def get_by_id(self, emp_id: UUID) -> Optional[Employee]:
+        return await self._get_by_id(str(emp_id))
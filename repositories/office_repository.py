@@ -1,13 +1,22 @@
-from core.db import supabase
+from repositories.base_repository import AsyncBaseRepository, BaseRepository
 from models.models import Office
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 
-class OfficeRepository:
-    def __init__(self):
-        self.table_name = "offices"
+class OfficeRepository(BaseRepository):
+    table_name = "offices"
+    id_column = "office_id"
+    model = Office
 
-    def get_all(self) -> List[Office]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Office.from_dict(item) for item in response.data] 
\ No newline at end of file
+    def get_by_id(self, office_id: UUID) -> Optional[Office]:
+        return self._get_by_id(str(office_id))
+
+
+class AsyncOfficeRepository(AsyncBaseRepository):
+    table_name = OfficeRepository.table_name
+    id_column = OfficeRepository.id_column
+    model = Office
+
+    async def get_by_id(self, office_id: UUID) -> Optional[Office]:
+        return await self._get_by_id(str(office_id))
@@ -1,21 +1,20 @@
-from core.db import supabase
+from repositories.base_repository import BaseRepository
 from models.models import Queue
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional
 from uuid import UUID
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from models.batches import QueueBatch
 
-class QueueRepository:
-    def __init__(self):
-        self.table_name = "queues"
-    
-    def get_all(self) -> List[Queue]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Queue.from_dict(item) for item in response.data]
+
+class QueueRepository(BaseRepository):
+    table_name = "queues"
+    id_column = "queue_id"
+    model = Queue
     
     def get_by_id(self, queue_id: int) -> Optional[Queue]:
-        response = supabase.table(self.table_name).select("*").eq("queue_id", queue_id).execute()
-        return Queue.from_dict(response.data[0]) if response.data else None
+        return self._get_by_id(queue_id)
     
     def create(self, queue: Queue) -> Optional[Queue]:
         # Remove queue_id if it's None to let the database generate it
@@ -27,7 +26,8 @@ class QueueRepository:
         if queue_dict.get("created_at") is None:
             queue_dict["created_at"] = datetime.now().isoformat()
         
-        response = supabase.table(self.table_name).insert(queue_dict).execute()
+        response = self.backend.table(self.table_name).insert(queue_dict).execute()
+        self._invalidate()
         return Queue.from_dict(response.data[0]) if response.data else None
     
     def update(self, queue: Queue) -> Optional[Queue]:
@@ -36,21 +36,53 @@ class QueueRepository:
         if queue_dict.get("ended_at") is not None and not isinstance(queue_dict["ended_at"], str):
             queue_dict["ended_at"] = queue_dict["ended_at"].isoformat()
             
-        response = supabase.table(self.table_name).update(queue_dict).eq("queue_id", queue.queue_id).execute()
+        response = self.backend.table(self.table_name).update(queue_dict).eq("queue_id", queue.queue_id).execute()
+        self._invalidate()
+        return Queue.from_dict(response.data[0]) if response.data else None
+    
+    def end(self, queue_id: int, ended_at: datetime) -> Optional[Queue]:
+        """Closes the queue only if it is still open; returns None if it was already ended or does not exist."""
+        response = (
+            self.backend.table(self.table_name)
+            .update({"ended_at": ended_at.isoformat()})
+            .eq("queue_id", queue_id)
+            .is_("ended_at", "null")
+            .execute()
+        )
+        self._invalidate()
         return Queue.from_dict(response.data[0]) if response.data else None
     
+    def end_created_before(self, cutoff: datetime, ended_at: datetime) -> int:
+        """Closes every open queue created before `cutoff` in one statement and returns how many were closed."""
+        response = (
+            self.backend.table(self.table_name)
+            .update({"ended_at": ended_at.isoformat()}, count="exact", returning="minimal")
+            .is_("ended_at", "null")
+            .lt("created_at", cutoff.isoformat())
+            .execute()
+        )
+        self._invalidate()
+        return response.count or 0
+    
     def delete(self, queue_id: int) -> bool:
-        response = supabase.table(self.table_name).delete().eq("queue_id", queue_id).execute()
+        response = self.backend.table(self.table_name).delete().eq("queue_id", queue_id).execute()
+        self._invalidate()
         return len(response.data) > 0
     
+    def iter_active_queues(self) -> Iterator[Queue]:
+        return self._iter_models(lambda query: query.is_("ended_at", "null"))
+    
     def get_active_queues(self) -> List[Queue]:
-        response = supabase.table(self.table_name).select("*").is_("ended_at", "null").execute()
-        return [Queue.from_dict(item) for item in response.data]
+        return list(self.iter_active_queues())
     
     def get_by_client_id(self, client_id: UUID) -> List[Queue]:
-        response = supabase.table(self.table_name).select("*").eq("client_id", str(client_id)).execute()
-        return [Queue.from_dict(item) for item in response.data]
+        return list(self._iter_models(lambda query: query.eq("client_id", str(client_id))))
+    
+    def get_all_batch(self) -> "QueueBatch":
+        """Every queue as one columnar batch, decoded page by page."""
+        from models.batches import QueueBatch
+        return QueueBatch.from_pages(self._iter_pages())
     
-    def get_queues_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Queue]:
-        response = supabase.table(self.table_name).select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
-        return [Queue.from_dict(item) for item in response.data]
\ No newline at end of file
+    def get_queues_by_date_range(self, start_date: datetime, end_date: datetime) -> "QueueBatch":
+        from models.batches import QueueBatch
+        return QueueBatch.from_pages(self.iter_range_pages(start_date, end_date))
@@ -1,21 +1,26 @@
-from core.db import supabase
-from models.models import Rating
-from typing import List, Optional
+from repositories.base_repository import BaseRepository
+from models.models import Rating, RATING_CRITERIA, build_aggregate, empty_aggregate
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Any
 from uuid import UUID
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from models.batches import RatingBatch
+    from utils.data.rating_matrix import RatingMatrix
 
-class RatingRepository:
-    def __init__(self):
-        self.table_name = "ratings"
-    
-    def get_all(self) -> List[Rating]:
-        response = supabase.table(self.table_name).select("*").execute()
-        return [Rating.from_dict(item) for item in response.data]
+
+def _has_comment(query):
+    # Also excludes null comments, as `comments <> ''` is null for them
+    return query.neq("comments", "")
+
+
+class RatingRepository(BaseRepository):
+    table_name = "ratings"
+    id_column = "rating_id"
+    model = Rating
     
     def get_by_id(self, rating_id: UUID) -> Optional[Rating]:
-        response = supabase.table(self.table_name).select("*").eq("rating_id", str(rating_id)).execute()
-        return Rating.from_dict(response.data[0]) if response.data else None
+        return self._get_by_id(str(rating_id))
     
     def create(self, rating: Rating) -> Optional[Rating]:
         # Remove rating_id if it's None to let the database generate it
@@ -27,62 +32,100 @@ class RatingRepository:
         if rating_dict.get("created_at") is None:
             rating_dict["created_at"] = datetime.now().isoformat()
             
-        response = supabase.table(self.table_name).insert(rating_dict).execute()
+        response = self.backend.table(self.table_name).insert(rating_dict).execute()
+        self._invalidate()
         return Rating.from_dict(response.data[0]) if response.data else None
     
     def update(self, rating: Rating) -> Optional[Rating]:
-        response = supabase.table(self.table_name).update(rating.to_dict()).eq("rating_id", str(rating.rating_id)).execute()
+        response = self.backend.table(self.table_name).update(rating.to_dict()).eq("rating_id", str(rating.rating_id)).execute()
+        self._invalidate()
         return Rating.from_dict(response.data[0]) if response.data else None
     
     def delete(self, rating_id: UUID) -> bool:
-        response = supabase.table(self.table_name).delete().eq("rating_id", str(rating_id)).execute()
+        response = self.backend.table(self.table_name).delete().eq("rating_id", str(rating_id)).execute()
+        self._invalidate()
         return len(response.data) > 0
     
+    def get_by_ids(self, rating_ids: List[UUID]) -> List[Rating]:
+        """Fetches the given ratings with one request; ids that do not exist are left out."""
+        if not rating_ids:
+            return []
+        response = self.backend.table(self.table_name).select("*").in_("rating_id", [str(rating_id) for rating_id in rating_ids]).execute()
+        return [Rating.from_dict(row) for row in response.data]
+    
     def get_by_employee_id(self, emp_id: UUID) -> List[Rating]:
-        response = supabase.table(self.table_name).select("*").eq("emp_id", str(emp_id)).execute()
-        return [Rating.from_dict(item) for item in response.data]
+        return list(self._iter_models(lambda query: query.eq("emp_id", str(emp_id))))
+    
+    def get_all_batch(self) -> "RatingBatch":
+        """Every rating as one columnar batch, decoded page by page."""
+        from models.batches import RatingBatch
+        return RatingBatch.from_pages(self._iter_pages())
+    
+    def get_batch_by_employee_id(self, emp_id: UUID) -> "RatingBatch":
+        from models.batches import RatingBatch
+        return RatingBatch.from_pages(self._iter_pages(lambda query: query.eq("emp_id", str(emp_id))))
     
     def get_by_queue_id(self, queue_id: int) -> List[Rating]:
-        response = supabase.table(self.table_name).select("*").eq("queue_id", queue_id).execute()
-        return [Rating.from_dict(item) for item in response.data]
+        return list(self._iter_models(lambda query: query.eq("queue_id", queue_id)))
     
+    def get_rating_columns(self, emp_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches only the columns needed for rating analytics (emp_id, the four
+        criteria and created_at) as raw rows, optionally for one employee.
+        """
+        return list(self.iter_rating_columns(emp_id))
+
+    def iter_rating_columns(self, emp_id: Optional[UUID] = None) -> Iterator[Dict[str, Any]]:
+        columns = ",".join(("emp_id",) + RATING_CRITERIA + ("created_at",))
+        apply_filters = (lambda query: query.eq("emp_id", str(emp_id))) if emp_id is not None else None
+        return self._iter_rows(apply_filters, columns)
+
+    def get_rating_matrix(self, emp_id: Optional[UUID] = None) -> "RatingMatrix":
+        # NumPy and pandas are only loaded by the pages that run analytics
+        from utils.data.rating_matrix import RatingMatrix
+        return RatingMatrix.from_rows(self.iter_rating_columns(emp_id))
+
     def get_average_ratings_by_employee(self, emp_id: UUID) -> dict:
-        # This would typically be a more complex query in SQL
-        # For Supabase, we'll fetch the data and calculate in Python
-        ratings = self.get_by_employee_id(emp_id)
-        
-        if not ratings:
-            return {
-                "first_criteria": 0,
-                "second_criteria": 0,
-                "third_criteria": 0,
-                "fourth_criteria": 0,
-                "overall": 0
-            }
-        
-        total_first = sum(r.first_criteria for r in ratings if r.first_criteria is not None)
-        total_second = sum(r.second_criteria for r in ratings if r.second_criteria is not None)
-        total_third = sum(r.third_criteria for r in ratings if r.third_criteria is not None)
-        total_fourth = sum(r.fourth_criteria for r in ratings if r.fourth_criteria is not None)
-        
-        count_first = sum(1 for r in ratings if r.first_criteria is not None)
-        count_second = sum(1 for r in ratings if r.second_criteria is not None)
-        count_third = sum(1 for r in ratings if r.third_criteria is not None)
-        count_fourth = sum(1 for r in ratings if r.fourth_criteria is not None)
-        
-        return {
-            "first_criteria": total_first / count_first if count_first > 0 else 0,
-            "second_criteria": total_second / count_second if count_second > 0 else 0,
-            "third_criteria": total_third / count_third if count_third > 0 else 0,
-            "fourth_criteria": total_fourth / count_fourth if count_fourth > 0 else 0,
-            "overall": (
-                (total_first / count_first if count_first > 0 else 0) +
-                (total_second / count_second if count_second > 0 else 0) +
-                (total_third / count_third if count_third > 0 else 0) +
-                (total_fourth / count_fourth if count_fourth > 0 else 0)
-            ) / 4
-        }
+        stats = self.get_rating_matrix(emp_id).employee_stats()
+        return stats.get(emp_id) or empty_aggregate(emp_id)
+
+    def get_rating_aggregates_by_employee(self) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Aggregates every rating per employee. Backends with aggregate support
+        group in the database and return one row per employee; otherwise the
+        narrow rating columns are scanned once and grouped with RatingMatrix.
+        """
+        if not self.backend.supports_aggregates:
+            return self.get_rating_matrix().employee_stats()
+
+        columns = ["emp_id", "rating_count:count()"]
+        for criterion in RATING_CRITERIA:
+            columns += [f"{criterion}_sum:{criterion}.sum()", f"{criterion}_count:{criterion}.count()"]
+        # Grouped rows are paginated on emp_id, the group key
+        pages = self._iter_pages(columns=",".join(columns), key_column="emp_id")
+
+        aggregates = {}
+        for page in pages:
+            for row in page:
+                if not row["emp_id"]:
+                    continue
+                emp_id = UUID(row["emp_id"])
+                aggregates[emp_id] = build_aggregate(
+                    emp_id,
+                    {criterion: row[f"{criterion}_sum"] or 0 for criterion in RATING_CRITERIA},
+                    {criterion: row[f"{criterion}_count"] or 0 for criterion in RATING_CRITERIA},
+                    row["rating_count"]
+                )
+        return aggregates
     
     def get_comments_by_employee_id(self, emp_id: UUID) -> List[str]:
-        response = supabase.table(self.table_name).select("comments").eq("emp_id", str(emp_id)).execute()
-        return [item['comments'] for item in response.data if item['comments']]
\ No newline at end of file
+        rows = self._iter_rows(lambda query: query.eq("emp_id", str(emp_id)), "comments")
+        return [item['comments'] for item in rows if item['comments']]
+
+    def iter_comments(self) -> Iterator[Dict[str, Any]]:
+        """Streams emp_id and comments of every rating with a non-empty comment."""
+        return self._iter_rows(_has_comment, "emp_id,comments")
+
+    def iter_comment_pages(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yields pages of rating_id, emp_id, comments and created_at of the ratings with a non-empty comment created within [start, end]."""
+        return self.iter_range_pages(start, end, columns="rating_id,emp_id,comments", apply_filters=_has_comment)
\ No newline at end of file
@@ -0,0 +1,71 @@
+from repositories.base_repository import AsyncBaseRepository, BaseRepository
+from models.models import Rating, RatingSummary, RATING_CRITERIA
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+
+
+class RatingSummaryRepository(BaseRepository):
+    table_name = "rating_summaries"
+    id_column = "emp_id"
+    model = RatingSummary
+    
+    def get_by_emp_id(self, emp_id: UUID) -> Optional[RatingSummary]:
+        response = self.backend.table(self.table_name).select("*").eq("emp_id", str(emp_id)).execute()
+        return RatingSummary.from_dict(response.data[0]) if response.data else None
+    
+    def iter_updated_since(self, since: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yields pages of raw summary rows written at or after `since` (all rows when None), oldest first."""
+        return self.iter_range_pages(since, None, column="updated_at")
+    
+    def count(self) -> int:
+        return self.backend.table(self.table_name).select(self.id_column, count="exact", head=True).execute().count or 0
+    
+    def iter_emp_ids(self) -> Iterator[UUID]:
+        for page in self.iter_pages(columns=self.id_column):
+            for row in page:
+                yield UUID(str(row[self.id_column]))
+    
+    def record(self, rating: Rating) -> Optional[RatingSummary]:
+        """
+        Folds one rating into its employee's summary with the
+        record_rating_summary database function, creating the summary on the
+        employee's first rating. The increment runs in the database, so
+        concurrent ratings of the same employee all count.
+        """
+        scores = {criterion: getattr(rating, criterion) for criterion in RATING_CRITERIA}
+        rows = self._write_rpc("record_rating_summary", {"p_emp_id": str(rating.emp_id), "p_scores": scores})
+        return RatingSummary.from_dict(rows[0]) if rows else None
+    
+    def upsert(self, summary: RatingSummary, written_before: Optional[datetime] = None) -> Optional[RatingSummary]:
+        """
+        Writes a whole summary. With `written_before`, a stored summary is only
+        replaced if it was last written before then, and a missing one is only
+        created if nothing created it since, so a rating recorded meanwhile is
+        not overwritten. Returns None when the summary was left alone.
+        """
+        summary.updated_at = datetime.now(timezone.utc)
+        table = self.backend.table(self.table_name)
+        if written_before is None:
+            response = table.upsert(summary.to_dict()).execute()
+        else:
+            response = table.update(summary.to_dict()).eq("emp_id", str(summary.emp_id)).lt("updated_at", written_before.isoformat()).execute()
+            if not response.data:
+                response = self.backend.table(self.table_name).upsert(summary.to_dict(), ignore_duplicates=True).execute()
+        self._invalidate()
+        return RatingSummary.from_dict(response.data[0]) if response.data else None
+    
+    def delete(self, emp_id: UUID, written_before: Optional[datetime] = None) -> bool:
+        """Deletes a summary, with `written_before` only if it was last written before then (see upsert)."""
+        query = self.backend.table(self.table_name).delete().eq("emp_id", str(emp_id))
+        if written_before is not None:
+            query = query.lt("updated_at", written_before.isoformat())
+        response = query.execute()
+        self._invalidate()
+        return len(response.data) > 0
+
+
+class AsyncRatingSummaryRepository(AsyncBaseRepository):
+    table_name = RatingSummaryRepository.table_name
+    id_column = RatingSummaryRepository.id_column
+    model = RatingSummary
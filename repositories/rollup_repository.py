@@ -0,0 +1,60 @@
+from repositories.base_repository import AsyncBaseRepository, BaseRepository
+from utils.data.timestamps import to_local
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timezone
+
+
+class DailyActivityRepository(BaseRepository):
+    table_name = "daily_activity"
+    id_column = "day"
+
+    def get_range(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        return [row for page in self.iter_range_pages(start, end, column="day") for row in page]
+
+    def upsert_many(self, rows: List[Dict[str, Any]]):
+        if rows:
+            self.backend.table(self.table_name).upsert(rows, on_conflict="day", returning="minimal").execute()
+
+
+class DailyEmployeeRatingRepository(BaseRepository):
+    table_name = "daily_employee_ratings"
+    # Unique within a day; range reads page on (day, emp_id)
+    id_column = "emp_id"
+
+    def get_range(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        return [row for page in self.iter_range_pages(start, end, column="day") for row in page]
+
+    def upsert_many(self, rows: List[Dict[str, Any]]):
+        if rows:
+            self.backend.table(self.table_name).upsert(rows, on_conflict="day,emp_id", returning="minimal").execute()
+
+
+class RollupWatermarkRepository(BaseRepository):
+    table_name = "rollup_watermarks"
+    id_column = "name"
+
+    def get(self, name: str) -> Optional[datetime]:
+        response = self.backend.table(self.table_name).select("watermark").eq("name", name).execute()
+        if not response.data or not response.data[0]["watermark"]:
+            return None
+        return to_local(datetime.fromisoformat(response.data[0]["watermark"]))
+
+    def set(self, name: str, watermark: Optional[datetime]):
+        row = {"name": name, "watermark": to_local(watermark).isoformat() if watermark else None, "updated_at": datetime.now(timezone.utc).isoformat()}
+        self.backend.table(self.table_name).upsert(row, on_conflict="name", returning="minimal").execute()
+
+
+class AsyncDailyActivityRepository(AsyncBaseRepository):
+    table_name = DailyActivityRepository.table_name
+    id_column = DailyActivityRepository.id_column
+
+    async def get_range(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        return [row async for page in self.iter_range_pages(start, end, column="day") for row in page]
+
+
+class AsyncDailyEmployeeRatingRepository(AsyncBaseRepository):
+    table_name = DailyEmployeeRatingRepository.table_name
+    id_column = DailyEmployeeRatingRepository.id_column
+
+    async def get_range(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        return [row async for page in self.iter_range_pages(start, end, column="day") for row in page]
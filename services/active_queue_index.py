@@ -0,0 +1,153 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from core.config import TIMEZONE
+from models.models import Queue
+
+# Recently ended queue ids kept to ignore late or duplicate INSERT events
+ENDED_MEMORY = 10_000
+
+
+def _created_at(queue: Queue) -> datetime:
+    created_at = queue.created_at
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    if created_at is not None and created_at.tzinfo is not None:
+        created_at = created_at.astimezone(ZoneInfo(TIMEZONE)).replace(tzinfo=None)
+    return created_at
+
+
+class ActiveQueueIndex:
+    """
+    In-memory set of the open queues, shared by every viewer in the process.
+
+    It is seeded once from the database and then kept current without reads:
+    by QueueService listener hooks (queue_opened/queue_ended/queues_expired)
+    for writes made in this process, and by `apply_event` for change events
+    from other processes. Hooks and events may report the same change twice
+    or out of order; applying them is idempotent and an ended queue is never
+    brought back by a late INSERT. Events missed while the event source was
+    disconnected are recovered by `resync` once it reconnects.
+
+    Subscribe before seeding: changes heard before `seed` (and during a
+    `resync` read) are held and replayed on top of the read, so a change made
+    while the database was being read is not lost.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._queues: Dict[int, Queue] = {}
+        self._ended: "OrderedDict[int, None]" = OrderedDict()
+        # Hook calls held while the open set is being read; None when changes apply directly
+        self._held: Optional[List[Tuple[str, tuple]]] = []
+        # Bumped on every change so viewers can skip redrawing an unchanged board
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def seed(self, queues: Iterable[Queue]):
+        """Sets the open set from the first read, then replays the changes heard since the index was created."""
+        with self._lock:
+            self._queues = {queue.queue_id: queue for queue in queues if queue.ended_at is None}
+            self.version += 1
+            self._replay()
+
+    def resync(self, read: Callable[[], Iterable[Queue]]):
+        """
+        Replaces the open set with a fresh read, dropping queues that ended
+        while events were missed. Changes heard during `read()` are replayed
+        on top of it.
+        """
+        with self._lock:
+            if self._held is None:
+                self._held = []
+        try:
+            queues = list(read())
+        except Exception:
+            with self._lock:
+                self._replay()
+            raise
+        with self._lock:
+            previous = self._queues.keys()
+            self._queues = {queue.queue_id: queue for queue in queues if queue.ended_at is None and queue.queue_id not in self._ended}
+            if self._queues.keys() != previous:
+                self.version += 1
+            self._replay()
+
+    def snapshot(self) -> List[Queue]:
+        """The open queues in queue number order."""
+        with self._lock:
+            return [self._queues[queue_id] for queue_id in sorted(self._queues)]
+
+    # --- QueueService listener hooks ---
+
+    def queue_opened(self, queue: Queue):
+        with self._lock:
+            if self._hold("queue_opened", queue):
+                return
+            if queue.queue_id in self._ended or queue.queue_id in self._queues:
+                return
+            self._queues[queue.queue_id] = queue
+            self.version += 1
+
+    def queue_ended(self, queue: Queue):
+        with self._lock:
+            if self._hold("queue_ended", queue):
+                return
+            self._remember_ended(queue.queue_id)
+            if self._queues.pop(queue.queue_id, None) is not None:
+                self.version += 1
+
+    def queues_expired(self, cutoff: datetime):
+        with self._lock:
+            if self._hold("queues_expired", cutoff):
+                return
+            expired = [queue_id for queue_id, queue in self._queues.items() if _created_at(queue) < cutoff]
+            for queue_id in expired:
+                self._remember_ended(queue_id)
+                del self._queues[queue_id]
+            if expired:
+                self.version += 1
+
+    # --- Change events ---
+
+    def apply_event(self, event: Dict[str, Any]):
+        """Applies one queues change event from core.events."""
+        if event.get("table") not in (None, "queues"):
+            return
+        if event["type"] == "DELETE":
+            queue_id = event["old_record"].get("queue_id")
+            if queue_id is not None:
+                self.queue_ended(Queue(queue_id=queue_id))
+            return
+        record = event["record"]
+        if not record or record.get("queue_id") is None:
+            return
+        queue = Queue.from_dict(dict(record))
+        if queue.ended_at is None:
+            self.queue_opened(queue)
+        else:
+            self.queue_ended(queue)
+
+    def _hold(self, hook: str, *args) -> bool:
+        """Holds a hook call while the open set is being read; returns whether it was held. Needs the lock."""
+        if self._held is None:
+            return False
+        self._held.append((hook, args))
+        return True
+
+    def _replay(self):
+        """Applies the held hook calls in the order they were heard. Needs the lock."""
+        held, self._held = self._held or [], None
+        for hook, args in held:
+            getattr(self, hook)(*args)
+
+    def _remember_ended(self, queue_id: int):
+        self._ended[queue_id] = None
+        self._ended.move_to_end(queue_id)
+        while len(self._ended) > ENDED_MEMORY:
+            self._ended.popitem(last=False)
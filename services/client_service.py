@@ -1,6 +1,6 @@
 from repositories.client_repository import ClientRepository
 from services.queue_service import QueueService
-from models.models import Client
+from models.models import Client, Queue
 from typing import List, Optional, Tuple
 from uuid import UUID
 
@@ -16,21 +16,23 @@ class ClientService:
     def get_client_by_id(self, client_id: UUID) -> Optional[Client]:
         return self.repository.get_by_id(client_id)
     
+    def register_client_with_queue(self, client: Client) -> Tuple[Optional[Client], Optional[Queue]]:
+        """
+        Creates a client and their queue atomically in a single request
+        Returns a tuple of (client, queue); both are None if registration failed
+        """
+        created_client, queue = self.repository.create_with_queue(client)
+        if queue:
+            self.queue_service.notify_listeners("queue_opened", queue)
+        return created_client, queue
+    
     def create_client(self, client: Client) -> Tuple[Optional[Client], Optional[int]]:
         """
         Creates a client and assigns them a queue number
         Returns a tuple of (client, queue_id)
         """
-        # Create the client
-        created_client = self.repository.create(client)
-        
-        if created_client:
-            # Create a queue for the client
-            queue = self.queue_service.create_queue(created_client.client_id)
-            if queue:
-                return created_client, queue.queue_id
-        
-        return created_client, None
+        created_client, queue = self.register_client_with_queue(client)
+        return created_client, queue.queue_id if queue else None
     
     def update_client(self, client: Client) -> Optional[Client]:
         return self.repository.update(client)
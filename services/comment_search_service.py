@@ -0,0 +1,107 @@
+from repositories.rating_repository import RatingRepository
+from services.employee_service import EmployeeService
+from models.models import Rating
+from core.config import SEARCH_INDEX_PATH, SEARCH_SYNC_INTERVAL, SETTLE_SECONDS
+from utils.data.search_index import CommentIndex
+from utils.data.timestamps import local_now, to_local
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+
+import os
+import threading
+import time
+
+
+class CommentSearchService:
+    """
+    Ranked full-text search over rating comments, answered from an in-process
+    CommentIndex instead of the ratings table.
+
+    The index follows the table two ways: as a RatingService listener it adds
+    ratings created in this process at once, and `sync` reads only the
+    ratings created since its watermark, which picks up other processes'
+    writes. With SEARCH_INDEX_PATH set the index is saved after each sync and
+    loaded on start, so a restart reads only what is new.
+    """
+
+    def __init__(self, index: Optional[CommentIndex] = None, path: Optional[str] = None, sync_interval: Optional[float] = None):
+        self.path = SEARCH_INDEX_PATH if path is None else path
+        self.sync_interval = SEARCH_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self.index = index or self._load()
+        self.rating_repository = RatingRepository()
+        self.employee_service = EmployeeService()
+        self._sync_lock = threading.Lock()
+        self._last_sync: Optional[float] = None
+
+    def _load(self) -> CommentIndex:
+        if self.path and os.path.exists(self.path):
+            return CommentIndex.load(self.path)
+        return CommentIndex()
+
+    def rating_created(self, rating: Rating):
+        """RatingService hook: indexes a new rating's comment."""
+        if rating.rating_id is not None:
+            self.index.add(rating.rating_id, rating.emp_id, rating.created_at, rating.comments)
+
+    def sync(self, now: Optional[datetime] = None) -> int:
+        """Indexes the comments created since the watermark and returns how many were added."""
+        with self._sync_lock:
+            # Aware local time, the same clock as the rollup and export jobs
+            cutoff = (to_local(now) if now else local_now()) - timedelta(seconds=SETTLE_SECONDS)
+            added = 0
+            for page in self.rating_repository.iter_comment_pages(self.index.watermark_datetime):
+                added += self.index.add_rows(page)
+            watermark = self.index.watermark
+            self.index.advance_watermark(cutoff)
+            if self.path and (added or self.index.watermark != watermark):
+                self.index.save(self.path)
+            self._last_sync = time.monotonic()
+        return added
+
+    def _sync_if_stale(self):
+        if self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def search(
+        self,
+        query: str,
+        emp_ids: Optional[List[UUID]] = None,
+        office: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Searches the comments, best match first.
+
+        Args:
+            query: Words to match; the last letters of a word may be left off.
+            emp_ids: Only comments about these employees.
+            office: Only comments about employees of this office.
+            start: Only comments created at or after this time.
+            end: Only comments created at or before this time.
+            page: 1-based page number.
+            page_size: Results per page.
+
+        Returns:
+            {"total", "page", "page_size", "results"} where each result has the
+            rating_id, emp_id, score, comments and created_at of one rating.
+        """
+        self._sync_if_stale()
+        if office is not None:
+            # The cached employee list, not a scan of the table on every query
+            office_ids = {emp.emp_id for emp in self.employee_service.get_all_employees() if emp.office == office}
+            emp_ids = office_ids if emp_ids is None else office_ids & set(emp_ids)
+        found = self.index.search(query, emp_ids, start, end, page, page_size)
+
+        # Only the ratings on this page are read from the database
+        ratings = {rating.rating_id: rating for rating in self.rating_repository.get_by_ids([hit["rating_id"] for hit in found["results"]])}
+        results = []
+        for hit in found["results"]:
+            rating = ratings.get(hit["rating_id"])
+            if rating is None:
+                continue  # deleted since it was indexed
+            results.append({**hit, "comments": rating.comments, "created_at": rating.created_at})
+        return {**found, "results": results}
@@ -0,0 +1,95 @@
+import logging
+
+from repositories.comment_terms_repository import CommentTermsRepository
+from repositories.rating_repository import RatingRepository
+from models.models import CommentTerms, Rating
+from utils.data.text import tokenize
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+class CommentTermsService:
+    # Comments whose terms update failed in this process; reconcile() repairs them
+    dropped_updates = 0
+
+    def __init__(self):
+        self.repository = CommentTermsRepository()
+        self.rating_repository = RatingRepository()
+    
+    def get_terms(self, emp_id: UUID) -> CommentTerms:
+        return self.repository.get_by_emp_id(emp_id) or CommentTerms(emp_id=emp_id)
+    
+    def record_comment(self, rating: Rating) -> Optional[CommentTerms]:
+        """
+        Adds the words of a new rating's comment to its employee's term
+        frequencies in one database call. As with rating summaries, a failed
+        update is logged and counted rather than failing the saved rating.
+        """
+        if rating is None or rating.emp_id is None or not rating.comments:
+            return None
+        try:
+            return self.repository.record(rating.emp_id, tokenize(rating.comments))
+        except Exception:
+            type(self).dropped_updates += 1
+            logger.exception("Comment of rating %s was not added to the terms of employee %s", rating.rating_id, rating.emp_id)
+            return None
+    
+    def reconcile(self, apply: bool = True) -> List[Dict[str, Any]]:
+        """
+        Recounts every employee's terms from the ratings table. Comments are
+        counted as the pages stream in, so only the per-employee counts are
+        held. Rows written after the scan started are skipped, as in
+        RatingSummaryService.reconcile.
+
+        Args:
+            apply: Write the recounted terms back (bumping their version so
+                   cached word clouds are redrawn). With False, only report.
+
+        Returns:
+            One entry per drifted employee with the stored and expected comment counts.
+        """
+        scan_start = datetime.now(timezone.utc)
+        counted: Dict[UUID, Counter] = {}
+        comment_counts: Counter = Counter()
+        for row in self.rating_repository.iter_comments():
+            if row.get("emp_id") and row.get("comments"):
+                emp_id = UUID(str(row["emp_id"]))
+                counted.setdefault(emp_id, Counter()).update(tokenize(row["comments"]))
+                comment_counts[emp_id] += 1
+        stored = {terms.emp_id: terms for terms in self.repository.get_all()}
+
+        drift = []
+        for emp_id in counted.keys() | stored.keys():
+            expected = dict(counted.get(emp_id, {}))
+            have = stored.get(emp_id)
+            if have is not None and have.terms == expected and have.comment_count == comment_counts[emp_id]:
+                continue
+            if have is not None and self._written_since(have, scan_start):
+                continue
+            drift.append({
+                "emp_id": emp_id,
+                "stored_count": have.comment_count if have else None,
+                "expected_count": comment_counts[emp_id],
+            })
+            if apply:
+                # Conditional writes, so a comment recorded since the stored terms were read is kept
+                if emp_id in counted:
+                    version = have.version + 1 if have else 1
+                    self.repository.upsert(CommentTerms(emp_id=emp_id, terms=expected, comment_count=comment_counts[emp_id], version=version), written_before=scan_start)
+                else:
+                    self.repository.delete(emp_id, written_before=scan_start)
+        return drift
+    
+    @staticmethod
+    def _written_since(terms: CommentTerms, since: datetime) -> bool:
+        # Loaded here so the rating pages do not load pandas for a maintenance job
+        from utils.data.timestamps import to_local
+        if not terms.updated_at:
+            return False
+        updated_at = terms.updated_at if isinstance(terms.updated_at, datetime) else datetime.fromisoformat(terms.updated_at)
+        return to_local(updated_at) >= since
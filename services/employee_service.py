@@ -1,6 +1,9 @@
-from repositories.employee_repository import EmployeeRepository
-from repositories.office_repository import OfficeRepository
-from models.models import Employee, Office
+from repositories.employee_repository import AsyncEmployeeRepository, EmployeeRepository
+from repositories.office_repository import AsyncOfficeRepository, OfficeRepository
+from services.rating_service import RatingService
+from services.shared_reference_service import SharedReferenceService
+from utils.data.office_metrics import office_metrics
+from models.models import Employee, Office, OfficeEmployeePage
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
@@ -9,9 +12,13 @@ class EmployeeService:
     def __init__(self):
         self.repository = EmployeeRepository()
         self.office_repository = OfficeRepository()
+        self.rating_service = RatingService()
+        self.shared_reference_service = SharedReferenceService()
     
     def get_all_employees(self) -> List[Employee]:
-        return self.repository.get_all()
+        # The node's shared copy when one is published, otherwise the (cached) table
+        employees = self.shared_reference_service.get_employees()
+        return employees.to_list() if employees is not None else self.repository.get_all()
     
     def get_employee_by_id(self, emp_id: UUID) -> Optional[Employee]:
         return self.repository.get_by_id(emp_id)
@@ -26,34 +33,79 @@ class EmployeeService:
         return self.repository.delete(emp_id)
     
     def get_employees_by_office(self, office_id: UUID) -> List[Employee]:
-        return self.repository.get_by_office(office_id)
+        # Employees record their office by name
+        office = self.office_repository.get_by_id(office_id)
+        return self.repository.get_by_office_name(office.name) if office else []
 
     def get_employees_by_office_name(self, office_name: str) -> List[Employee]:
         return self.repository.get_by_office_name(office_name)
 
+    def get_office_drilldown(self, office_name: str, sort: str = "overall", descending: bool = True, page: int = 1, page_size: int = 25) -> OfficeEmployeePage:
+        """
+        One page (1-based) of the office's employees with their rating count,
+        criteria averages and overall score, sorted by one of
+        OFFICE_DRILLDOWN_SORTS, in a single request however large the office.
+        """
+        page = max(1, page)
+        rows = self.repository.get_office_drilldown(office_name, sort, descending, page_size, (page - 1) * page_size)
+        if not rows and page > 1:
+            # Past the last page (the office shrank): the first page still carries the total
+            first = self.repository.get_office_drilldown(office_name, sort, descending, 1, 0)
+            return OfficeEmployeePage(office_name, [], first[0]["total_count"] if first else 0, page, page_size)
+        return OfficeEmployeePage.from_rows(office_name, rows, page, page_size)
+
+    def get_office_metrics(self, aggregates: Optional[Dict[UUID, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Employee counts, rating volume, rating-weighted averages, score and
+        rank of every office (see utils.data.office_metrics), by office name
+        in rank order.
+
+        Args:
+            aggregates: Rating aggregates by emp_id to group, e.g. a rollup
+                window; all-time, from the rating summaries, if omitted.
+        """
+        if aggregates is None:
+            aggregates = self.rating_service.calculate_all_employee_average_ratings()
+        return office_metrics(self.get_all_employees(), aggregates)
+
     def calculate_office_metrics(self, office_id: UUID) -> Dict[str, Any]:
-        employees = self.get_employees_by_office(office_id)
-        num_employees = len(employees)
-        if num_employees == 0:
+        """One office's entry of get_office_metrics, with its average_rating and rank as "N/A" when it has no ratings."""
+        office = self.office_repository.get_by_id(office_id)
+        metrics = self.get_office_metrics().get(office.name) if office else None
+        if metrics is None:
             return {
                 "num_employees": 0,
                 "average_rating": "N/A",
                 "rank": "N/A"
             }
-        total_ratings = 0
-        total_avg_rating = 0
-        for emp in employees:
-            avg_ratings = self.rating_service.calculate_employee_average_rating(emp.emp_id)
-            total_avg_rating += avg_ratings['overall']
-            total_ratings += 1 if avg_ratings['overall'] > 0 else 0
-        average_rating = total_avg_rating / total_ratings if total_ratings > 0 else "N/A"
-        # Rank calculation logic can be added here
         return {
-            "num_employees": num_employees,
-            "average_rating": average_rating,
-            "rank": "N/A"  # Placeholder for rank
+            **metrics,
+            "average_rating": metrics["overall"] if metrics["rating_count"] else "N/A",
+            "rank": metrics["rank"] or "N/A"
         }
     
     def get_all_offices(self) -> List[Office]:
-        return self.office_repository.get_all()
-    
\ No newline at end of file
+        offices = self.shared_reference_service.get_offices()
+        return offices.to_list() if offices is not None else self.office_repository.get_all()
+    
+
+
+class AsyncEmployeeService:
+    """The reads of EmployeeService for concurrent page loads (see core.aio)."""
+
+    def __init__(self):
+        self.repository = AsyncEmployeeRepository()
+        self.office_repository = AsyncOfficeRepository()
+        self.shared_reference_service = SharedReferenceService()
+
+    async def get_all_employees(self) -> List[Employee]:
+        # The shared copy is a local file read, no request to wait on
+        employees = self.shared_reference_service.get_employees()
+        return employees.to_list() if employees is not None else await self.repository.get_all()
+
+    async def get_employee_by_id(self, emp_id: UUID) -> Optional[Employee]:
+        return await self.repository.get_by_id(emp_id)
+
+    async def get_all_offices(self) -> List[Office]:
+        offices = self.shared_reference_service.get_offices()
+        return offices.to_list() if offices is not None else await self.office_repository.get_all()
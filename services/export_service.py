@@ -0,0 +1,134 @@
+from repositories.client_repository import ClientRepository
+from repositories.employee_repository import EmployeeRepository
+from repositories.queue_repository import QueueRepository
+from repositories.rating_repository import RatingRepository
+from core.config import EXPORT_DIR, SETTLE_SECONDS
+from utils.data.parquet_archive import BATCH_TYPES, ParquetArchive, month_key
+from utils.data.queue_stats import QueueOfficeLookup, UNASSIGNED_OFFICE
+from utils.data.timestamps import local_now, parse_timestamps, to_local
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Office name of employees without one, as in QueueService.get_queue_stats
+UNKNOWN_OFFICE = "Unknown"
+
+
+def _month_start(value: datetime) -> datetime:
+    """Start of the local month of an aware time, as an aware local time."""
+    value = to_local(value)
+    return to_local(datetime(value.year, value.month, 1))
+
+
+def _next_month(value: datetime) -> datetime:
+    return to_local(datetime(value.year + value.month // 12, value.month % 12 + 1, 1))
+
+
+class ExportService:
+    """
+    Exports the ratings, queues, clients and employees tables to a Parquet
+    archive (see ParquetArchive) for analysts and historical dashboard reads.
+
+    Tables are streamed page by page and written month by month, each month
+    partitioned by office. A run re-exports only the months from the table's
+    watermark onwards and replaces them whole, so an interrupted run is
+    repaired by the next one. The employees table is small and rewritten
+    whole on every run.
+    """
+    # Queues end and get rated hours after they are created, so the month just before the
+    # watermark is exported again when the watermark is this close to its start
+    OVERLAP = timedelta(days=1)
+    TABLES = ("employees", "clients", "queues", "ratings")
+
+    def __init__(self, directory: Optional[str] = None):
+        self.archive = ParquetArchive(directory or EXPORT_DIR)
+        self.employee_repository = EmployeeRepository()
+        self.client_repository = ClientRepository()
+        self.queue_repository = QueueRepository()
+        self.rating_repository = RatingRepository()
+
+    def export(self, tables: Optional[Iterable[str]] = None, rebuild: bool = False, now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Brings the archive up to date.
+
+        Args:
+            tables: Tables to export, all by default.
+            rebuild: Drop the archived tables and export them from the start of history.
+            now: Current time, for tests and backfills.
+
+        Returns:
+            Per table: the months written, the rows written and the new watermark.
+        """
+        if not self.archive.directory:
+            raise ValueError("No export directory configured, set PALAYAN_EXPORT_DIR")
+        # Aware local time, so month boundaries line up with the months rows are filed under
+        cutoff = (to_local(now) if now else local_now()) - timedelta(seconds=SETTLE_SECONDS)
+        office_by_emp = {str(emp.emp_id): emp.office or UNKNOWN_OFFICE for emp in self.employee_repository.iter_all()}
+
+        results = {}
+        for table in tables or self.TABLES:
+            if rebuild:
+                self.archive.remove(table)
+            if table == "employees":
+                results[table] = self._export_employees(cutoff)
+            else:
+                results[table] = self._export_months(table, cutoff, self._office_function(table, office_by_emp))
+        return results
+
+    def _export_employees(self, cutoff: datetime) -> Dict[str, Any]:
+        writer = self.archive.open_partition("employees")
+        for page in self.employee_repository.iter_pages():
+            writer.write(BATCH_TYPES["employees"].from_rows(page).table, [row.get("office") or UNKNOWN_OFFICE for row in page])
+        rows = self.archive.commit_partition(writer)
+        self.archive.set_watermark("employees", cutoff)
+        return {"months": 0, "rows": rows, "watermark": cutoff}
+
+    def _office_function(self, table: str, office_by_emp: Dict[str, str]) -> Optional[Callable]:
+        """Returns f(month_start, month_end) -> f(page) -> office per row, or None for tables without offices."""
+        if table == "ratings":
+            return lambda start, end: lambda page: [office_by_emp.get(str(row.get("emp_id")), UNKNOWN_OFFICE) for row in page]
+        if table == "queues":
+            offices = sorted(set(office_by_emp.values()))
+            codes = {office: code for code, office in enumerate(offices)}
+            code_by_emp = {emp_id: codes[office] for emp_id, office in office_by_emp.items()}
+
+            def for_month(start: datetime, end: datetime):
+                # A queue's office is that of the employee its client rated, as in get_queue_stats
+                rating_pages = self.rating_repository.iter_range_pages(start, end + timedelta(days=1), columns="queue_id,emp_id")
+                lookup = QueueOfficeLookup.from_pages(rating_pages, code_by_emp)
+
+                def office_of(page: List[Dict[str, Any]]) -> List[str]:
+                    found = lookup.lookup(np.fromiter((row["queue_id"] for row in page), dtype=np.int64, count=len(page)))
+                    return [offices[code] if code >= 0 else UNASSIGNED_OFFICE for code in found.tolist()]
+                return office_of
+            return for_month
+        return None
+
+    def _export_months(self, table: str, cutoff: datetime, office_function: Optional[Callable]) -> Dict[str, Any]:
+        repository = {"clients": self.client_repository, "queues": self.queue_repository, "ratings": self.rating_repository}[table]
+        watermark = self.archive.watermark(table)
+        start = watermark - self.OVERLAP if watermark else self._earliest_timestamp(table)
+        if start is None or start >= cutoff:
+            return {"months": 0, "rows": 0, "watermark": watermark}
+
+        months, rows = 0, 0
+        month_start = _month_start(start)
+        while month_start <= cutoff:
+            month_end = min(_next_month(month_start) - timedelta(microseconds=1), cutoff)
+            writer = self.archive.open_partition(table, month_key(month_start))
+            office_of = office_function(month_start, month_end) if office_function else None
+            for page in repository.iter_range_pages(month_start, month_end):
+                writer.write(BATCH_TYPES[table].from_rows(page).table, office_of(page) if office_of else None)
+            rows += self.archive.commit_partition(writer)
+            self.archive.set_watermark(table, month_end)
+            months += 1
+            month_start = _next_month(month_start)
+        return {"months": months, "rows": rows, "watermark": self.archive.watermark(table)}
+
+    def _earliest_timestamp(self, table: str) -> Optional[datetime]:
+        response = self.rating_repository.backend.table(table).select("created_at").order("created_at", nullsfirst=False).limit(1).execute()
+        if response.data and response.data[0]["created_at"]:
+            return to_local(pd.Timestamp(parse_timestamps([response.data[0]["created_at"]])[0]).to_pydatetime())
+        return None
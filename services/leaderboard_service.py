@@ -0,0 +1,151 @@
+from repositories.employee_repository import EmployeeRepository
+from repositories.rating_summary_repository import RatingSummaryRepository
+from models.models import Rating, RatingSummary
+from core.config import LEADERBOARD_SYNC_INTERVAL, SETTLE_SECONDS
+from utils.data.ranking import OrderStatisticTree, aggregate_score
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+from datetime import datetime, timedelta
+
+import threading
+import time
+
+
+class LeaderboardService:
+    """
+    The rated employees in leaderboard order, plus a data version for caching
+    anything derived from their ratings.
+
+    Employees are ordered by their Bayesian average (the aggregate's "score",
+    see utils.data.ranking), so one 5-star rating does not outrank hundreds
+    of 4.9s. Ties go to the lower emp_id.
+
+    The first sync reads every rating summary. Later syncs read only the
+    summaries written since the watermark and move each changed employee
+    within an order-statistic tree, so nobody else is re-sorted or
+    recomputed, and `rank` of any employee is an O(log n) lookup.
+
+    Deletions leave no updated_at behind, so every sync also compares the
+    number of summaries with those held and drops the ones reconcile deleted,
+    and lists only employees still in the (cached) employees table.
+
+    `version` only ever grows and bumps when any summary changes, so
+    Streamlit caches keyed on it drop their entries.
+
+    As a RatingService listener it syncs on the next read after a rating
+    written in this process. Other processes' ratings are picked up once
+    LEADERBOARD_SYNC_INTERVAL has passed.
+    """
+
+    def __init__(self, sync_interval: Optional[float] = None):
+        self.sync_interval = LEADERBOARD_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self.repository = RatingSummaryRepository()
+        self.employee_repository = EmployeeRepository()
+        self.version = 0
+        # Aggregate of every summary read, including those of deleted employees
+        self._aggregates: Dict[UUID, Dict[str, Any]] = {}
+        # (-score, emp_id) of every listed employee, ascending, so the best comes first
+        self._order = OrderStatisticTree()
+        self._listed: Set[UUID] = set()
+        self._stamps: Dict[UUID, Tuple[int, Any]] = {}
+        self._watermark: Optional[datetime] = None
+        self._last_sync: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def rating_created(self, rating: Rating):
+        """RatingService hook: the next read syncs, so this process sees its own rating at once."""
+        with self._lock:
+            self._last_sync = None
+
+    def sync(self) -> List[UUID]:
+        """Applies the summaries written since the last sync and returns the employees that changed."""
+        with self._lock:
+            since = self._watermark - timedelta(seconds=SETTLE_SECONDS) if self._watermark else None
+            changed = []
+            for page in self.repository.iter_updated_since(since):
+                for row in page:
+                    updated_at = row.get("updated_at")
+                    summary = RatingSummary.from_dict(dict(row))
+                    # The settle window re-reads recent summaries; skip those already applied
+                    stamp = (summary.rating_count, updated_at)
+                    if self._stamps.get(summary.emp_id) != stamp:
+                        self._stamps[summary.emp_id] = stamp
+                        self._apply(summary.averages())
+                        changed.append(summary.emp_id)
+                    if updated_at:
+                        written = datetime.fromisoformat(updated_at) if isinstance(updated_at, str) else updated_at
+                        self._watermark = written if self._watermark is None else max(self._watermark, written)
+            changed = list(dict.fromkeys(changed + self._prune()))
+            if changed:
+                self.version += 1
+            self._last_sync = time.monotonic()
+            return changed
+
+    def _apply(self, aggregate: Dict[str, Any]):
+        emp_id = aggregate["emp_id"]
+        aggregate["score"] = aggregate_score(aggregate)
+        if emp_id in self._listed:
+            self._order.remove(self._key(self._aggregates[emp_id]))
+            self._order.insert(self._key(aggregate))
+        self._aggregates[emp_id] = aggregate
+
+    def _prune(self) -> List[UUID]:
+        """Drops deleted summaries and lists exactly the employees that exist; returns the employees moved."""
+        changed = []
+        if self.repository.count() != len(self._aggregates):
+            stored = set(self.repository.iter_emp_ids())
+            for emp_id in [emp_id for emp_id in self._aggregates if emp_id not in stored]:
+                self._unlist(emp_id)
+                del self._aggregates[emp_id]
+                self._stamps.pop(emp_id, None)
+                changed.append(emp_id)
+
+        employees = {emp.emp_id for emp in self.employee_repository.get_all()}
+        for emp_id, aggregate in self._aggregates.items():
+            if emp_id in employees and emp_id not in self._listed:
+                self._order.insert(self._key(aggregate))
+                self._listed.add(emp_id)
+                changed.append(emp_id)
+            elif emp_id not in employees and emp_id in self._listed:
+                self._unlist(emp_id)
+                changed.append(emp_id)
+        return changed
+
+    def _unlist(self, emp_id: UUID):
+        if emp_id in self._listed:
+            self._order.remove(self._key(self._aggregates[emp_id]))
+            self._listed.discard(emp_id)
+
+    @staticmethod
+    def _key(aggregate: Dict[str, Any]) -> Tuple[float, str]:
+        return (-aggregate["score"], str(aggregate["emp_id"]))
+
+    def _sync_if_stale(self):
+        with self._lock:
+            if self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.sync()
+
+    def current_version(self) -> int:
+        """The leaderboard's data version after pulling in any pending changes."""
+        self._sync_if_stale()
+        return self.version
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        """The aggregates of the rated employees, best score first, as copies."""
+        self._sync_if_stale()
+        with self._lock:
+            return [dict(self._aggregates[UUID(emp_id)]) for _, emp_id in self._order]
+
+    def top(self, count: int) -> List[Dict[str, Any]]:
+        """The aggregates of the `count` best employees, as copies, without walking the rest."""
+        self._sync_if_stale()
+        with self._lock:
+            return [dict(self._aggregates[UUID(emp_id)]) for _, emp_id in self._order.first(count)]
+
+    def rank(self, emp_id: UUID) -> Optional[int]:
+        """The employee's 1-based place on the leaderboard, or None if never rated (or deleted)."""
+        self._sync_if_stale()
+        with self._lock:
+            if emp_id not in self._listed:
+                return None
+            return self._order.rank(self._key(self._aggregates[emp_id])) + 1
@@ -1,30 +1,55 @@
 from repositories.queue_repository import QueueRepository
+from repositories.rating_repository import RatingRepository
+from repositories.employee_repository import EmployeeRepository
 from models.models import Queue
-from typing import List, Optional
+from core.config import EXPORT_DIR, QUEUE_MAX_AGE_HOURS
+from core.listeners import ListenerRegistry
+from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta
+
+if TYPE_CHECKING:
+    from models.batches import QueueBatch
+    from utils.data.queue_stats import QueueStats
+
+
+class QueueService(ListenerRegistry):
+    # Objects notified of queue changes made through any QueueService in this
+    # process, e.g. the ActiveQueueIndex behind the live queue board. A listener
+    # implements queue_opened(queue), queue_ended(queue) and queues_expired(cutoff).
+    _listeners = []
 
-class QueueService:
     def __init__(self):
         self.repository = QueueRepository()
     
-    def get_all_queues(self) -> List[Queue]:
-        return self.repository.get_all()
+    def get_all_queues(self) -> "QueueBatch":
+        return self.repository.get_all_batch()
     
     def get_active_queues(self) -> List[Queue]:
         response = self.repository.get_active_queues()
         return response
     
     def create_queue(self, client_id: UUID) -> Optional[Queue]:
-        queue = Queue(client_id=client_id)
-        return self.repository.create(queue)
+        queue = self.repository.create(Queue(client_id=client_id))
+        if queue:
+            self.notify_listeners("queue_opened", queue)
+        return queue
     
     def end_queue(self, queue_id: int) -> Optional[Queue]:
-        queue = self.repository.get_by_id(queue_id)
+        """Ends an open queue; returns None if it was already ended (e.g. a repeated click) or does not exist"""
+        queue = self.repository.end(queue_id, datetime.now())
         if queue:
-            queue.ended_at = datetime.now()
-            return self.repository.update(queue)
-        return None
+            self.notify_listeners("queue_ended", queue)
+        return queue
+    
+    def expire_stale_queues(self, max_age_hours: float = None) -> int:
+        """Ends every queue left open longer than max_age_hours and returns how many were ended"""
+        now = datetime.now()
+        cutoff = now - timedelta(hours=QUEUE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours)
+        expired = self.repository.end_created_before(cutoff, now)
+        if expired:
+            self.notify_listeners("queues_expired", cutoff)
+        return expired
     
     def get_client_queues(self, client_id: UUID) -> List[Queue]:
         return self.repository.get_by_client_id(client_id)
@@ -32,6 +57,56 @@ class QueueService:
     def get_queue_by_id(self, queue_id: int) -> Optional[Queue]:
         return self.repository.get_by_id(queue_id)
     
+    def get_queue_stats(self, start_date: datetime = None, end_date: datetime = None) -> "QueueStats":
+        """
+        Service-time distributions and arrival counts per hour, weekday and office
+        for the queues created within [start_date, end_date], streamed page by page.
+        With a Parquet archive configured, the months it already holds are read
+        from the archive and only the rest from the queues table.
+        """
+        import numpy as np
+        from utils.data.queue_stats import QueueOfficeLookup, QueueStats, UNASSIGNED_OFFICE, fold_queue_pages
+        from utils.data.timestamps import to_local
+
+        # Aware bounds, compared with the archive watermark and sent to the database as instants
+        start_date = to_local(start_date) if start_date else None
+        end_date = to_local(end_date) if end_date else None
+
+        employees = EmployeeRepository().iter_all()
+        office_names = {}
+        office_by_emp = {}
+        for emp in employees:
+            office_by_emp[str(emp.emp_id)] = office_names.setdefault(emp.office or "Unknown", len(office_names))
+
+        stats = None
+        archived_until = None
+        if EXPORT_DIR:
+            from utils.data.parquet_archive import ParquetArchive
+            archive = ParquetArchive(EXPORT_DIR)
+            archived_until = archive.watermark("queues")
+        if archived_until is not None and (start_date is None or start_date <= archived_until):
+            archive_end = min(end_date, archived_until) if end_date else archived_until
+            archived = archive.read("queues", start_date, archive_end, columns=["created_at", "ended_at", "office"])
+            # The archive stores the office by name, under which it was exported
+            archived_offices = archived.column("office")
+            for office in sorted(set(archived_offices.tolist()) - {UNASSIGNED_OFFICE}):
+                office_names.setdefault(office, len(office_names))
+            stats = QueueStats(list(office_names))
+            office_codes = np.array([office_names.get(office, -1) for office in archived_offices], dtype=np.int32)
+            stats.add(archived.column("created_at"), archived.column("ended_at"), office_codes)
+            if end_date is not None and end_date <= archived_until:
+                return stats
+            start_date = archived_until + timedelta(microseconds=1)
+
+        # A queue's office is the office of the employee its client rated; ratings
+        # are written when the queue ends, so look a day past the range
+        rating_end = end_date + timedelta(days=1) if end_date else None
+        rating_pages = RatingRepository().iter_range_pages(start_date, rating_end, columns="queue_id,emp_id")
+        office_lookup = QueueOfficeLookup.from_pages(rating_pages, office_by_emp)
+
+        queue_pages = self.repository.iter_range_pages(start_date, end_date, columns="queue_id,created_at,ended_at")
+        return fold_queue_pages(queue_pages, list(office_names), office_lookup, stats)
+    
     def get_pending_queues(self) -> List[Queue]:
         """Get all pending queues (active queues that have not ended)"""
         return self.get_active_queues()
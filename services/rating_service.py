@@ -1,16 +1,34 @@
 from repositories.rating_repository import RatingRepository
-from models.models import Rating
-from typing import List, Optional, Dict, Any
+from repositories.rating_summary_repository import AsyncRatingSummaryRepository
+from services.rating_summary_service import RatingSummaryService
+from services.comment_terms_service import CommentTermsService
+from services.shared_reference_service import SharedReferenceService
+from models.models import Rating, RATING_CRITERIA
+from core.listeners import ListenerRegistry
+from utils.data.ranking import aggregate_score, top_k
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from models.batches import RatingBatch
+    from utils.data.rating_matrix import RatingMatrix
+
+
+class RatingService(ListenerRegistry):
+    # Objects notified of ratings created through any RatingService in this
+    # process, e.g. the comment search index. A listener implements rating_created(rating).
+    _listeners = []
 
-class RatingService:
     def __init__(self):
         self.repository = RatingRepository()
+        self.summary_service = RatingSummaryService()
+        self.comment_terms_service = CommentTermsService()
+        self.shared_reference_service = SharedReferenceService()
     
-    def get_all_ratings(self) -> List[Rating]:
-        return self.repository.get_all()
+    def get_all_ratings(self) -> "RatingBatch":
+        return self.repository.get_all_batch()
     
     def get_rating_by_id(self, rating_id: UUID) -> Optional[Rating]:
         return self.repository.get_by_id(rating_id)
@@ -25,60 +43,79 @@ class RatingService:
             fourth_criteria=criteria.get('fourth', None),
             comments=comments
         )
-        return self.repository.create(rating)
+        created_rating = self.repository.create(rating)
+        if created_rating:
+            self.summary_service.record_rating(created_rating)
+            self.comment_terms_service.record_comment(created_rating)
+            self.notify_listeners("rating_created", created_rating)
+        return created_rating
     
-    def get_employee_ratings(self, emp_id: UUID) -> List[Rating]:
-        return self.repository.get_by_employee_id(emp_id)
+    def get_employee_ratings(self, emp_id: UUID) -> "RatingBatch":
+        return self.repository.get_batch_by_employee_id(emp_id)
     
     def get_queue_ratings(self, queue_id: int) -> List[Rating]:
         return self.repository.get_by_queue_id(queue_id)
     
     def calculate_employee_average_rating(self, emp_id: UUID) -> Dict[str, float]:
-        ratings = self.get_employee_ratings(emp_id)
-        if not ratings:
-            return {
-                "first_criteria": 0,
-                "second_criteria": 0,
-                "third_criteria": 0,
-                "fourth_criteria": 0,
-                "overall": 0
-            }
-        
-        total_first = sum(r.first_criteria for r in ratings if r.first_criteria is not None)
-        total_second = sum(r.second_criteria for r in ratings if r.second_criteria is not None)
-        total_third = sum(r.third_criteria for r in ratings if r.third_criteria is not None)
-        total_fourth = sum(r.fourth_criteria for r in ratings if r.fourth_criteria is not None)
-        
-        count_first = sum(1 for r in ratings if r.first_criteria is not None)
-        count_second = sum(1 for r in ratings if r.second_criteria is not None)
-        count_third = sum(1 for r in ratings if r.third_criteria is not None)
-        count_fourth = sum(1 for r in ratings if r.fourth_criteria is not None)
-        
-        avg_first = total_first / count_first if count_first > 0 else 0
-        avg_second = total_second / count_second if count_second > 0 else 0
-        avg_third = total_third / count_third if count_third > 0 else 0
-        avg_fourth = total_fourth / count_fourth if count_fourth > 0 else 0
-        
-        overall = (avg_first + avg_second + avg_third + avg_fourth) / 4
-        
-        return {
-            "first_criteria": avg_first,
-            "second_criteria": avg_second,
-            "third_criteria": avg_third,
-            "fourth_criteria": avg_fourth,
-            "overall": overall
-        }
+        # Read from the incrementally maintained summary instead of the rating history
+        return self.summary_service.get_summary(emp_id).averages()
+    
+    def get_employee_rating_distribution(self, emp_id: UUID) -> Dict[str, List[int]]:
+        """Number of 1-5 scores the employee received for each criterion."""
+        return self.summary_service.get_summary(emp_id).histograms
+    
+    def get_employee_median_ratings(self, emp_id: UUID) -> Dict[str, Optional[int]]:
+        summary = self.summary_service.get_summary(emp_id)
+        return {criterion: summary.median(criterion) for criterion in RATING_CRITERIA}
     
     def get_employee_comments(self, emp_id: UUID) -> List[str]:
         return self.repository.get_comments_by_employee_id(emp_id)
     
-    def get_top_employees(self, employees: List[UUID]) -> List[Dict[str, Any]]:
+    def calculate_all_employee_average_ratings(self) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Returns the sums, counts, averages and overall score of every rated
+        employee, keyed by emp_id, read from the stored rating summaries or
+        from the node's shared leaderboard when one is published.
+        """
+        shared = self.shared_reference_service.get_employee_aggregates()
+        if shared is not None:
+            return shared
+        return {emp_id: summary.averages() for emp_id, summary in self.summary_service.get_all_summaries().items()}
+
+    def get_rating_matrix(self, emp_id: Optional[UUID] = None) -> "RatingMatrix":
+        """Columnar snapshot of all ratings (or one employee's) for vectorized analytics."""
+        return self.repository.get_rating_matrix(emp_id)
+
+    def calculate_office_average_ratings(self, office_by_emp: Dict[UUID, str]) -> Dict[str, Dict[str, Any]]:
+        return self.get_rating_matrix().office_stats(office_by_emp)
+
+    def get_rating_trend(self, freq: str = "day") -> "pd.DataFrame":
+        return self.get_rating_matrix().time_bucket_stats(freq)
+    
+    def get_top_employees(self, employees: List[UUID], count: int = 3) -> List[Dict[str, Any]]:
+        """
+        The `count` best of the given employees by Bayesian score (see
+        utils.data.ranking), picked with a bounded heap rather than a full sort.
+        """
+        aggregates = self.calculate_all_employee_average_ratings()
         employee_ratings = []
         for emp_id in employees:
-            avg_ratings = self.calculate_employee_average_rating(emp_id)
-            if avg_ratings['overall'] > 0:  # Only consider employees with ratings
-                employee_ratings.append({'emp_id': emp_id, 'average_rating': avg_ratings['overall']})
-        # Sort employees by average rating in descending order
-        employee_ratings.sort(key=lambda x: x['average_rating'], reverse=True)
-        # Return top 3 employees
-        return employee_ratings[:3]
\ No newline at end of file
+            avg_ratings = aggregates.get(emp_id)
+            if avg_ratings and avg_ratings['rating_count']:  # Only consider employees with ratings
+                employee_ratings.append({'emp_id': emp_id, 'average_rating': avg_ratings['overall'], 'score': aggregate_score(avg_ratings)})
+        return top_k(employee_ratings, count, key=lambda x: x['score'])
+
+
+class AsyncRatingService:
+    """The rating aggregate reads of RatingService for concurrent page loads (see core.aio)."""
+
+    def __init__(self):
+        self.summary_repository = AsyncRatingSummaryRepository()
+        self.shared_reference_service = SharedReferenceService()
+
+    async def calculate_all_employee_average_ratings(self) -> Dict[UUID, Dict[str, Any]]:
+        """As RatingService.calculate_all_employee_average_ratings."""
+        shared = self.shared_reference_service.get_employee_aggregates()
+        if shared is not None:
+            return shared
+        return {summary.emp_id: summary.averages() for summary in await self.summary_repository.get_all()}
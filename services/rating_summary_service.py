@@ -0,0 +1,112 @@
+import logging
+
+from repositories.rating_summary_repository import RatingSummaryRepository
+from repositories.rating_repository import RatingRepository
+from models.models import Rating, RatingSummary, RATING_CRITERIA
+from typing import List, Optional, Dict, Any
+from uuid import UUID
+from datetime import datetime, timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+class RatingSummaryService:
+    # Ratings whose summary update failed in this process; reconcile() repairs them
+    dropped_updates = 0
+
+    def __init__(self):
+        self.repository = RatingSummaryRepository()
+        self.rating_repository = RatingRepository()
+    
+    def get_summary(self, emp_id: UUID) -> RatingSummary:
+        return self.repository.get_by_emp_id(emp_id) or RatingSummary(emp_id=emp_id)
+    
+    def get_all_summaries(self) -> Dict[UUID, RatingSummary]:
+        return {summary.emp_id: summary for summary in self.repository.get_all()}
+    
+    def record_rating(self, rating: Rating) -> Optional[RatingSummary]:
+        """
+        Folds a newly written rating into its employee's summary. The
+        increment is a single database call, so concurrent ratings never lose
+        updates. The rating itself is already saved, so a failed update is
+        logged and counted instead of raised; reconcile() fixes the summary.
+        """
+        if rating is None or rating.emp_id is None:
+            return None
+        try:
+            return self.repository.record(rating)
+        except Exception:
+            type(self).dropped_updates += 1
+            logger.exception("Rating %s was not added to the summary of employee %s", rating.rating_id, rating.emp_id)
+            return None
+    
+    def reconcile(self, apply: bool = True) -> List[Dict[str, Any]]:
+        """
+        Recomputes every summary from the ratings table and compares it with
+        the stored one. Summaries written after the scan started are skipped,
+        since the recomputed totals may miss their latest ratings; the next
+        run checks them.
+
+        Args:
+            apply: Write the recomputed summaries back (and drop summaries of
+                   employees without ratings). With False, only report.
+
+        Returns:
+            One entry per drifted employee with the stored and expected totals.
+        """
+        scan_start = datetime.now(timezone.utc)
+        matrix = self.rating_repository.get_rating_matrix()
+        stats = matrix.employee_stats()
+        histograms = matrix.employee_histograms()
+        expected = {
+            emp_id: RatingSummary(
+                emp_id=emp_id,
+                rating_count=aggregate["rating_count"],
+                sums=aggregate["sums"],
+                counts=aggregate["counts"],
+                histograms=histograms[emp_id]
+            )
+            for emp_id, aggregate in stats.items()
+        }
+        stored = self.get_all_summaries()
+
+        drift = []
+        for emp_id in expected.keys() | stored.keys():
+            want, have = expected.get(emp_id), stored.get(emp_id)
+            if have is not None and want is not None and self._same_totals(have, want):
+                continue
+            if have is not None and self._written_since(have, scan_start):
+                continue
+            drift.append({
+                "emp_id": emp_id,
+                "stored_count": have.rating_count if have else None,
+                "expected_count": want.rating_count if want else 0,
+                "stored": have.to_dict() if have else None,
+                "expected": want.to_dict() if want else None,
+            })
+            if apply:
+                # Conditional writes, so a rating recorded since the stored summaries were read is kept
+                if want is not None:
+                    self.repository.upsert(want, written_before=scan_start)
+                else:
+                    self.repository.delete(emp_id, written_before=scan_start)
+        return drift
+    
+    @staticmethod
+    def _same_totals(left: RatingSummary, right: RatingSummary) -> bool:
+        return (
+            left.rating_count == right.rating_count
+            and all(left.sums.get(c, 0) == right.sums.get(c, 0) for c in RATING_CRITERIA)
+            and all(left.counts.get(c, 0) == right.counts.get(c, 0) for c in RATING_CRITERIA)
+            and all(list(left.histograms.get(c, [0] * 5)) == list(right.histograms.get(c, [0] * 5)) for c in RATING_CRITERIA)
+        )
+    
+    @staticmethod
+    def _written_since(summary: RatingSummary, since: datetime) -> bool:
+        # Loaded here so the rating pages do not load pandas for a maintenance job
+        from utils.data.timestamps import to_local
+        if not summary.updated_at:
+            return False
+        updated_at = summary.updated_at if isinstance(summary.updated_at, datetime) else datetime.fromisoformat(summary.updated_at)
+        return to_local(updated_at) >= since
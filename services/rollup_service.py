@@ -0,0 +1,119 @@
+from repositories.client_repository import ClientRepository
+from repositories.queue_repository import QueueRepository
+from repositories.rating_repository import RatingRepository
+from repositories.rollup_repository import AsyncDailyActivityRepository, AsyncDailyEmployeeRatingRepository, DailyActivityRepository, DailyEmployeeRatingRepository, RollupWatermarkRepository
+from models.models import RATING_CRITERIA
+from core.config import SETTLE_SECONDS
+from utils.data.rating_matrix import RatingMatrix
+from utils.data.rollups import combine_employee_days, count_by_day, day_strings
+from utils.data.timestamps import local_now, parse_timestamps, to_local
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+
+
+class RollupService:
+    """
+    Maintains the daily rollup tables (daily_activity, daily_employee_ratings)
+    that the admin dashboard reads instead of scanning queues and ratings.
+
+    `refresh` only reads source rows from the day of its watermark onwards.
+    It recomputes those days whole and upserts them, so a run that fails
+    halfway is repaired by the next one without double counting.
+    """
+    WATERMARK = "daily"
+    # Days recomputed per step, which bounds memory on the first run over a long history
+    WINDOW_DAYS = 7
+
+    def __init__(self):
+        self.activity_repository = DailyActivityRepository()
+        self.employee_day_repository = DailyEmployeeRatingRepository()
+        self.watermark_repository = RollupWatermarkRepository()
+        self.client_repository = ClientRepository()
+        self.queue_repository = QueueRepository()
+        self.rating_repository = RatingRepository()
+
+    def refresh(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Brings the rollups up to date and returns the number of days recomputed and the new watermark."""
+        # Aware local time, so the day windows line up with the days rows are counted in
+        cutoff = (to_local(now) if now else local_now()) - timedelta(seconds=SETTLE_SECONDS)
+        start = self.watermark_repository.get(self.WATERMARK) or self._earliest_timestamp()
+        if start is None or start >= cutoff:
+            return {"days": 0, "watermark": start}
+
+        day, days = start.date(), 0
+        while day <= cutoff.date():
+            last_day = min(day + timedelta(days=self.WINDOW_DAYS - 1), cutoff.date())
+            window_end = min(to_local(datetime.combine(last_day, time.max)), cutoff)
+            self._rebuild_days(to_local(datetime.combine(day, time.min)), window_end)
+            self.watermark_repository.set(self.WATERMARK, window_end)
+            days += (last_day - day).days + 1
+            day = last_day + timedelta(days=1)
+        return {"days": days, "watermark": window_end}
+
+    def rebuild(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Recomputes the rollups from the start of history."""
+        self.watermark_repository.set(self.WATERMARK, None)
+        return self.refresh(now)
+
+    def _earliest_timestamp(self) -> Optional[datetime]:
+        earliest = []
+        for table in ("clients", "queues", "ratings"):
+            response = self.client_repository.backend.table(table).select("created_at").order("created_at", nullsfirst=False).limit(1).execute()
+            if response.data and response.data[0]["created_at"]:
+                earliest.append(to_local(pd.Timestamp(parse_timestamps([response.data[0]["created_at"]])[0]).to_pydatetime()))
+        return min(earliest) if earliest else None
+
+    def _rebuild_days(self, start: datetime, end: datetime):
+        clients = count_by_day(self.client_repository.iter_range_pages(start, end, columns="created_at"), "created_at")
+        queues = count_by_day(self.queue_repository.iter_range_pages(start, end, columns="created_at"), "created_at")
+        closed = count_by_day(self.queue_repository.iter_range_pages(start, end, columns="ended_at", column="ended_at"), "ended_at")
+
+        columns = ",".join(("emp_id",) + RATING_CRITERIA + ("created_at",))
+        rating_rows = [row for page in self.rating_repository.iter_range_pages(start, end, columns=columns) for row in page]
+        ratings = count_by_day([rating_rows], "created_at")
+        employee_days = RatingMatrix.from_rows(rating_rows).employee_day_totals()
+
+        updated_at = local_now().isoformat()
+        self.activity_repository.upsert_many([
+            {"day": day, "clients": clients[day], "queues": queues[day], "closed_queues": closed[day], "ratings": ratings[day], "updated_at": updated_at}
+            for day in day_strings(start.date(), end.date())
+        ])
+        self.employee_day_repository.upsert_many([{**row, "updated_at": updated_at} for row in employee_days])
+
+    # --- Reads for the dashboard ---
+
+    def get_daily_activity(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """Clients, queues, closed queues and ratings per day, one row per day in the range."""
+        return activity_frame(self.activity_repository.get_range(start_date, end_date), start_date, end_date)
+
+    def get_employee_aggregates(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[UUID, Dict[str, Any]]:
+        """Rating aggregates (see build_aggregate) plus 1-5 histograms per employee over the days in range."""
+        return combine_employee_days(self.employee_day_repository.get_range(start_date, end_date))
+
+
+class AsyncRollupService:
+    """The dashboard reads of RollupService for concurrent page loads (see core.aio)."""
+
+    def __init__(self):
+        self.activity_repository = AsyncDailyActivityRepository()
+        self.employee_day_repository = AsyncDailyEmployeeRatingRepository()
+
+    async def get_daily_activity(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        return activity_frame(await self.activity_repository.get_range(start_date, end_date), start_date, end_date)
+
+    async def get_employee_aggregates(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[UUID, Dict[str, Any]]:
+        return combine_employee_days(await self.employee_day_repository.get_range(start_date, end_date))
+
+
+def activity_frame(rows, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+    """The daily_activity rows as an int frame indexed by day, with missing days of a closed range as zeros."""
+    columns = ["clients", "queues", "closed_queues", "ratings"]
+    frame = pd.DataFrame(rows, columns=["day"] + columns)
+    frame["day"] = pd.to_datetime(frame["day"])
+    frame = frame.set_index("day")[columns]
+    if start_date and end_date:
+        frame = frame.reindex(pd.date_range(start_date, end_date, freq="D", name="day"), fill_value=0)
+    return frame.astype(int)
@@ -0,0 +1,142 @@
+from repositories.employee_repository import EmployeeRepository
+from repositories.office_repository import OfficeRepository
+from repositories.rating_summary_repository import RatingSummaryRepository
+from core.config import SHARED_CACHE_INTERVAL
+from core.shared_cache import SharedCache, get_shared_cache
+from models.models import RATING_CRITERIA, build_aggregate
+from utils.data.ranking import aggregate_score
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from uuid import UUID
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from models.batches import EmployeeBatch, OfficeBatch
+
+
+class SharedReferenceService:
+    """
+    Publishes the employees, the offices and the rating leaderboard to the
+    node's SharedCache, and reads them back for EmployeeService and
+    RatingService, so the server processes of a host fetch them once
+    between them instead of once each.
+
+    Every process runs `refresh`, but only the one holding the writer lease
+    rebuilds entries. An entry is rebuilt when a write made it stale or when
+    it is older than the refresh interval. The leaderboard is not marked stale
+    by new ratings, which arrive all the time; it trails the rating summaries
+    by at most one interval.
+
+    All getters return None when no shared cache is configured or the entry is
+    not fresh, and callers then read the database as before.
+    """
+    # Entry name -> tables it is built from; writes to them mark the entry stale
+    SOURCES = {"employees": ("employees",), "offices": ("offices",), "leaderboard": ("employees",)}
+    # Seconds between refresh attempts of the background job, so stale entries are rebuilt soon after a write
+    CHECK_SECONDS = 10
+    # A writer that stops refreshing (e.g. its process died) loses the lease after this long
+    LEASE_SECONDS = 120
+
+    def __init__(self, cache: Optional[SharedCache] = None, interval: Optional[float] = None):
+        self._cache = cache
+        self.interval = SHARED_CACHE_INTERVAL if interval is None else interval
+        self.employee_repository = EmployeeRepository()
+        self.office_repository = OfficeRepository()
+        self.summary_repository = RatingSummaryRepository()
+
+    @property
+    def cache(self) -> Optional[SharedCache]:
+        return self._cache or get_shared_cache()
+
+    # --- Writer ---
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Rebuilds the stale or expired entries if this process holds the writer
+        lease. Returns the new version of each entry published.
+        """
+        cache = self.cache
+        if cache is None or not cache.acquire_lease(max(self.LEASE_SECONDS, 3 * self.interval)):
+            return {}
+        builders: Dict[str, Callable[[], "pa.Table"]] = {
+            "employees": self._build_employees,
+            "offices": self._build_offices,
+            "leaderboard": self._build_leaderboard,
+        }
+        published = {}
+        for name, build in builders.items():
+            entry = cache.entry(name)
+            if not force and entry is not None and entry["fresh"] and entry["age"] < self.interval:
+                continue
+            generation = cache.begin_build(name, self.SOURCES[name])
+            published[name] = cache.publish(name, build(), generation)
+        return published
+
+    def _build_employees(self) -> "pa.Table":
+        from models.batches import EmployeeBatch
+        return EmployeeBatch.from_pages(self.employee_repository.iter_pages()).table
+
+    def _build_offices(self) -> "pa.Table":
+        from models.batches import OfficeBatch
+        return OfficeBatch.from_pages(self.office_repository.iter_pages()).table
+
+    def _build_leaderboard(self) -> "pa.Table":
+        """One row per rated employee, best Bayesian score first: the count, sums, counts, averages and score."""
+        import pyarrow as pa
+        from models.batches import encode_uuids
+
+        aggregates = sorted(
+            (summary.averages() for summary in self.summary_repository.iter_all()),
+            key=lambda aggregate: (-aggregate_score(aggregate), str(aggregate["emp_id"])),
+        )
+        columns = {
+            "emp_id": encode_uuids([aggregate["emp_id"] for aggregate in aggregates]),
+            "rank": pa.array(range(1, len(aggregates) + 1), pa.int32()),
+            "rating_count": pa.array([aggregate["rating_count"] for aggregate in aggregates], pa.int64()),
+        }
+        for criterion in RATING_CRITERIA:
+            columns[f"{criterion}_sum"] = pa.array([aggregate["sums"].get(criterion, 0) for aggregate in aggregates], pa.int64())
+            columns[f"{criterion}_count"] = pa.array([aggregate["counts"].get(criterion, 0) for aggregate in aggregates], pa.int64())
+        columns["overall"] = pa.array([aggregate["overall"] for aggregate in aggregates], pa.float64())
+        columns["score"] = pa.array([aggregate_score(aggregate) for aggregate in aggregates], pa.float64())
+        return pa.table(columns)
+
+    # --- Readers ---
+
+    def _read(self, name: str) -> Optional["pa.Table"]:
+        cache = self.cache
+        return cache.read(name) if cache is not None else None
+
+    def get_employees(self) -> Optional["EmployeeBatch"]:
+        table = self._read("employees")
+        if table is None:
+            return None
+        from models.batches import EmployeeBatch
+        return EmployeeBatch(table)
+
+    def get_offices(self) -> Optional["OfficeBatch"]:
+        table = self._read("offices")
+        if table is None:
+            return None
+        from models.batches import OfficeBatch
+        return OfficeBatch(table)
+
+    def get_leaderboard(self) -> Optional["pa.Table"]:
+        """The leaderboard table, best Bayesian score first, with a 1-based rank column."""
+        return self._read("leaderboard")
+
+    def get_employee_aggregates(self) -> Optional[Dict[UUID, Dict[str, Any]]]:
+        """The leaderboard as RatingService.calculate_all_employee_average_ratings returns it."""
+        table = self.get_leaderboard()
+        if table is None:
+            return None
+        from models.batches import decode_uuid_strings
+
+        emp_ids = decode_uuid_strings(table.column("emp_id"))
+        columns = table.drop_columns(["emp_id"]).to_pydict()
+        aggregates = {}
+        for row, emp_id in enumerate(emp_ids):
+            sums = {criterion: columns[f"{criterion}_sum"][row] for criterion in RATING_CRITERIA}
+            counts = {criterion: columns[f"{criterion}_count"][row] for criterion in RATING_CRITERIA}
+            emp_uuid = UUID(emp_id)
+            aggregates[emp_uuid] = build_aggregate(emp_uuid, sums, counts, columns["rating_count"][row])
+        return aggregates
@@ -0,0 +1,13 @@
+-- Per-employee running rating totals maintained by RatingService.create_rating.
+-- sums/counts are keyed by criterion; histograms hold five counters per criterion
+-- (index 0 counts 1-star scores). Rebuild with `python manage.py reconcile-summaries`.
+create table if not exists public.rating_summaries (
+    emp_id uuid primary key references public.employees (emp_id) on delete cascade,
+    rating_count integer not null default 0,
+    sums jsonb not null default '{}'::jsonb,
+    counts jsonb not null default '{}'::jsonb,
+    histograms jsonb not null default '{}'::jsonb,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists rating_summaries_updated_at_idx on public.rating_summaries (updated_at);
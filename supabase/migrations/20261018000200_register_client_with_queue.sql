@@ -0,0 +1,29 @@
+-- Registers a client and opens their queue in one transaction, so a kiosk
+-- registration is a single round trip and never leaves a client without a
+-- queue (or a stray second queue). Called by ClientRepository.create_with_queue.
+create or replace function public.register_client_with_queue(
+    p_client_id uuid,
+    p_first_name text,
+    p_last_name text,
+    p_created_at timestamptz default now()
+)
+returns table (client json, queue json)
+language plpgsql
+as $$
+declare
+    new_client public.clients;
+    new_queue public.queues;
+begin
+    insert into public.clients (client_id, first_name, last_name, created_at)
+    values (coalesce(p_client_id, gen_random_uuid()), p_first_name, p_last_name, p_created_at)
+    returning * into new_client;
+
+    insert into public.queues (client_id, created_at)
+    values (new_client.client_id, p_created_at)
+    returning * into new_queue;
+
+    return query select row_to_json(new_client), row_to_json(new_queue);
+end;
+$$;
+
+grant execute on function public.register_client_with_queue(uuid, text, text, timestamptz) to anon, authenticated;
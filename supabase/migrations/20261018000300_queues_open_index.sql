@@ -0,0 +1,4 @@
+-- Partial index over the open queues only. It stays small because the expiry
+-- job (QueueService.expire_stale_queues) closes queues left open too long, and
+-- serves both the active-queue listing and the expiry's single bulk update.
+create index if not exists queues_open_created_at_idx on public.queues (created_at) where ended_at is null;
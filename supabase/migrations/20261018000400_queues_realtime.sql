@@ -0,0 +1,5 @@
+-- Publish queue changes to Supabase Realtime for the live queue board
+-- (PALAYAN_QUEUE_EVENTS=realtime). Full replica identity makes UPDATE and
+-- DELETE events carry the whole old row, not just the primary key.
+alter table public.queues replica identity full;
+alter publication supabase_realtime add table public.queues;
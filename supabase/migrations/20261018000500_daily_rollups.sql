@@ -0,0 +1,30 @@
+-- Daily rollups behind the admin dashboard, refreshed incrementally by
+-- RollupService (background job, or `python manage.py refresh-rollups`).
+-- Days are local calendar days. closed_queues counts queues by the day they ended.
+create table if not exists public.daily_activity (
+    day date primary key,
+    clients integer not null default 0,
+    queues integer not null default 0,
+    closed_queues integer not null default 0,
+    ratings integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+-- Per employee and day: rating count plus per-criterion sums, counts and 1-5 histograms
+create table if not exists public.daily_employee_ratings (
+    day date not null,
+    emp_id uuid not null references public.employees (emp_id) on delete cascade,
+    rating_count integer not null default 0,
+    sums jsonb not null default '{}'::jsonb,
+    counts jsonb not null default '{}'::jsonb,
+    histograms jsonb not null default '{}'::jsonb,
+    updated_at timestamptz not null default now(),
+    primary key (day, emp_id)
+);
+
+-- How far each rollup has processed its source rows
+create table if not exists public.rollup_watermarks (
+    name text primary key,
+    watermark timestamp,
+    updated_at timestamptz not null default now()
+);
@@ -0,0 +1,11 @@
+-- Per-employee word frequencies of rating comments, maintained by
+-- RatingService.create_rating (stopwords removed, see utils/data/text.py).
+-- version grows on every update and keys the rendered word cloud cache.
+-- Rebuild with `python manage.py reconcile-terms`.
+create table if not exists public.comment_terms (
+    emp_id uuid primary key references public.employees (emp_id) on delete cascade,
+    terms jsonb not null default '{}'::jsonb,
+    comment_count integer not null default 0,
+    version integer not null default 0,
+    updated_at timestamptz not null default now()
+);
@@ -0,0 +1,76 @@
+-- One page of an office's employees with their rating count, criteria
+-- averages and overall score, read from rating_summaries in a single round
+-- trip. Averages are 0 for a criterion without scores and the overall score
+-- is the mean of the four, as build_aggregate computes them.
+-- p_sort is one of overall, rating_count, first_criteria .. fourth_criteria
+-- or name; ties are broken by emp_id so pages never overlap.
+-- total_count is the office's employee count, repeated on every row.
+-- Called by EmployeeRepository.get_office_drilldown.
+create or replace function public.office_drilldown(
+    p_office text,
+    p_sort text default 'overall',
+    p_descending boolean default true,
+    p_limit integer default 25,
+    p_offset integer default 0
+)
+returns table (
+    emp_id uuid,
+    first_name text,
+    last_name text,
+    "position" text,
+    rating_count integer,
+    first_criteria numeric,
+    second_criteria numeric,
+    third_criteria numeric,
+    fourth_criteria numeric,
+    overall numeric,
+    total_count bigint
+)
+language sql
+stable
+as $$
+    with averages as (
+        select
+            e.emp_id,
+            e.first_name,
+            e.last_name,
+            e.position,
+            coalesce(s.rating_count, 0) as rating_count,
+            coalesce((s.sums ->> 'first_criteria')::numeric / nullif((s.counts ->> 'first_criteria')::numeric, 0), 0) as first_criteria,
+            coalesce((s.sums ->> 'second_criteria')::numeric / nullif((s.counts ->> 'second_criteria')::numeric, 0), 0) as second_criteria,
+            coalesce((s.sums ->> 'third_criteria')::numeric / nullif((s.counts ->> 'third_criteria')::numeric, 0), 0) as third_criteria,
+            coalesce((s.sums ->> 'fourth_criteria')::numeric / nullif((s.counts ->> 'fourth_criteria')::numeric, 0), 0) as fourth_criteria
+        from public.employees e
+        left join public.rating_summaries s on s.emp_id = e.emp_id
+        where e.office = p_office
+    ),
+    scored as (
+        select
+            a.*,
+            (a.first_criteria + a.second_criteria + a.third_criteria + a.fourth_criteria) / 4 as overall,
+            case p_sort
+                when 'overall' then (a.first_criteria + a.second_criteria + a.third_criteria + a.fourth_criteria) / 4
+                when 'rating_count' then a.rating_count
+                when 'first_criteria' then a.first_criteria
+                when 'second_criteria' then a.second_criteria
+                when 'third_criteria' then a.third_criteria
+                when 'fourth_criteria' then a.fourth_criteria
+            end as sort_value
+        from averages a
+    )
+    select
+        s.emp_id, s.first_name, s.last_name, s.position, s.rating_count,
+        s.first_criteria, s.second_criteria, s.third_criteria, s.fourth_criteria, s.overall,
+        count(*) over () as total_count
+    from scored s
+    order by
+        case when p_descending then s.sort_value end desc,
+        case when not p_descending then s.sort_value end asc,
+        case when p_sort = 'name' and p_descending then s.last_name || ' ' || s.first_name end desc,
+        case when p_sort = 'name' and not p_descending then s.last_name || ' ' || s.first_name end asc,
+        s.emp_id
+    limit p_limit
+    offset p_offset;
+$$;
+
+grant execute on function public.office_drilldown(text, text, boolean, integer, integer) to anon, authenticated;
@@ -0,0 +1,50 @@
+-- Folds one rating into its employee's rating_summaries row inside the
+-- database, creating the row on the employee's first rating. The row is
+-- locked for the update, so concurrent ratings all count and a rating costs
+-- one round trip. p_scores maps each criterion to its score (or null).
+-- Called by RatingSummaryRepository.record.
+create or replace function public.record_rating_summary(
+    p_emp_id uuid,
+    p_scores jsonb
+)
+returns setof public.rating_summaries
+language plpgsql
+as $$
+declare
+    summary public.rating_summaries;
+    criterion text;
+    score integer;
+begin
+    insert into public.rating_summaries (emp_id) values (p_emp_id)
+    on conflict (emp_id) do nothing;
+
+    select * into summary from public.rating_summaries where emp_id = p_emp_id for update;
+
+    foreach criterion in array array['first_criteria', 'second_criteria', 'third_criteria', 'fourth_criteria'] loop
+        score := (p_scores ->> criterion)::integer;
+        summary.sums := jsonb_set(summary.sums, array[criterion], to_jsonb(coalesce((summary.sums ->> criterion)::integer, 0) + coalesce(score, 0)));
+        summary.counts := jsonb_set(summary.counts, array[criterion], to_jsonb(coalesce((summary.counts ->> criterion)::integer, 0) + (score is not null)::integer));
+        summary.histograms := jsonb_set(summary.histograms, array[criterion], coalesce(summary.histograms -> criterion, '[0, 0, 0, 0, 0]'::jsonb));
+        if score between 1 and 5 then
+            summary.histograms := jsonb_set(
+                summary.histograms,
+                array[criterion, (score - 1)::text],
+                to_jsonb((summary.histograms -> criterion ->> (score - 1))::integer + 1)
+            );
+        end if;
+    end loop;
+
+    update public.rating_summaries
+    set rating_count = rating_count + 1,
+        sums = summary.sums,
+        counts = summary.counts,
+        histograms = summary.histograms,
+        updated_at = now()
+    where emp_id = p_emp_id
+    returning * into summary;
+
+    return next summary;
+end;
+$$;
+
+grant execute on function public.record_rating_summary(uuid, jsonb) to anon, authenticated;
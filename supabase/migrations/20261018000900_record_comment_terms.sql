@@ -0,0 +1,38 @@
+-- Adds the words of one rating comment to its employee's comment_terms row
+-- inside the database, creating the row on the employee's first comment.
+-- p_tokens is the comment's word list from utils/data/text.py tokenize(),
+-- repeats included. The update locks the row, so concurrent comments all
+-- count and each bumps version. Called by CommentTermsRepository.record.
+create or replace function public.record_comment_terms(
+    p_emp_id uuid,
+    p_tokens jsonb
+)
+returns setof public.comment_terms
+language plpgsql
+as $$
+declare
+    result public.comment_terms;
+begin
+    insert into public.comment_terms (emp_id) values (p_emp_id)
+    on conflict (emp_id) do nothing;
+
+    update public.comment_terms t
+    set terms = t.terms || coalesce((
+            select jsonb_object_agg(token, coalesce((t.terms ->> token)::integer, 0) + uses)
+            from (
+                select value as token, count(*) as uses
+                from jsonb_array_elements_text(p_tokens)
+                group by value
+            ) counted
+        ), '{}'::jsonb),
+        comment_count = t.comment_count + 1,
+        version = t.version + 1,
+        updated_at = now()
+    where t.emp_id = p_emp_id
+    returning * into result;
+
+    return next result;
+end;
+$$;
+
+grant execute on function public.record_comment_terms(uuid, jsonb) to anon, authenticated;
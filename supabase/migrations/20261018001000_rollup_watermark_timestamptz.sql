@@ -0,0 +1,4 @@
+-- Rollup watermarks are compared with timestamptz columns, so store them as
+-- instants. Existing values were written as local (Asia/Manila) wall-clock time.
+alter table public.rollup_watermarks
+    alter column watermark type timestamptz using watermark at time zone 'Asia/Manila';
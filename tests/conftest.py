@@ -0,0 +1,29 @@
+import pytest
+
+from core.backends import SQLiteBackend
+from core.cache import set_read_cache
+from core.db import set_backend
+from utils.data.synthetic import generate_dataset
+
+
+@pytest.fixture
+def backend():
+    """A small in-memory dataset installed as the process-wide backend, with an empty read cache."""
+    backend = SQLiteBackend(":memory:")
+    generate_dataset(backend, rows=300, seed=7)
+    set_backend(backend)
+    set_read_cache(None)
+    yield backend
+    set_backend(None)
+    set_read_cache(None)
+
+
+@pytest.fixture
+def empty_backend():
+    """An empty in-memory backend installed as the process-wide backend."""
+    backend = SQLiteBackend(":memory:")
+    set_backend(backend)
+    set_read_cache(None)
+    yield backend
+    set_backend(None)
+    set_read_cache(None)
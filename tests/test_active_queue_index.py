@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import pytest
+
+from core.events import FakeEventSource
+from models.models import Queue
+from services.active_queue_index import ActiveQueueIndex
+from services.queue_service import QueueService
+
+
+@pytest.fixture
+def source():
+    source = FakeEventSource()
+    yield source
+    source.close()
+
+
+@pytest.fixture
+def index(backend, source):
+    """An index subscribed to the fake event source, then seeded from the database."""
+    index = ActiveQueueIndex()
+    source.start(index.apply_event, on_resync=lambda: index.resync(QueueService().get_active_queues))
+    index.seed(QueueService().get_active_queues())
+    return index
+
+
+def open_ids(index):
+    return [queue.queue_id for queue in index.snapshot()]
+
+
+def test_insert_and_end_update_change_the_index(index, source):
+    opened = len(index)
+    version = index.version
+
+    source.emit("INSERT", {"queue_id": 900_001, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None})
+    assert 900_001 in open_ids(index)
+    assert len(index) == opened + 1
+    assert index.version > version
+
+    version = index.version
+    source.emit("UPDATE", {"queue_id": 900_001, "client_id": None, "created_at": None, "ended_at": datetime.now().isoformat()})
+    assert 900_001 not in open_ids(index)
+    assert len(index) == opened
+    assert index.version > version
+
+
+def test_duplicate_events_are_idempotent(index, source):
+    record = {"queue_id": 900_002, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None}
+    source.emit("INSERT", record)
+    snapshot, version = open_ids(index), index.version
+    source.emit("INSERT", record)
+    assert open_ids(index) == snapshot
+    assert index.version == version
+
+    ended = dict(record, ended_at=datetime.now().isoformat())
+    source.emit("UPDATE", ended)
+    snapshot, version = open_ids(index), index.version
+    source.emit("UPDATE", ended)
+    # A late INSERT of an ended queue must not reopen it either
+    source.emit("INSERT", record)
+    assert open_ids(index) == snapshot
+    assert index.version == version
+
+
+def test_reconnect_resync_repairs_drift(index, source):
+    service = QueueService()
+    active = service.get_active_queues()
+    assert len(active) >= 2
+    # Changes made while disconnected: no events reach the index
+    ended = service.repository.end(active[0].queue_id, datetime.now())
+    created = service.repository.create(Queue(client_id=active[1].client_id))
+    assert ended is not None and created is not None
+    assert ended.queue_id in open_ids(index)
+    assert created.queue_id not in open_ids(index)
+
+    source.reconnect()
+    assert open_ids(index) == sorted(queue.queue_id for queue in service.get_active_queues())
+    assert ended.queue_id not in open_ids(index)
+    assert created.queue_id in open_ids(index)
+
+
+def test_events_before_the_seed_are_replayed(backend, source):
+    index = ActiveQueueIndex()
+    source.start(index.apply_event)
+    active = QueueService().get_active_queues()
+    # Heard after subscribing but before the seed, while the stale read was in flight
+    source.emit("INSERT", {"queue_id": 900_003, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None})
+    source.emit("UPDATE", {"queue_id": active[0].queue_id, "client_id": None, "created_at": None, "ended_at": datetime.now().isoformat()})
+    assert len(index) == 0
+
+    index.seed(active)
+    assert 900_003 in open_ids(index)
+    assert active[0].queue_id not in open_ids(index)
+    assert len(index) == len(active)
+
+
+def test_changes_during_a_resync_read_are_kept(index, source):
+    stale = QueueService().get_active_queues()
+
+    def read():
+        source.emit("INSERT", {"queue_id": 900_004, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None})
+        source.emit("UPDATE", {"queue_id": stale[0].queue_id, "client_id": None, "created_at": None, "ended_at": datetime.now().isoformat()})
+        return stale
+
+    index.resync(read)
+    assert 900_004 in open_ids(index)
+    assert stale[0].queue_id not in open_ids(index)
+
+    # Once the read is replayed, events apply directly again
+    source.emit("INSERT", {"queue_id": 900_005, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None})
+    assert 900_005 in open_ids(index)
+
+
+def test_a_failed_resync_read_still_applies_held_changes(index, source):
+    def read():
+        source.emit("INSERT", {"queue_id": 900_006, "client_id": None, "created_at": datetime.now().isoformat(), "ended_at": None})
+        raise ConnectionError("database unavailable")
+
+    with pytest.raises(ConnectionError):
+        index.resync(read)
+    assert 900_006 in open_ids(index)
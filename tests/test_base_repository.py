@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import aio
+from models.models import Rating
+from repositories.base_repository import AsyncBaseRepository, BaseRepository
+
+PAGE_SIZE = 7
+TIE = "2025-03-03T09:00:00"
+
+
+class Ratings(BaseRepository):
+    table_name = "ratings"
+    id_column = "rating_id"
+    model = Rating
+
+
+class AsyncRatings(AsyncBaseRepository):
+    table_name = "ratings"
+    id_column = "rating_id"
+    model = Rating
+
+
+@pytest.fixture
+def repositories(backend):
+    # More ratings at one timestamp than fit on a page, to exercise the tie walk
+    queue_id = backend.query(None, "select queue_id from queues limit 1")[0]["queue_id"]
+    backend.table("ratings").insert([{"queue_id": queue_id, "first_criteria": 5, "created_at": TIE} for _ in range(PAGE_SIZE * 2 + 3)]).execute()
+    return Ratings(page_size=PAGE_SIZE), AsyncRatings(page_size=PAGE_SIZE)
+
+
+async def collect(pages):
+    return [page async for page in pages]
+
+
+def ids(pages):
+    return [row["rating_id"] for page in pages for row in page]
+
+
+def test_keyset_pages_match(backend, repositories):
+    sync_repository, async_repository = repositories
+    expected = [row["rating_id"] for row in backend.query(None, "select rating_id from ratings order by rating_id")]
+    sync_pages = list(sync_repository.iter_pages(columns="created_at"))
+    async_pages = aio.run(collect(async_repository.iter_pages(columns="created_at")))
+    assert ids(sync_pages) == expected
+    assert sync_pages == async_pages
+    assert all(len(page) == PAGE_SIZE for page in sync_pages[:-1])
+
+
+@pytest.mark.parametrize("start, end", [
+    (None, None),
+    (datetime.fromisoformat(TIE), datetime.fromisoformat(TIE)),
+    (datetime.fromisoformat(TIE) - timedelta(days=30), datetime.fromisoformat(TIE) + timedelta(days=30)),
+])
+def test_range_pages_match(backend, repositories, start, end):
+    sync_repository, async_repository = repositories
+    rows = backend.query(None, "select rating_id, created_at from ratings order by created_at, rating_id")
+    expected = [
+        row["rating_id"] for row in rows
+        if (start is None or row["created_at"] >= start.isoformat()) and (end is None or row["created_at"] <= end.isoformat())
+    ]
+    sync_pages = list(sync_repository.iter_range_pages(start, end, columns="emp_id"))
+    async_pages = aio.run(collect(async_repository.iter_range_pages(start, end, columns="emp_id")))
+    assert ids(sync_pages) == expected
+    assert sync_pages == async_pages
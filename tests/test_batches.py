@@ -0,0 +1,84 @@
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from models.batches import RatingBatch, UUID_DICTIONARY_TYPE, decode_uuid_strings, encode_uuids
+from models.models import RATING_CRITERIA
+from utils.data.rating_matrix import RatingMatrix
+
+EMP_A, EMP_B = UUID(int=100), UUID(int=2**128 - 1)
+
+
+def rating(emp_id, scores=(5, 4, 3, 2), comments=None, created_at="2026-10-17T09:00:00"):
+    return {"rating_id": uuid4(), "queue_id": 1, "emp_id": emp_id, **dict(zip(RATING_CRITERIA, scores)), "comments": comments, "created_at": created_at}
+
+
+def test_uuids_round_trip_with_nulls():
+    values = [uuid4(), None, str(uuid4()), "", str(uuid4()).upper(), EMP_B]
+    decoded = decode_uuid_strings(encode_uuids(values))
+    expected = [None if not value else str(UUID(str(value))) for value in values]
+    assert decoded.tolist() == expected
+
+
+def test_decode_follows_the_slice_offset():
+    values = [uuid4() for _ in range(5)]
+    array = encode_uuids(values)
+    assert decode_uuid_strings(array.slice(2, 2)).tolist() == [str(value) for value in values[2:4]]
+
+
+def test_dictionary_columns_round_trip():
+    rows = [rating(EMP_A), rating(None), rating(EMP_B), rating(EMP_A)]
+    batch = RatingBatch.from_rows(rows)
+    assert batch.table.schema.field("emp_id").type == UUID_DICTIONARY_TYPE
+    assert batch.column("emp_id").tolist() == [str(EMP_A), None, str(EMP_B), str(EMP_A)]
+    assert [model.emp_id for model in batch] == [EMP_A, None, EMP_B, EMP_A]
+    assert [model.rating_id for model in batch] == [row["rating_id"] for row in rows]
+
+
+def test_pages_with_their_own_dictionaries_are_merged():
+    batch = RatingBatch.from_pages([[rating(EMP_A), rating(EMP_B)], [], [rating(EMP_B), rating(None)]])
+    assert len(batch) == 4
+    assert batch.column("emp_id").tolist() == [str(EMP_A), str(EMP_B), str(EMP_B), None]
+    assert batch[-1].emp_id is None
+    assert [model.emp_id for model in batch[1:3]] == [EMP_B, EMP_B]
+
+
+def test_empty_batches_keep_their_schema():
+    batch = RatingBatch.from_pages([[]])
+    assert len(batch) == 0
+    assert batch.column("emp_id").tolist() == []
+    assert len(batch.to_matrix()) == 0
+
+
+def test_to_matrix_matches_the_row_built_matrix():
+    rows = [
+        rating(EMP_A, (5, 5, 4, None)),
+        rating(None, (1, 1, 1, 1)),
+        rating(EMP_B, (3, None, 2, 1), created_at=None),
+        rating(EMP_A, (4, 4, 4, 4)),
+    ]
+    matrix = RatingBatch.from_rows(rows).to_matrix()
+    expected = RatingMatrix.from_rows(rows)
+
+    assert len(matrix) == 3
+    assert matrix.emp_ids == expected.emp_ids == [EMP_A, EMP_B]
+    np.testing.assert_array_equal(matrix.emp_codes, expected.emp_codes)
+    np.testing.assert_array_equal(matrix.scores, expected.scores)
+    np.testing.assert_array_equal(matrix.mask, expected.mask)
+    np.testing.assert_array_equal(matrix.created_at, expected.created_at)
+    assert matrix.employee_stats() == expected.employee_stats()
+
+
+def test_to_matrix_drops_employees_only_on_unrated_rows():
+    batch = RatingBatch.from_rows([rating(EMP_A), rating(EMP_B), rating(None)])
+    matrix = batch.filter(np.array([False, True, True])).to_matrix()
+    assert matrix.emp_ids == [EMP_B]
+    assert matrix.emp_codes.tolist() == [0]
+
+
+def test_to_matrix_without_created_at():
+    columns = ["emp_id", *RATING_CRITERIA]
+    rows = [{name: row[name] for name in columns} for row in (rating(EMP_A), rating(EMP_B))]
+    matrix = RatingBatch.from_rows(rows).to_matrix()
+    assert np.isnat(matrix.created_at).all()
+    assert matrix.emp_ids == [EMP_A, EMP_B]
@@ -0,0 +1,20 @@
+from uuid import UUID, uuid4
+
+from models.models import Client
+from repositories.client_repository import ClientRepository
+
+
+def test_create_with_queue_generates_a_missing_client_id(empty_backend):
+    client, queue = ClientRepository().create_with_queue(Client(client_id=None, first_name="Juan", last_name="Dela Cruz"))
+
+    assert isinstance(client.client_id, UUID)
+    assert queue.client_id == client.client_id
+    assert empty_backend.query(None, "select count(*) as n from clients where client_id = 'None'")[0]["n"] == 0
+
+
+def test_create_with_queue_keeps_a_given_client_id(empty_backend):
+    client_id = uuid4()
+    client, queue = ClientRepository().create_with_queue(Client(client_id=client_id, first_name="Maria", last_name="Santos"))
+
+    assert client.client_id == client_id
+    assert queue.client_id == client_id
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+
+from core.config import SETTLE_SECONDS
+from repositories.rating_repository import RatingRepository
+from services.comment_search_service import CommentSearchService
+from utils.data.search_index import CommentIndex
+from utils.data.timestamps import to_local
+
+
+def add_rating(backend, comments, created_at):
+    backend.table("ratings").insert({"comments": comments, "created_at": created_at}).execute()
+
+
+def test_sync_reads_from_an_aware_watermark(empty_backend):
+    service = CommentSearchService(CommentIndex(), path="", sync_interval=3600)
+    add_rating(empty_backend, "mabilis ang serbisyo", "2026-10-17T01:00:00Z")
+    assert service.sync(datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)) == 1
+    assert service.index.watermark_datetime == to_local(datetime(2026, 10, 17, 20, 0)) - timedelta(seconds=SETTLE_SECONDS)
+
+    add_rating(empty_backend, "matagal ang pila", "2026-10-17T12:30:00Z")
+    assert service.sync(datetime(2026, 10, 17, 14, 0, tzinfo=timezone.utc)) == 1
+    assert service.sync() == 0
+    assert service.index.search("pila")["total"] == 1
+
+
+def test_comment_pages_skip_ratings_without_comments(backend):
+    rows = [row for page in RatingRepository().iter_comment_pages() for row in page]
+    expected = backend.query(None, "select count(*) as n from ratings where comments is not null and comments <> ''")[0]["n"]
+    assert len(rows) == expected
+    assert all(row["comments"] for row in rows)
+
+
+def test_comment_pages_filter_ties_too(empty_backend):
+    for comments in ("salamat po", None, "", "mabait", None, "malinis"):
+        add_rating(empty_backend, comments, "2026-10-17T09:00:00")
+    pages = list(RatingRepository(page_size=2).iter_comment_pages())
+    assert sorted(row["comments"] for page in pages for row in page) == ["mabait", "malinis", "salamat po"]
+
+
+EMP_A, EMP_B = UUID(int=100), UUID(int=200)
+
+
+def rating_id(number):
+    return UUID(int=number)
+
+
+@pytest.fixture
+def index():
+    index = CommentIndex()
+    index.add(rating_id(1), EMP_A, "2026-10-01T09:00:00", "mabilis at maayos ang serbisyo")
+    index.add(rating_id(2), EMP_A, "2026-10-02T09:00:00", "mabilis mabilis mabilis")
+    index.add(rating_id(3), EMP_B, "2026-10-03T09:00:00", "matagal ang pila, mabagal ang proseso")
+    index.add(rating_id(4), EMP_B, "2026-10-04T09:00:00", "maayos naman, salamat po sa staff na mabilis")
+    return index
+
+
+def ids(found):
+    return [hit["rating_id"] for hit in found["results"]]
+
+
+def test_bm25_ranks_repeated_terms_in_short_comments_first(index):
+    found = index.search("mabilis")
+    assert found["total"] == 3
+    assert ids(found)[0] == rating_id(2)
+    assert ids(found)[-1] == rating_id(4)
+
+
+def test_every_query_word_must_match(index):
+    assert set(ids(index.search("mabilis maayos"))) == {rating_id(1), rating_id(4)}
+    assert index.search("mabilis pila")["total"] == 0
+    assert index.search("ang po")["total"] == 0
+
+
+def test_prefixes_match_with_a_lower_weight(index):
+    assert set(ids(index.search("maba"))) == {rating_id(3)}
+    exact, prefix = index.search("mabilis"), index.search("mabili")
+    assert ids(exact) == ids(prefix)
+    assert prefix["results"][0]["score"] < exact["results"][0]["score"]
+
+
+def test_filters_and_paging(index):
+    assert set(ids(index.search("mabilis", emp_ids=[EMP_B]))) == {rating_id(4)}
+    assert set(ids(index.search("mabilis", start=datetime(2026, 10, 2)))) == {rating_id(2), rating_id(4)}
+    # Aware bounds are compared in local time: 1 October 17:00 in Manila
+    assert set(ids(index.search("mabilis", end=datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc)))) == {rating_id(1)}
+    pages = [ids(index.search("mabilis", page=page, page_size=2)) for page in (1, 2)]
+    assert pages[0] + pages[1] == ids(index.search("mabilis"))
+    assert len(pages[1]) == 1
+
+
+def test_documents_are_indexed_once(index):
+    assert not index.add(rating_id(1), EMP_A, "2026-10-01T09:00:00", "mabilis")
+    assert not index.add(rating_id(5), EMP_A, "2026-10-05T09:00:00", "")
+    index.advance_watermark(datetime(2026, 10, 3))
+    # Before the watermark means a previous sync indexed it
+    assert not index.add(rating_id(6), EMP_A, "2026-10-02T09:00:00", "mabilis")
+    assert index.add(rating_id(7), EMP_A, "2026-10-05T09:00:00", "mabilis")
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    index.advance_watermark(datetime(2026, 10, 2))
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = CommentIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.watermark == index.watermark
+    assert loaded.search("mabilis") == index.search("mabilis")
+    assert not loaded.add(rating_id(4), EMP_B, "2026-10-04T09:00:00", "mabilis")
@@ -0,0 +1,104 @@
+import threading
+from uuid import UUID
+
+import pytest
+
+from services.comment_terms_service import CommentTermsService
+from services.rating_service import RatingService
+from utils.data.text import tokenize
+
+SCORES = {"first": 5, "second": 4, "third": 3, "fourth": 2}
+
+
+@pytest.fixture
+def service(backend):
+    service = CommentTermsService()
+    service.reconcile()
+    return service
+
+
+@pytest.fixture
+def rating_target(backend):
+    emp_id = backend.query(None, "select emp_id from employees order by emp_id limit 1")[0]["emp_id"]
+    queue_id = backend.query(None, "select queue_id from queues order by queue_id limit 1")[0]["queue_id"]
+    return queue_id, UUID(emp_id)
+
+
+def test_comment_words_are_added(service, rating_target):
+    queue_id, emp_id = rating_target
+    before = service.get_terms(emp_id)
+    RatingService().create_rating(queue_id, emp_id, SCORES, "Mabilis ang serbisyo, mabilis talaga")
+    after = service.get_terms(emp_id)
+    assert after.comment_count == before.comment_count + 1
+    assert after.version == before.version + 1
+    assert after.terms["mabilis"] == before.terms.get("mabilis", 0) + 2
+
+
+def test_concurrent_comments_all_count(service, rating_target):
+    queue_id, emp_id = rating_target
+    before = service.get_terms(emp_id).comment_count
+
+    def rate():
+        rating_service = RatingService()
+        for _ in range(10):
+            rating_service.create_rating(queue_id, emp_id, SCORES, "helpful staff")
+
+    threads = [threading.Thread(target=rate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.get_terms(emp_id).comment_count == before + 80
+    assert service.reconcile(apply=False) == []
+
+
+def test_create_rating_round_trips(backend, service, rating_target):
+    queue_id, emp_id = rating_target
+    before = backend.call_count
+    RatingService().create_rating(queue_id, emp_id, SCORES, "very helpful")
+    # The rating insert, then one call each for the summary and the comment terms
+    assert backend.call_count - before == 3
+
+
+def test_comment_recorded_during_the_scan_is_kept(backend, service, rating_target, monkeypatch):
+    queue_id, emp_id = rating_target
+    read_comments = service.rating_repository.iter_comments
+
+    def comment_after_reading():
+        yield from read_comments()
+        RatingService().create_rating(queue_id, emp_id, SCORES, "helpful staff")
+
+    monkeypatch.setattr(service.rating_repository, "iter_comments", comment_after_reading)
+    assert service.reconcile() == []
+    monkeypatch.undo()
+    assert service.reconcile(apply=False) == []
+
+
+def test_terms_written_before_the_repair_are_not_overwritten(backend, service, rating_target, monkeypatch):
+    queue_id, emp_id = rating_target
+    backend.query(None, "update comment_terms set terms = '{}', comment_count = 0, updated_at = '2000-01-01T00:00:00' where emp_id = ?", [str(emp_id)])
+    read_terms = service.repository.get_all
+
+    def comment_after_reading():
+        stored = read_terms()
+        RatingService().create_rating(queue_id, emp_id, SCORES, "helpful staff")
+        return stored
+
+    monkeypatch.setattr(service.repository, "get_all", comment_after_reading)
+    service.reconcile()
+    assert service.get_terms(emp_id).comment_count == 1
+
+    monkeypatch.undo()
+    service.reconcile()
+    assert service.reconcile(apply=False) == []
+
+
+def test_reconcile_counts_terms_per_employee(backend, service, rating_target):
+    queue_id, emp_id = rating_target
+    backend.query(None, "delete from comment_terms")
+    service.reconcile()
+    comments = [row["comments"] for row in backend.query(None, "select comments from ratings where emp_id = ? and comments <> ''", [str(emp_id)])]
+    terms = service.get_terms(emp_id)
+    assert terms.comment_count == len(comments)
+    assert sum(terms.terms.values()) == sum(len(tokenize(comment)) for comment in comments)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.config import SETTLE_SECONDS
+from services.export_service import ExportService
+from utils.data.parquet_archive import ParquetArchive
+from utils.data.synthetic import DEFAULT_END
+from utils.data.timestamps import to_local
+
+
+def add_clients(backend, *created_at):
+    backend.table("clients").insert([{"first_name": "Juan", "last_name": "Dela Cruz", "created_at": value} for value in created_at]).execute()
+
+
+def months(archive, table):
+    return sorted(path.name for path in (archive.directory / table).iterdir() if not path.name.startswith("."))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ParquetArchive(tmp_path)
+
+
+def test_rows_are_filed_under_their_local_month(empty_backend, archive):
+    # 23:00 on 30 September and 04:00 on 1 October in Manila
+    add_clients(empty_backend, "2026-09-30T15:00:00Z", "2026-09-30T20:00:00Z")
+    ExportService(archive.directory).export(["clients"], now=datetime(2026, 10, 2))
+
+    assert months(archive, "clients") == ["month=2026-09", "month=2026-10"]
+    assert len(archive.read("clients", start=datetime(2026, 10, 1))) == 1
+    assert len(archive.read("clients", end=datetime(2026, 9, 30, 23, 59))) == 1
+
+
+def test_export_matches_the_source_tables(backend, archive):
+    result = ExportService(archive.directory).export(now=DEFAULT_END + timedelta(days=2))
+
+    for table in ("employees", "clients", "queues", "ratings"):
+        count = backend.query(None, f"select count(*) as n from {table}")[0]["n"]
+        assert result[table]["rows"] == count
+        assert len(archive.read(table)) == count
+
+    office = backend.query(None, "select office from employees group by office order by count(*) desc limit 1")[0]["office"]
+    office_ratings = backend.query(None, "select count(*) as n from ratings join employees using (emp_id) where office = ?", [office])[0]["n"]
+    assert len(archive.read("ratings", offices=[office])) == office_ratings
+
+
+def test_watermark_resumes_from_the_last_month(empty_backend, archive):
+    service = ExportService(archive.directory)
+    add_clients(empty_backend, "2026-08-10T09:00:00", "2026-10-10T09:00:00")
+    first = service.export(["clients"], now=datetime(2026, 10, 15))
+    assert first["clients"]["months"] == 3
+    assert archive.watermark("clients") == to_local(datetime(2026, 10, 15)) - timedelta(seconds=SETTLE_SECONDS)
+
+    add_clients(empty_backend, "2026-10-16T09:00:00")
+    second = service.export(["clients"], now=datetime(2026, 10, 20))
+    # Only October is exported again, and its rows are not duplicated
+    assert second["clients"]["months"] == 1
+    assert len(archive.read("clients")) == 3
+
+
+def test_archive_reads_aware_bounds_as_local_time(empty_backend, archive):
+    add_clients(empty_backend, "2026-10-01T08:00:00", "2026-10-01T12:00:00")
+    ExportService(archive.directory).export(["clients"], now=datetime(2026, 10, 2))
+
+    assert len(archive.read("clients", start=datetime(2026, 10, 1, 10, 0))) == 1
+    assert len(archive.read("clients", start=to_local(datetime(2026, 10, 1, 10, 0)).astimezone(None))) == 1
+
+
+def test_partitions_are_replaced_whole(empty_backend, archive):
+    add_clients(empty_backend, "2026-10-01T08:00:00")
+    service = ExportService(archive.directory)
+    service.export(["clients"], now=datetime(2026, 10, 2))
+    service.export(["clients"], rebuild=True, now=datetime(2026, 10, 2))
+    assert len(archive.read("clients")) == 1
+
+    archive.remove("clients")
+    assert archive.watermark("clients") is None
+    assert len(archive.read("clients")) == 0
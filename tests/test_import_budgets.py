@@ -0,0 +1,8 @@
+from benchmarks import import_profile
+
+
+def test_pages_stay_within_import_budgets(capsys):
+    """Every page's cold-start imports fit the budget in benchmarks/import_budgets.json."""
+    status = import_profile.main(["--check", "--repeat", "1"])
+    report = capsys.readouterr().out
+    assert status == 0, report
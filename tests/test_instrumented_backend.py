@@ -0,0 +1,188 @@
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from core import aio
+from core.backends.async_backend import ThreadedAsyncBackend
+from core.backends.base import StorageBackend
+from core.backends.instrumented import BackendUnavailableError, CircuitBreaker, InstrumentedBackend, is_transient
+from core.metrics import BackendMetrics
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+        self.count = None
+
+
+class ScriptedBackend(StorageBackend):
+    """Answers requests with the next scripted outcome: an exception to raise or rows to return."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def table(self, name: str):
+        return ScriptedRequest(self)
+
+    def rpc(self, name: str, params: dict = None):
+        return ScriptedRequest(self)
+
+
+class ScriptedRequest:
+    def __init__(self, backend: ScriptedBackend):
+        self.backend = backend
+
+    def __getattr__(self, attribute):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.backend.calls += 1
+        outcome = self.backend.outcomes.pop(0) if self.backend.outcomes else []
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return Response(outcome)
+
+
+def timeout():
+    return httpx.ReadTimeout("timed out")
+
+
+def constraint_violation():
+    return APIError({"code": "23505", "message": "duplicate key value violates unique constraint"})
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retries would otherwise sleep for the backoff between attempts."""
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+
+
+def instrumented(inner, **kwargs):
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=3, reset_seconds=60))
+    return InstrumentedBackend(inner, metrics=BackendMetrics(), **kwargs)
+
+
+def stats(backend, table="ratings", operation="select"):
+    return next(row for row in backend.metrics.snapshot() if (row["table"], row["operation"]) == (table, operation))
+
+
+def test_transient_errors():
+    assert is_transient(timeout())
+    assert is_transient(httpx.ConnectError("connection refused"))
+    assert is_transient(APIError({"code": "40001", "message": "could not serialize access"}))
+    assert is_transient(APIError({"code": "08006", "message": "connection failure"}))
+    assert not is_transient(constraint_violation())
+    assert not is_transient(APIError({"message": "no code"}))
+    assert not is_transient(ValueError("bad value"))
+
+
+def test_reads_are_retried_on_transient_errors():
+    inner = ScriptedBackend(timeout(), timeout(), [{"rating_id": 1}])
+    backend = instrumented(inner, read_retries=2)
+
+    assert backend.table("ratings").select("*").eq("rating_id", 1).execute().data == [{"rating_id": 1}]
+    assert inner.calls == 3
+    assert stats(backend)["retries"] == 2
+    assert stats(backend)["errors"] == 2
+    assert backend.breaker.state == "closed"
+
+
+def test_reads_give_up_after_the_last_retry():
+    inner = ScriptedBackend(timeout(), timeout(), timeout(), [])
+    backend = instrumented(inner, read_retries=2, breaker=CircuitBreaker(failure_threshold=10))
+
+    with pytest.raises(httpx.ReadTimeout):
+        backend.table("ratings").select("*").execute()
+    assert inner.calls == 3
+
+
+def test_permanent_errors_and_writes_are_not_retried():
+    inner = ScriptedBackend(constraint_violation(), timeout())
+    backend = instrumented(inner, read_retries=2)
+
+    with pytest.raises(APIError):
+        backend.table("ratings").select("*").execute()
+    assert inner.calls == 1
+    # A write that timed out may have been applied
+    with pytest.raises(httpx.ReadTimeout):
+        backend.table("ratings").insert({"rating_id": 1}).execute()
+    assert inner.calls == 2
+    assert stats(backend, operation="insert")["retries"] == 0
+
+
+def test_breaker_opens_after_consecutive_transient_failures():
+    inner = ScriptedBackend(timeout(), timeout(), timeout())
+    backend = instrumented(inner, read_retries=0)
+
+    for _ in range(3):
+        with pytest.raises(httpx.ReadTimeout):
+            backend.table("ratings").select("*").execute()
+    assert backend.breaker.state == "open"
+
+    # Rejected at once, without reaching the backend
+    with pytest.raises(BackendUnavailableError):
+        backend.table("ratings").select("*").execute()
+    assert inner.calls == 3
+    assert stats(backend)["rejected"] == 1
+
+
+def test_answered_errors_keep_the_breaker_closed():
+    inner = ScriptedBackend(timeout(), timeout(), constraint_violation(), timeout(), timeout())
+    backend = instrumented(inner, read_retries=0)
+
+    for _ in range(5):
+        with pytest.raises((httpx.ReadTimeout, APIError)):
+            backend.table("ratings").insert({}).execute()
+    # The constraint violation reset the run of failures
+    assert backend.breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    # Other requests are refused while the trial runs
+    with pytest.raises(BackendUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_a_failed_trial_opens_the_breaker_again():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.reset_seconds = 60
+    with pytest.raises(BackendUnavailableError):
+        breaker.before_call()
+
+
+def test_half_open_trial_through_the_backend():
+    inner = ScriptedBackend(timeout(), [{"rating_id": 1}])
+    backend = instrumented(inner, read_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0))
+
+    with pytest.raises(httpx.ReadTimeout):
+        backend.table("ratings").select("*").execute()
+    assert backend.breaker.state == "open"
+    assert backend.table("ratings").select("*").execute().data == [{"rating_id": 1}]
+    assert backend.breaker.state == "closed"
+
+
+def test_async_reads_are_retried():
+    inner = ScriptedBackend(timeout(), [{"rating_id": 1}])
+    backend = instrumented(ThreadedAsyncBackend(inner), read_retries=2)
+
+    assert aio.run(backend.table("ratings").select("*").execute()).data == [{"rating_id": 1}]
+    assert inner.calls == 2
+    assert stats(backend)["retries"] == 1
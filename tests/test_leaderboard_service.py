@@ -0,0 +1,56 @@
+from uuid import UUID
+
+import pytest
+
+from services.leaderboard_service import LeaderboardService
+from services.rating_summary_service import RatingSummaryService
+from utils.data.ranking import aggregate_score
+
+
+@pytest.fixture
+def leaderboard(backend):
+    RatingSummaryService().reconcile()
+    leaderboard = LeaderboardService(sync_interval=0)
+    leaderboard.sync()
+    return leaderboard
+
+
+def full_sort(backend):
+    aggregates = [summary.averages() for summary in RatingSummaryService().get_all_summaries().values()]
+    return [aggregate["emp_id"] for aggregate in sorted(aggregates, key=lambda aggregate: (-aggregate_score(aggregate), str(aggregate["emp_id"])))]
+
+
+def test_ranked_is_the_bayesian_order(backend, leaderboard):
+    ranked = [aggregate["emp_id"] for aggregate in leaderboard.ranked()]
+    assert ranked == full_sort(backend)
+    assert [leaderboard.rank(emp_id) for emp_id in ranked] == list(range(1, len(ranked) + 1))
+    assert [aggregate["emp_id"] for aggregate in leaderboard.top(3)] == ranked[:3]
+
+
+def test_summary_deleted_by_reconcile_is_dropped(backend, leaderboard):
+    emp_id = leaderboard.ranked()[0]["emp_id"]
+    # The employee's ratings go away, so reconcile deletes the summary
+    backend.query(None, "delete from ratings where emp_id = ?", [str(emp_id)])
+    RatingSummaryService().reconcile()
+
+    version = leaderboard.version
+    assert emp_id in leaderboard.sync()
+    assert leaderboard.version == version + 1
+    assert leaderboard.rank(emp_id) is None
+    assert [aggregate["emp_id"] for aggregate in leaderboard.ranked()] == full_sort(backend)
+
+
+def test_deleted_employee_is_not_ranked(backend, leaderboard):
+    ranked = [aggregate["emp_id"] for aggregate in leaderboard.ranked()]
+    backend.query(None, "delete from employees where emp_id = ?", [str(ranked[0])])
+    leaderboard.employee_repository._invalidate()
+
+    assert leaderboard.rank(ranked[0]) is None
+    assert leaderboard.rank(ranked[1]) == 1
+    assert [aggregate["emp_id"] for aggregate in leaderboard.ranked()] == ranked[1:]
+
+
+def test_unchanged_sync_reports_nothing(leaderboard):
+    version = leaderboard.version
+    assert leaderboard.sync() == []
+    assert leaderboard.version == version
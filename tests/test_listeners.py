@@ -0,0 +1,48 @@
+import logging
+
+import pytest
+
+from core.listeners import ListenerRegistry
+
+
+class Service(ListenerRegistry):
+    _listeners = []
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def saved(self, value):
+        self.calls.append(value)
+
+
+class Failing:
+    def saved(self, value):
+        raise RuntimeError("listener is broken")
+
+
+@pytest.fixture
+def listeners():
+    yield Service._listeners
+    Service._listeners.clear()
+
+
+def test_listeners_are_added_once_and_removed(listeners):
+    recorder = Recorder()
+    Service.add_listener(recorder)
+    Service.add_listener(recorder)
+    Service.notify_listeners("saved", 1)
+    Service.remove_listener(recorder)
+    Service.notify_listeners("saved", 2)
+    assert recorder.calls == [1]
+
+
+def test_a_failing_listener_does_not_stop_the_others(listeners, caplog):
+    first, second = Recorder(), Recorder()
+    for listener in (first, Failing(), second):
+        Service.add_listener(listener)
+    with caplog.at_level(logging.ERROR, logger="core.listeners"):
+        Service.notify_listeners("saved", 1)
+    assert first.calls == [1] and second.calls == [1]
+    assert "listener is broken" in caplog.text
@@ -0,0 +1,70 @@
+from datetime import datetime, time
+
+import numpy as np
+import pytest
+
+from services.queue_service import QueueService
+from utils.data.queue_stats import QueueOfficeLookup, QueueStats, UNASSIGNED_OFFICE, histogram_percentile
+from utils.data.timestamps import to_local
+
+
+def timestamps(*values):
+    return np.array(values, dtype="datetime64[us]")
+
+
+def test_add_buckets_arrivals_and_service_times():
+    stats = QueueStats(["Treasury", "Assessor"])
+    # Monday 2026-10-12 at 09:xx and Tuesday at 14:00, the last queue is still open
+    stats.add(
+        timestamps("2026-10-12T09:00", "2026-10-12T09:30", "2026-10-13T14:00"),
+        timestamps("2026-10-12T09:10", "2026-10-12T10:30", "NaT"),
+        np.array([0, -1, 1]),
+    )
+
+    assert stats.total_queues == 3
+    assert stats.open_queues == 1
+    assert stats.arrivals_by_hour[9] == 2 and stats.arrivals_by_hour[14] == 1
+    assert stats.arrivals_by_weekday.tolist() == [2, 1, 0, 0, 0, 0, 0]
+    assert dict(zip(stats.offices, stats.arrivals_by_office.tolist())) == {"Treasury": 1, "Assessor": 1, UNASSIGNED_OFFICE: 1}
+    assert stats.service_by_hour[9].sum() == 2
+    assert stats.summary()["closed"] == 2
+
+    by_office = stats.by_office()
+    assert by_office["office"].tolist() == ["Treasury", "Assessor", UNASSIGNED_OFFICE]
+    assert by_office["closed"].tolist() == [1, 0, 1]
+
+
+def test_percentiles_are_close_to_exact():
+    rng = np.random.default_rng(3)
+    seconds = rng.lognormal(np.log(600), 0.7, size=5000)
+    created = np.full(len(seconds), np.datetime64("2026-10-12T09:00", "us"))
+    stats = QueueStats([])
+    stats.add(created, created + (seconds * 1e6).astype("timedelta64[us]"), np.full(len(seconds), -1))
+
+    summary = stats.summary()
+    for q in (50, 90, 99):
+        assert summary[f"p{q}"] == pytest.approx(np.percentile(seconds, q), rel=0.03)
+    assert histogram_percentile(np.zeros(10), 50) is None
+
+
+def test_office_lookup_keeps_the_first_rating():
+    lookup = QueueOfficeLookup.from_pages([[{"queue_id": 2, "emp_id": "a"}, {"queue_id": 1, "emp_id": "b"}], [{"queue_id": 2, "emp_id": "b"}]], {"a": 0, "b": 1})
+    assert lookup.lookup(np.array([1, 2, 3])).tolist() == [1, 0, -1]
+
+
+def test_queue_stats_count_the_queues_in_range(backend):
+    start, end = datetime(2025, 5, 1), datetime(2025, 5, 31, 23, 59, 59)
+    stats = QueueService().get_queue_stats(start, end)
+    expected = backend.query(None, "select count(*) as n from queues where created_at between ? and ?", [start, end])[0]["n"]
+    assert stats.total_queues == expected
+
+
+def test_queue_stats_use_local_days(empty_backend):
+    client_id = empty_backend.table("clients").insert({"first_name": "Juan", "last_name": "Dela Cruz"}).execute().data[0]["client_id"]
+    # 04:00 on the 17th in Manila, the evening of the 16th in UTC
+    empty_backend.table("queues").insert({"client_id": client_id, "created_at": "2026-10-16T20:00:00Z", "ended_at": "2026-10-16T20:10:00Z"}).execute()
+
+    day = datetime(2026, 10, 17).date()
+    stats = QueueService().get_queue_stats(to_local(datetime.combine(day, time.min)), to_local(datetime.combine(day, time.max)))
+    assert stats.total_queues == 1
+    assert stats.arrivals_by_hour[4] == 1
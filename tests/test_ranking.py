@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from utils.data.ranking import OrderStatisticTree, bayesian_score, top_k
+
+
+def test_tree_matches_a_sorted_list_under_random_edits():
+    rng = random.Random(11)
+    tree, expected = OrderStatisticTree(seed=3), []
+    for _ in range(2000):
+        key = rng.randint(0, 200)
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            assert tree.remove(key)
+            expected.remove(key)
+        else:
+            tree.insert(key)
+            expected.append(key)
+    expected.sort()
+    assert list(tree) == expected
+    assert len(tree) == len(expected)
+    for index in range(0, len(expected), 37):
+        assert tree.select(index) == expected[index]
+        assert tree.rank(expected[index]) == expected.index(expected[index])
+    assert tree.first(5) == expected[:5]
+
+
+def test_ties_keep_every_copy_and_rank_at_the_first():
+    tree = OrderStatisticTree([3, 1, 3, 3, 2], seed=1)
+    assert list(tree) == [1, 2, 3, 3, 3]
+    assert tree.rank(3) == 2
+    assert tree.rank(4) == 5
+    assert tree.remove(3)
+    assert list(tree) == [1, 2, 3, 3]
+
+
+def test_missing_keys():
+    tree = OrderStatisticTree([(-4.5, "b"), (-4.5, "a")], seed=1)
+    assert not tree.remove((-4.5, "c"))
+    assert (-4.5, "a") in tree and (-4.5, "c") not in tree
+    # Equal scores are ordered by emp_id, as the leaderboard keys are
+    assert tree.select(0) == (-4.5, "a")
+    with pytest.raises(IndexError):
+        tree.select(2)
+
+
+def test_bayesian_score_shrinks_few_ratings_towards_the_prior():
+    one_five_star = bayesian_score(5.0, 1, prior_mean=4.0, prior_weight=10)
+    many_high = bayesian_score(4.9, 300, prior_mean=4.0, prior_weight=10)
+    assert many_high > one_five_star
+    assert bayesian_score(0, 0, prior_mean=4.0, prior_weight=10) == 4.0
+    assert bayesian_score(3.0, 10, prior_mean=4.0, prior_weight=10) == pytest.approx(3.5)
+    assert bayesian_score(4.2, 5, prior_mean=4.0, prior_weight=0) == 4.2
+
+
+def test_top_k_is_best_first():
+    assert top_k([3, 9, 1, 7, 5], 3, key=lambda value: value) == [9, 7, 5]
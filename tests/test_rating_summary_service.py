@@ -0,0 +1,140 @@
+import logging
+import threading
+from uuid import UUID
+
+import pytest
+from postgrest.exceptions import APIError
+
+from core.backends import sqlite_functions
+from models.models import Rating
+from repositories.base_repository import BaseRepository
+from services.rating_service import RatingService
+from services.rating_summary_service import RatingSummaryService
+
+SCORES = {"first": 5, "second": 4, "third": 3, "fourth": 2}
+
+
+@pytest.fixture
+def service(backend):
+    service = RatingSummaryService()
+    service.reconcile()
+    return service
+
+
+@pytest.fixture
+def emp_id(backend):
+    return UUID(backend.query(None, "select emp_id from employees order by emp_id limit 1")[0]["emp_id"])
+
+
+@pytest.fixture
+def queue_id(backend):
+    return backend.query(None, "select queue_id from queues order by queue_id limit 1")[0]["queue_id"]
+
+
+def failing_rpc(backend, code, failures):
+    """Replaces record_rating_summary with one that fails `failures` times with `code`, then runs normally."""
+    calls = []
+
+    def record_rating_summary(backend, **params):
+        calls.append(params)
+        if len(calls) <= failures:
+            raise APIError({"code": code, "message": "injected failure"})
+        return sqlite_functions.record_rating_summary(backend, **params)
+
+    backend.register_function("record_rating_summary", record_rating_summary)
+    return calls
+
+
+def test_first_rating_creates_the_summary(backend, service, emp_id):
+    backend.query(None, "delete from rating_summaries where emp_id = ?", [str(emp_id)])
+    summary = service.record_rating(Rating(emp_id=emp_id, first_criteria=4, second_criteria=None, third_criteria=5, fourth_criteria=1))
+    assert summary.rating_count == 1
+    assert summary.sums == {"first_criteria": 4, "second_criteria": 0, "third_criteria": 5, "fourth_criteria": 1}
+    assert summary.counts["second_criteria"] == 0
+    assert summary.histograms["first_criteria"] == [0, 0, 0, 1, 0]
+
+
+def test_concurrent_ratings_all_count(service, emp_id, queue_id):
+    before = service.get_summary(emp_id).rating_count
+
+    def rate():
+        rating_service = RatingService()
+        for _ in range(10):
+            rating_service.create_rating(queue_id, emp_id, SCORES)
+
+    threads = [threading.Thread(target=rate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.get_summary(emp_id).rating_count == before + 80
+    assert service.reconcile(apply=False) == []
+
+
+def test_conflict_is_retried(backend, service, emp_id):
+    before = service.get_summary(emp_id).rating_count
+    calls = failing_rpc(backend, "40001", failures=2)
+    summary = service.record_rating(Rating(emp_id=emp_id, first_criteria=3))
+    assert len(calls) == 3
+    assert summary.rating_count == before + 1
+
+
+def test_dropped_update_is_logged_and_counted(backend, service, emp_id, queue_id, caplog):
+    dropped = RatingSummaryService.dropped_updates
+    calls = failing_rpc(backend, "40001", failures=BaseRepository.MAX_RPC_ATTEMPTS)
+    with caplog.at_level(logging.ERROR, logger="services.rating_summary_service"):
+        rating = RatingService().create_rating(queue_id, emp_id, SCORES)
+    assert rating is not None
+    assert len(calls) == BaseRepository.MAX_RPC_ATTEMPTS
+    assert RatingSummaryService.dropped_updates == dropped + 1
+    assert str(emp_id) in caplog.text
+
+    # The rating was saved without its summary update until reconcile repairs it
+    assert [entry["emp_id"] for entry in service.reconcile()] == [emp_id]
+    assert service.reconcile(apply=False) == []
+
+
+def test_other_errors_are_not_retried(backend, service, emp_id):
+    dropped = RatingSummaryService.dropped_updates
+    calls = failing_rpc(backend, "XX000", failures=1)
+    assert service.record_rating(Rating(emp_id=emp_id, first_criteria=3)) is None
+    assert len(calls) == 1
+    assert RatingSummaryService.dropped_updates == dropped + 1
+
+
+def rating_count(backend, emp_id):
+    return backend.query(None, "select count(*) as n from ratings where emp_id = ?", [str(emp_id)])[0]["n"]
+
+
+def test_rating_recorded_during_the_scan_is_kept(backend, service, emp_id, queue_id, monkeypatch):
+    read_matrix = service.rating_repository.get_rating_matrix
+
+    def rate_after_reading():
+        matrix = read_matrix()
+        RatingService().create_rating(queue_id, emp_id, SCORES)
+        return matrix
+
+    monkeypatch.setattr(service.rating_repository, "get_rating_matrix", rate_after_reading)
+    assert service.reconcile() == []
+    assert service.get_summary(emp_id).rating_count == rating_count(backend, emp_id)
+
+
+def test_summary_written_before_the_repair_is_not_overwritten(backend, service, emp_id, queue_id, monkeypatch):
+    backend.query(None, "update rating_summaries set rating_count = 0, updated_at = '2000-01-01T00:00:00' where emp_id = ?", [str(emp_id)])
+    read_summaries = service.get_all_summaries
+
+    def rate_after_reading():
+        summaries = read_summaries()
+        RatingService().create_rating(queue_id, emp_id, SCORES)
+        return summaries
+
+    monkeypatch.setattr(service, "get_all_summaries", rate_after_reading)
+    service.reconcile()
+    # The repair lost the race to the new rating and left its summary alone
+    assert service.get_summary(emp_id).rating_count == 1
+
+    monkeypatch.undo()
+    service.reconcile()
+    assert service.get_summary(emp_id).rating_count == rating_count(backend, emp_id)
+    assert service.reconcile(apply=False) == []
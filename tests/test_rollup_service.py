@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta, timezone
+
+from core.config import SETTLE_SECONDS
+from services.rollup_service import RollupService
+from utils.data.rollups import count_by_day
+from utils.data.synthetic import DEFAULT_END
+from utils.data.timestamps import to_local
+
+
+def add_clients(backend, *created_at):
+    backend.table("clients").insert([{"first_name": "Juan", "last_name": "Dela Cruz", "created_at": value} for value in created_at]).execute()
+
+
+def activity(day):
+    return RollupService().get_daily_activity(day, day).iloc[0].to_dict()
+
+
+def test_refresh_counts_utc_rows_on_their_local_day(empty_backend):
+    """23:00Z and 04:00Z are both on the 17th in Manila, the day windows must not shift by the UTC offset."""
+    add_clients(empty_backend, "2026-10-16T23:00:00Z", "2026-10-17T04:00:00+00:00")
+    RollupService().refresh(datetime(2026, 10, 17, 20, 0))
+
+    assert activity(date(2026, 10, 17))["clients"] == 2
+    assert activity(date(2026, 10, 16))["clients"] == 0
+
+
+def test_refresh_accepts_an_aware_now(empty_backend):
+    add_clients(empty_backend, "2026-10-16T23:00:00Z", "2026-10-17T04:00:00Z")
+    result = RollupService().refresh(datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc))
+
+    assert activity(date(2026, 10, 17))["clients"] == 2
+    assert result["watermark"] == to_local(datetime(2026, 10, 17, 20, 0)) - timedelta(seconds=SETTLE_SECONDS)
+
+
+def test_refresh_matches_a_full_recount(backend):
+    RollupService().refresh(DEFAULT_END + timedelta(days=2))
+    frame = RollupService().get_daily_activity()
+
+    for table, column in (("clients", "clients"), ("queues", "queues"), ("ratings", "ratings")):
+        expected = count_by_day([backend.query(None, f"select created_at from {table}")], "created_at")
+        assert {str(day.date()): count for day, count in frame[column].items() if count} == dict(expected)
+    closed = count_by_day([backend.query(None, "select ended_at from queues where ended_at is not null")], "ended_at")
+    assert frame["closed_queues"].sum() == sum(closed.values())
+
+
+def test_watermark_resumes_without_double_counting(empty_backend):
+    service = RollupService()
+    add_clients(empty_backend, "2026-10-17T09:00:00")
+    first = service.refresh(datetime(2026, 10, 17, 10, 0))
+    assert service.watermark_repository.get(RollupService.WATERMARK) == first["watermark"]
+    assert first["watermark"].tzinfo is not None
+
+    # Nothing new before the cutoff: no days are recomputed
+    assert service.refresh(datetime(2026, 10, 17, 10, 0))["days"] == 0
+
+    add_clients(empty_backend, "2026-10-17T11:00:00", "2026-10-18T01:00:00")
+    service.refresh(datetime(2026, 10, 18, 9, 0))
+    assert activity(date(2026, 10, 17))["clients"] == 2
+    assert activity(date(2026, 10, 18))["clients"] == 1
+
+
+def test_count_by_day_buckets_by_local_day():
+    pages = [
+        [{"created_at": "2026-10-16T15:59:59+00:00"}, {"created_at": "2026-10-16T16:00:00+00:00"}],
+        [{"created_at": "2026-10-17T08:00:00"}, {"created_at": None}],
+    ]
+    assert count_by_day(pages, "created_at") == {"2026-10-16": 1, "2026-10-17": 2}
@@ -0,0 +1,87 @@
+import os
+
+import pyarrow as pa
+import pytest
+
+from core.shared_cache import SharedCache
+
+
+def table(*values):
+    return pa.table({"value": list(values)})
+
+
+def arrow_files(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith(".arrow"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedCache(str(tmp_path))
+
+
+def test_publish_bumps_the_version(cache):
+    assert cache.read("offices") is None
+    generation = cache.begin_build("offices", ["offices"])
+    assert cache.entry("offices")["fresh"] is False
+
+    assert cache.publish("offices", table(1, 2), generation) == 1
+    assert cache.read("offices").column("value").to_pylist() == [1, 2]
+    assert cache.publish("offices", table(3), cache.begin_build("offices", ["offices"])) == 2
+    assert cache.read("offices").column("value").to_pylist() == [3]
+    assert cache.entry("offices")["rows"] == 1
+
+
+def test_readers_see_another_process_publish(cache, tmp_path):
+    reader = SharedCache(str(tmp_path))
+    cache.publish("offices", table(1), cache.begin_build("offices", ["offices"]))
+    first = reader.read("offices")
+    # Mapped once per version
+    assert reader.read("offices") is first
+
+    cache.publish("offices", table(2), cache.begin_build("offices", ["offices"]))
+    assert reader.read("offices").column("value").to_pylist() == [2]
+
+
+def test_old_versions_are_removed_but_the_previous_one(cache):
+    for value in range(4):
+        cache.publish("offices", table(value), cache.begin_build("offices", ["offices"]))
+    assert arrow_files(cache) == ["offices-3.arrow", "offices-4.arrow"]
+
+
+def test_writes_to_a_source_table_make_the_entry_stale(cache):
+    cache.publish("leaderboard", table(1), cache.begin_build("leaderboard", ["ratings", "employees"]))
+    cache.publish("offices", table(1), cache.begin_build("offices", ["offices"]))
+
+    cache.invalidate("ratings")
+    assert cache.read("leaderboard") is None
+    assert cache.read("offices") is not None
+    assert cache.stats()["leaderboard"]["fresh"] is False
+
+    cache.publish("leaderboard", table(2), cache.begin_build("leaderboard", ["ratings", "employees"]))
+    assert cache.read("leaderboard").column("value").to_pylist() == [2]
+
+
+def test_a_build_that_raced_a_write_stays_stale(cache):
+    generation = cache.begin_build("leaderboard", ["ratings"])
+    cache.invalidate("ratings")  # a rating saved while the table was being built
+    version = cache.publish("leaderboard", table(1), generation)
+
+    assert cache.entry("leaderboard")["version"] == version
+    assert cache.read("leaderboard") is None
+
+
+def test_one_process_holds_the_writer_lease(cache, tmp_path):
+    other = SharedCache(str(tmp_path))
+    assert cache.acquire_lease(60)
+    assert not other.acquire_lease(60)
+    # The holder renews it
+    assert cache.acquire_lease(60)
+    # Leases are per name
+    assert other.acquire_lease(60, name="search")
+
+
+def test_an_expired_lease_is_taken_over(cache, tmp_path):
+    other = SharedCache(str(tmp_path))
+    assert cache.acquire_lease(-1)
+    assert other.acquire_lease(60)
+    assert not cache.acquire_lease(60)
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class ImageCache:
+    """
+    Least-recently-used cache of rendered images as bytes.
+
+    Entries live in memory and, when `directory` is set, also on disk so they
+    survive restarts and are shared by processes on the same host. Both tiers
+    hold at most `max_entries` images; the least recently used are evicted.
+    Keys should change whenever the image's inputs change (e.g. include a
+    version), so entries never need invalidating.
+
+    Args:
+        max_entries: Images kept per tier.
+        directory: Optional folder for the disk tier, created if missing.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None, suffix: str = ".png"):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._read_file(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            self._remember(key, data)
+        if self.directory:
+            self._write_file(key, data)
+
+    def get_or_create(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Returns the cached image for key, rendering and storing it on a miss."""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def _remember(self, key: str, data: bytes):
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- Disk tier ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + self.suffix)
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as image:
+                data = image.read()
+            os.utime(path)  # mark as recently used
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, key: str, data: bytes):
+        path = self._path(key)
+        # Write then rename so concurrent readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as image:
+            image.write(data)
+        os.replace(temp_path, path)
+        self._evict_files()
+
+    def _evict_files(self):
+        files = [entry for entry in os.scandir(self.directory) if entry.name.endswith(self.suffix)]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
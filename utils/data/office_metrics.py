@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable
+from uuid import UUID
+
+from models.models import RATING_CRITERIA, build_aggregate
+from utils.data.ranking import aggregate_score
+
+
+def office_metrics(employees: Iterable[Any], aggregates: Dict[UUID, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Rating metrics of every office in one pass over its employees joined to
+    their rating aggregates (see build_aggregate), e.g. the rating summaries
+    or a rollup window.
+
+    Each office gets num_employees, rated_employees, rating_count, the
+    criteria sums and counts, rating-weighted criteria averages and overall
+    score (every rating counts once, however its employee is rated), the
+    Bayesian score offices are ranked by, and a 1-based rank. Offices without
+    ratings have rank None and come last.
+
+    Args:
+        employees: Employee models; those without an office are skipped.
+        aggregates: Rating aggregates by emp_id; employees missing from it have no ratings.
+
+    Returns:
+        The metrics by office name, in rank order.
+    """
+    totals: Dict[str, Dict[str, Any]] = {}
+    for emp in employees:
+        if not emp.office:
+            continue
+        total = totals.setdefault(emp.office, {
+            "num_employees": 0,
+            "rated_employees": 0,
+            "rating_count": 0,
+            "sums": dict.fromkeys(RATING_CRITERIA, 0),
+            "counts": dict.fromkeys(RATING_CRITERIA, 0),
+        })
+        total["num_employees"] += 1
+        aggregate = aggregates.get(emp.emp_id)
+        if not aggregate or not aggregate["rating_count"]:
+            continue
+        total["rated_employees"] += 1
+        total["rating_count"] += aggregate["rating_count"]
+        for criterion in RATING_CRITERIA:
+            total["sums"][criterion] += aggregate["sums"].get(criterion, 0)
+            total["counts"][criterion] += aggregate["counts"].get(criterion, 0)
+
+    metrics = {}
+    for office, total in totals.items():
+        office_aggregate = build_aggregate(None, total["sums"], total["counts"], total["rating_count"])
+        del office_aggregate["emp_id"]
+        metrics[office] = {
+            "office": office,
+            "num_employees": total["num_employees"],
+            "rated_employees": total["rated_employees"],
+            **office_aggregate,
+            "score": aggregate_score(office_aggregate) if total["rating_count"] else None,
+        }
+
+    ranked = sorted(metrics.values(), key=lambda office: (office["score"] is None, -(office["score"] or 0), office["office"]))
+    for position, office in enumerate(ranked, start=1):
+        office["rank"] = position if office["score"] is not None else None
+    return {office["office"]: office for office in ranked}
@@ -0,0 +1,262 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from models.batches import ClientBatch, EmployeeBatch, QueueBatch, RatingBatch, RecordBatch
+from utils.data.timestamps import to_local
+
+# Batch type of each exported table, which fixes its Parquet schema
+BATCH_TYPES = {"ratings": RatingBatch, "queues": QueueBatch, "clients": ClientBatch, "employees": EmployeeBatch}
+# Hive partition keys of each table, outermost first
+PARTITION_KEYS = {"ratings": ("month", "office"), "queues": ("month", "office"), "clients": ("month",), "employees": ("office",)}
+# Rows buffered per partition before they are written out as one Parquet row group
+ROW_GROUP_ROWS = 65_536
+MANIFEST_NAME = "_manifest.json"
+
+
+def month_key(value: date) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def wall_clock(value: datetime) -> datetime:
+    """Local wall-clock time as a naive datetime, the frame archived timestamps are stored in."""
+    return to_local(value).replace(tzinfo=None)
+
+
+def table_schema(table: str) -> pa.Schema:
+    """
+    The Parquet schema of a table: its batch type's columns with dictionary
+    columns stored plain, since Parquet dictionary-encodes repeated values
+    itself and reads fixed-width binary back without the Arrow dictionary.
+    """
+    return pa.schema([
+        (name, data_type.value_type if pa.types.is_dictionary(data_type) else data_type)
+        for name, data_type in BATCH_TYPES[table].column_types.items()
+    ])
+
+
+def restore_dictionaries(table: pa.Table, batch_type) -> pa.Table:
+    """Re-encodes the columns the batch type keeps dictionary-encoded."""
+    for name, data_type in batch_type.column_types.items():
+        if pa.types.is_dictionary(data_type) and name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, pc.dictionary_encode(table.column(name)).cast(data_type))
+    return table
+
+
+def conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Orders the columns as in `schema`, adding null columns for any that are missing."""
+    columns = []
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, field.type))
+        elif table.schema.field(field.name).type != field.type:
+            columns.append(table.column(field.name).cast(field.type))
+        else:
+            columns.append(table.column(field.name))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class PartitionWriter:
+    """
+    Streams Arrow tables into Parquet files under one directory, one file per
+    office subdirectory (or a single file when rows have no office).
+
+    Rows are buffered per office and flushed as a row group once
+    ROW_GROUP_ROWS accumulate, so memory is bounded by the number of offices
+    times the row group size, whatever the size of the month being written.
+    """
+
+    def __init__(self, directory: str, schema: pa.Schema, target: Optional[str] = None):
+        self.directory = directory
+        self.schema = schema
+        # Where ParquetArchive.commit_partition moves the files
+        self.target = target
+        self.rows = 0
+        self._writers: Dict[Optional[str], pq.ParquetWriter] = {}
+        self._buffers: Dict[Optional[str], List[pa.Table]] = {}
+        self._buffered: Dict[Optional[str], int] = {}
+
+    def write(self, table: pa.Table, offices: Optional[Sequence[str]] = None):
+        """Adds rows; `offices` names the office partition of each row."""
+        table = conform(table, self.schema)
+        if offices is None:
+            self._add(None, table)
+            return
+        offices = np.asarray(offices, dtype=object)
+        for office in np.unique(offices):
+            self._add(office, table.filter(pa.array(offices == office)))
+
+    def _add(self, office: Optional[str], table: pa.Table):
+        self._buffers.setdefault(office, []).append(table)
+        self._buffered[office] = self._buffered.get(office, 0) + table.num_rows
+        if self._buffered[office] >= ROW_GROUP_ROWS:
+            self._flush(office)
+
+    def _flush(self, office: Optional[str]):
+        tables = self._buffers.pop(office, [])
+        self._buffered.pop(office, None)
+        if not tables:
+            return
+        writer = self._writers.get(office)
+        if writer is None:
+            directory = self.directory if office is None else os.path.join(self.directory, f"office={quote(office, safe='')}")
+            os.makedirs(directory, exist_ok=True)
+            writer = self._writers[office] = pq.ParquetWriter(os.path.join(directory, "part-0.parquet"), self.schema)
+        table = pa.concat_tables(tables).combine_chunks()
+        writer.write_table(table, row_group_size=ROW_GROUP_ROWS)
+        self.rows += table.num_rows
+
+    def close(self) -> int:
+        """Flushes the remaining rows, closes the files and returns the rows written."""
+        for office in list(self._buffers):
+            self._flush(office)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        return self.rows
+
+
+class ParquetArchive:
+    """
+    Parquet copies of the ratings, queues, clients and employees tables under
+    one directory, for analysts and for dashboard reads over past months.
+
+    Layout (hive partitioning):
+
+        ratings/month=2025-01/office=<office>/part-0.parquet
+        queues/month=2025-01/office=<office>/part-0.parquet
+        clients/month=2025-01/part-0.parquet
+        employees/office=<office>/part-0.parquet
+        _manifest.json    table -> {"watermark": last created_at exported}
+
+    Partitions are replaced whole: a month is written to a temporary
+    directory next to it and swapped in, so readers never see half a month.
+    Ids are stored as 16-byte binary and timestamps as local wall-clock time;
+    `read` returns the tables' batch types, whose to_pandas() gives id strings.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    # --- Manifest ---
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._manifest_path()) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+
+    def watermark(self, table: str) -> Optional[datetime]:
+        """Every row of `table` created up to this time is in the archive, as an aware local time."""
+        value = self.manifest().get(table, {}).get("watermark")
+        return to_local(datetime.fromisoformat(value)) if value else None
+
+    def set_watermark(self, table: str, watermark: Optional[datetime]):
+        manifest = self.manifest()
+        manifest[table] = {"watermark": to_local(watermark).isoformat() if watermark else None, "updated_at": datetime.now(timezone.utc).isoformat()}
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self._manifest_path()}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self._manifest_path())
+
+    # --- Writing ---
+
+    def partition_path(self, table: str, month: Optional[str] = None) -> str:
+        path = os.path.join(self.directory, table)
+        return path if month is None else os.path.join(path, f"month={month}")
+
+    def open_partition(self, table: str, month: Optional[str] = None) -> PartitionWriter:
+        """A writer into a temporary directory next to the partition; `commit_partition` swaps it in."""
+        target = self.partition_path(table, month)
+        parent = os.path.dirname(target)
+        os.makedirs(parent, exist_ok=True)
+        # Dot-prefixed directories are ignored by readers
+        return PartitionWriter(os.path.join(parent, f".tmp-{uuid.uuid4().hex}"), table_schema(table), target)
+
+    def commit_partition(self, writer: PartitionWriter) -> int:
+        """Closes the writer and replaces its partition (a month, or a whole table) with the new files."""
+        rows = writer.close()
+        os.makedirs(writer.directory, exist_ok=True)
+        old_dir = None
+        if os.path.isdir(writer.target):
+            old_dir = os.path.join(os.path.dirname(writer.target), f".old-{uuid.uuid4().hex}")
+            os.replace(writer.target, old_dir)
+        os.replace(writer.directory, writer.target)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        return rows
+
+    def remove(self, table: str):
+        shutil.rmtree(self.partition_path(table), ignore_errors=True)
+        self.set_watermark(table, None)
+
+    # --- Reading ---
+
+    def read(
+        self,
+        table: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        offices: Optional[Sequence[str]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> RecordBatch:
+        """
+        Reads archived rows created within [start, end], optionally for some
+        offices only. Month and office filters skip whole partitions, so a
+        read touches only the files of the months asked for.
+
+        Args:
+            table: "ratings", "queues", "clients" or "employees".
+            start: Only rows created at or after this time (naive values are local time).
+            end: Only rows created at or before this time (naive values are local time).
+            offices: Only rows of these offices (tables partitioned by office).
+            columns: Columns to read, including partition keys such as "office"; all by default.
+
+        Returns:
+            A batch of the table's type (RatingBatch, QueueBatch, ...).
+        """
+        batch_type = BATCH_TYPES[table]
+        path = self.partition_path(table)
+        if not os.path.isdir(path):
+            return batch_type.empty()
+        keys = PARTITION_KEYS[table]
+        dataset = ds.dataset(
+            path,
+            schema=pa.unify_schemas([table_schema(table), pa.schema([(key, pa.string()) for key in keys])]),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([(key, pa.string()) for key in keys]), flavor="hive"),
+        )
+
+        conditions = []
+        if start is not None:
+            start = wall_clock(start)
+            conditions.append(ds.field("created_at") >= pa.scalar(start, pa.timestamp("us")))
+            if "month" in keys:
+                conditions.append(ds.field("month") >= month_key(start))
+        if end is not None:
+            end = wall_clock(end)
+            conditions.append(ds.field("created_at") <= pa.scalar(end, pa.timestamp("us")))
+            if "month" in keys:
+                conditions.append(ds.field("month") <= month_key(end))
+        if offices is not None and "office" in keys:
+            conditions.append(ds.field("office").isin(list(offices)))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return batch_type(restore_dictionaries(dataset.to_table(columns=columns, filter=expression), batch_type))
@@ -1,2 +1,110 @@
 import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
 
+from models.models import empty_aggregate
+from utils.data.ranking import aggregate_score
+
+
+def prepare_employee_data(employee_service, rating_service, leaderboard=None) -> Tuple[List[Any], Dict[UUID, Any], Dict[str, UUID], List[Dict[str, Any]], Dict[UUID, Dict[str, Any]]]:
+    """
+    Fetches all employees, calculates all employees' average ratings,
+    and prepares data structures for efficient lookup and ranking.
+
+    Args:
+        employee_service: Source of the employees.
+        rating_service: Source of the rating aggregates when no leaderboard is given.
+        leaderboard: Optional LeaderboardService whose ranking, kept up to date
+            change by change, is used instead of sorting every aggregate.
+
+    Returns:
+        A tuple of (employees, employee_dict, employee_name_to_id,
+        ranked_employees_data, avg_ratings_by_id).
+    """
+    employees = employee_service.get_all_employees()
+    if leaderboard is not None:
+        return build_employee_data(employees, ranked=leaderboard.ranked())
+    return build_employee_data(employees, aggregates=rating_service.calculate_all_employee_average_ratings())
+
+
+async def prepare_employee_data_async(employee_service, rating_service, leaderboard=None) -> Tuple[List[Any], Dict[UUID, Any], Dict[str, UUID], List[Dict[str, Any]], Dict[UUID, Dict[str, Any]]]:
+    """
+    prepare_employee_data for AsyncEmployeeService and AsyncRatingService:
+    the employees and the ranking are read concurrently, so the page waits
+    for the slower of the two rather than both. Run it with core.aio.run.
+    """
+    import asyncio
+    from core import aio
+
+    if leaderboard is not None:
+        # The leaderboard syncs through the synchronous repositories; keep it off the event loop
+        employees, ranked = await aio.gather(employee_service.get_all_employees(), asyncio.to_thread(leaderboard.ranked))
+        return build_employee_data(employees, ranked=ranked)
+    employees, aggregates = await aio.gather(employee_service.get_all_employees(), rating_service.calculate_all_employee_average_ratings())
+    return build_employee_data(employees, aggregates=aggregates)
+
+
+def build_employee_data(employees: List[Any], ranked: Optional[List[Dict[str, Any]]] = None, aggregates: Optional[Dict[UUID, Dict[str, Any]]] = None) -> Tuple[List[Any], Dict[UUID, Any], Dict[str, UUID], List[Dict[str, Any]], Dict[UUID, Dict[str, Any]]]:
+    """
+    The lookup structures of prepare_employee_data from the fetched data:
+    either the leaderboard's `ranked` aggregates (already in rank order) or
+    the unordered `aggregates` by emp_id, which are ranked here the same way,
+    by Bayesian score (see utils.data.ranking).
+    """
+    employee_dict = {emp.emp_id: emp for emp in employees}
+    employee_name_to_id = {f"{emp.first_name} {emp.last_name}, {emp.position}": emp.emp_id for emp in employees}
+
+    if ranked is not None:
+        # Already in rank order; employees without ratings go last, as the sort below places them
+        ranked_rated = [avg_ratings for avg_ratings in ranked if avg_ratings['emp_id'] in employee_dict]
+        rated_ids = {avg_ratings['emp_id'] for avg_ratings in ranked_rated}
+        unrated = [empty_aggregate(emp.emp_id) for emp in employees if emp.emp_id not in rated_ids]
+        ranked_employees_data = ranked_rated + unrated
+        all_avg_ratings_list = ranked_employees_data
+    else:
+        all_avg_ratings_list = []
+        for emp in employees:
+            avg_ratings = aggregates.get(emp.emp_id) or empty_aggregate(emp.emp_id)
+            if avg_ratings['rating_count']:
+                avg_ratings['score'] = aggregate_score(avg_ratings)
+            all_avg_ratings_list.append(avg_ratings)
+
+        # Best score first as on the leaderboard, ties to the lower emp_id; unrated employees go last
+        ranked_employees_data = sorted(
+            all_avg_ratings_list,
+            key=lambda x: (not x['rating_count'], -x.get('score', 0), str(x['emp_id']))
+        )
+
+    # Create a dictionary for quick lookup of average ratings by emp_id
+    avg_ratings_by_id = {item['emp_id']: item for item in all_avg_ratings_list if 'emp_id' in item}
+
+    # Add rank to each employee's data for easy access in the lookup dictionary
+    for rank, emp_data in enumerate(ranked_employees_data):
+        emp_id = emp_data.get('emp_id')
+        if emp_id and emp_id in avg_ratings_by_id: # Ensure the employee data is in the lookup dict
+             avg_ratings_by_id[emp_id]['rank'] = rank + 1
+
+    return employees, employee_dict, employee_name_to_id, ranked_employees_data, avg_ratings_by_id
+
+
+def prepare_office_page_table(office_page) -> pd.DataFrame:
+    """
+    The Offices tab table for one OfficeEmployeePage: one row per employee
+    with their number of ratings, criteria averages and overall rating.
+    """
+    return pd.DataFrame(
+        [
+            {
+                "Name": f"{row['first_name']} {row['last_name']}",
+                "Position": row["position"],
+                "Number of Ratings": row["rating_count"],
+                "Criteria 1": row["first_criteria"],
+                "Criteria 2": row["second_criteria"],
+                "Criteria 3": row["third_criteria"],
+                "Criteria 4": row["fourth_criteria"],
+                "Overall Rating": row["overall"],
+            }
+            for row in office_page.rows
+        ],
+        columns=["Name", "Position", "Number of Ratings", "Criteria 1", "Criteria 2", "Criteria 3", "Criteria 4", "Overall Rating"],
+    )
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.data.timestamps import parse_timestamps
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Label for queues whose office is unknown (the client left no rating)
+UNASSIGNED_OFFICE = "Unassigned"
+
+# Service-time histogram bin edges in seconds: log-spaced from 1 second to a day,
+# so percentiles are within about 3% at any scale while memory stays fixed
+SERVICE_TIME_EDGES = np.concatenate([[0.0], np.geomspace(1, 86_400, 400)])
+NUM_BINS = len(SERVICE_TIME_EDGES) - 1
+
+
+def histogram_percentile(histogram: np.ndarray, q: float) -> Optional[float]:
+    """
+    Estimates the q-th percentile (0-100) in seconds from a service-time
+    histogram, interpolating linearly within the bin it falls in.
+    """
+    total = histogram.sum()
+    if not total:
+        return None
+    cumulative = np.cumsum(histogram)
+    target = total * q / 100
+    idx = min(int(np.searchsorted(cumulative, target, side="left")), NUM_BINS - 1)
+    before = cumulative[idx - 1] if idx else 0
+    fraction = (target - before) / histogram[idx] if histogram[idx] else 0.0
+    low, high = SERVICE_TIME_EDGES[idx], SERVICE_TIME_EDGES[idx + 1]
+    return float(low + (high - low) * fraction)
+
+
+class QueueStats:
+    """
+    Streaming service-time and arrival statistics for queues.
+
+    Pages of queues are folded into fixed-size arrays as they arrive: arrival
+    counts and service-time histograms per hour of day, day of week and
+    office. Memory depends only on the number of offices, not on the number
+    of queues, so a year of queues is processed one page at a time.
+    Service time is `ended_at - created_at`; open queues count as arrivals only.
+    """
+
+    def __init__(self, offices: List[str]):
+        self.offices = list(offices) + [UNASSIGNED_OFFICE]
+        num_offices = len(self.offices)
+        self.arrivals_by_hour = np.zeros(24, dtype=np.int64)
+        self.arrivals_by_weekday = np.zeros(7, dtype=np.int64)
+        self.arrivals_by_office = np.zeros(num_offices, dtype=np.int64)
+        self.service_by_hour = np.zeros((24, NUM_BINS), dtype=np.int64)
+        self.service_by_weekday = np.zeros((7, NUM_BINS), dtype=np.int64)
+        self.service_by_office = np.zeros((num_offices, NUM_BINS), dtype=np.int64)
+        self.open_queues = 0
+
+    @property
+    def total_queues(self) -> int:
+        return int(self.arrivals_by_hour.sum())
+
+    @property
+    def service_times(self) -> np.ndarray:
+        """Histogram of all service times."""
+        return self.service_by_hour.sum(axis=0)
+
+    def add(self, created_at: np.ndarray, ended_at: np.ndarray, office_codes: np.ndarray):
+        """
+        Folds one page into the totals.
+
+        Args:
+            created_at: datetime64 arrival times.
+            ended_at: datetime64 end times, NaT for queues still open.
+            office_codes: Index into `offices` per queue; -1 means unassigned.
+        """
+        arrived = ~np.isnat(created_at)
+        created_at, ended_at, office_codes = created_at[arrived], ended_at[arrived], office_codes[arrived]
+        office_codes = np.where(office_codes < 0, len(self.offices) - 1, office_codes)
+
+        hours = created_at.astype("datetime64[h]").astype(np.int64) % 24
+        # 1970-01-01 was a Thursday, shift so Monday is 0
+        weekdays = (created_at.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+        self.arrivals_by_hour += np.bincount(hours, minlength=24)
+        self.arrivals_by_weekday += np.bincount(weekdays, minlength=7)
+        self.arrivals_by_office += np.bincount(office_codes, minlength=len(self.offices))
+
+        closed = ~np.isnat(ended_at)
+        self.open_queues += int((~closed).sum())
+        seconds = (ended_at[closed] - created_at[closed]) / np.timedelta64(1, "s")
+        bins = np.clip(np.searchsorted(SERVICE_TIME_EDGES, np.maximum(seconds, 0), side="right") - 1, 0, NUM_BINS - 1)
+        self._add_histograms(self.service_by_hour, hours[closed], bins)
+        self._add_histograms(self.service_by_weekday, weekdays[closed], bins)
+        self._add_histograms(self.service_by_office, office_codes[closed], bins)
+
+    @staticmethod
+    def _add_histograms(target: np.ndarray, groups: np.ndarray, bins: np.ndarray):
+        num_groups = target.shape[0]
+        target += np.bincount(groups * NUM_BINS + bins, minlength=num_groups * NUM_BINS).reshape(num_groups, NUM_BINS)
+
+    def summary(self, percentiles=(50, 90, 99)) -> Dict[str, Any]:
+        """Overall queue counts and service-time percentiles in seconds."""
+        histogram = self.service_times
+        result = {"queues": self.total_queues, "closed": int(histogram.sum()), "open": self.open_queues}
+        for q in percentiles:
+            result[f"p{q}"] = histogram_percentile(histogram, q)
+        return result
+
+    def _table(self, label: str, keys: List[Any], arrivals: np.ndarray, histograms: np.ndarray, percentiles) -> pd.DataFrame:
+        data = {label: keys, "arrivals": arrivals, "closed": histograms.sum(axis=1)}
+        for q in percentiles:
+            values = [histogram_percentile(histogram, q) for histogram in histograms]
+            data[f"p{q}_minutes"] = [None if value is None else value / 60 for value in values]
+        return pd.DataFrame(data)
+
+    def by_hour(self, percentiles=(50, 90, 99)) -> pd.DataFrame:
+        return self._table("hour", list(range(24)), self.arrivals_by_hour, self.service_by_hour, percentiles)
+
+    def by_weekday(self, percentiles=(50, 90, 99)) -> pd.DataFrame:
+        return self._table("weekday", WEEKDAYS, self.arrivals_by_weekday, self.service_by_weekday, percentiles)
+
+    def by_office(self, percentiles=(50, 90, 99)) -> pd.DataFrame:
+        table = self._table("office", self.offices, self.arrivals_by_office, self.service_by_office, percentiles)
+        return table[table["arrivals"] > 0].sort_values("arrivals", ascending=False).reset_index(drop=True)
+
+
+class QueueOfficeLookup:
+    """
+    Maps queue ids to office codes through the ratings that name an employee.
+    Held as two sorted NumPy arrays, so lookups for a page are one searchsorted.
+    """
+
+    def __init__(self, queue_ids: np.ndarray, office_codes: np.ndarray):
+        order = np.argsort(queue_ids, kind="stable")
+        queue_ids, office_codes = queue_ids[order], office_codes[order]
+        # A queue rated more than once keeps its first rating's office
+        first = np.concatenate([[True], queue_ids[1:] != queue_ids[:-1]]) if len(queue_ids) else np.array([], dtype=bool)
+        self.queue_ids = queue_ids[first]
+        self.office_codes = office_codes[first]
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[List[Dict[str, Any]]], office_by_emp: Dict[str, int]) -> "QueueOfficeLookup":
+        """Builds the lookup from pages of rating rows with queue_id and emp_id."""
+        queue_ids, office_codes = [], []
+        for page in pages:
+            rows = [row for row in page if row.get("queue_id") is not None]
+            queue_ids.append(np.fromiter((row["queue_id"] for row in rows), dtype=np.int64, count=len(rows)))
+            office_codes.append(np.fromiter((office_by_emp.get(str(row.get("emp_id")), -1) for row in rows), dtype=np.int32, count=len(rows)))
+        if not queue_ids:
+            return cls(np.array([], dtype=np.int64), np.array([], dtype=np.int32))
+        return cls(np.concatenate(queue_ids), np.concatenate(office_codes))
+
+    def lookup(self, queue_ids: np.ndarray) -> np.ndarray:
+        """Office code per queue id, -1 where the queue has no rating."""
+        if not len(self.queue_ids):
+            return np.full(len(queue_ids), -1, dtype=np.int32)
+        positions = np.clip(np.searchsorted(self.queue_ids, queue_ids), 0, len(self.queue_ids) - 1)
+        return np.where(self.queue_ids[positions] == queue_ids, self.office_codes[positions], -1)
+
+
+def fold_queue_pages(pages: Iterable[List[Dict[str, Any]]], offices: List[str], office_lookup: QueueOfficeLookup, stats: Optional[QueueStats] = None) -> QueueStats:
+    """Streams pages of queue rows (queue_id, created_at, ended_at) into a QueueStats, or into `stats` when given."""
+    stats = stats if stats is not None else QueueStats(offices)
+    for page in pages:
+        queue_ids = np.fromiter((row["queue_id"] for row in page), dtype=np.int64, count=len(page))
+        stats.add(
+            parse_timestamps([row.get("created_at") for row in page]),
+            parse_timestamps([row.get("ended_at") for row in page]),
+            office_lookup.lookup(queue_ids),
+        )
+    return stats
@@ -0,0 +1,157 @@
+import heapq
+import random
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.config import RANKING_PRIOR_MEAN, RANKING_PRIOR_WEIGHT
+
+
+def bayesian_score(overall: float, rating_count: int, prior_mean: Optional[float] = None, prior_weight: Optional[float] = None) -> float:
+    """
+    The overall rating shrunk towards the prior mean by the weight of
+    `prior_weight` imaginary ratings: (C * m + n * overall) / (C + n).
+    Unrated employees score the prior mean.
+    """
+    prior_mean = RANKING_PRIOR_MEAN if prior_mean is None else prior_mean
+    prior_weight = RANKING_PRIOR_WEIGHT if prior_weight is None else prior_weight
+    if rating_count + prior_weight <= 0:
+        return prior_mean
+    return (prior_weight * prior_mean + rating_count * overall) / (prior_weight + rating_count)
+
+
+def aggregate_score(aggregate: Dict[str, Any]) -> float:
+    """bayesian_score of a rating aggregate (see build_aggregate) with the configured prior."""
+    return bayesian_score(aggregate.get("overall") or 0, aggregate.get("rating_count") or 0)
+
+
+def top_k(items: Iterable[Any], k: int, key: Callable[[Any], Any]) -> List[Any]:
+    """The k items with the largest keys, best first, in O(n log k) with a bounded heap instead of a full sort."""
+    return heapq.nlargest(k, items, key=key)
+
+
+class _Node:
+    __slots__ = ("key", "priority", "size", "left", "right")
+
+    def __init__(self, key: Any, priority: float):
+        self.key = key
+        self.priority = priority
+        self.size = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+
+class OrderStatisticTree:
+    """
+    A sorted multiset of comparable keys (a treap with subtree sizes) that
+    inserts, removes, finds the rank of a key and the key at a rank in
+    O(log n) expected time, so one changed entry is moved without re-sorting
+    the rest.
+
+        tree.insert((-score, emp_id))
+        tree.rank((-score, emp_id))  # keys before it: its 0-based position
+        tree.select(0)               # the smallest key
+    """
+
+    def __init__(self, keys: Iterable[Any] = (), seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._root: Optional[_Node] = None
+        for key in keys:
+            self.insert(key)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __contains__(self, key: Any) -> bool:
+        node = self._root
+        while node is not None:
+            if key == node.key:
+                return True
+            node = node.left if key < node.key else node.right
+        return False
+
+    def __iter__(self) -> Iterator[Any]:
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+    def _split(self, node: Optional[_Node], key: Any, inclusive: bool):
+        """Splits into the keys before `key` (and equal to it when inclusive) and the rest."""
+        if node is None:
+            return None, None
+        if node.key < key or (inclusive and node.key == key):
+            node.right, right = self._split(node.right, key, inclusive)
+            return _update(node), right
+        left, node.left = self._split(node.left, key, inclusive)
+        return left, _update(node)
+
+    def _merge(self, left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+        """Joins two treaps whose keys are all ordered left before right."""
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            return _update(left)
+        right.left = self._merge(left, right.left)
+        return _update(right)
+
+    def insert(self, key: Any):
+        left, right = self._split(self._root, key, inclusive=False)
+        self._root = self._merge(self._merge(left, _Node(key, self._random.random())), right)
+
+    def remove(self, key: Any) -> bool:
+        """Removes one occurrence of the key; returns whether it was present."""
+        left, rest = self._split(self._root, key, inclusive=False)
+        equal, right = self._split(rest, key, inclusive=True)
+        found = equal is not None
+        if found:
+            equal = self._merge(equal.left, equal.right)
+        self._root = self._merge(self._merge(left, equal), right)
+        return found
+
+    def rank(self, key: Any) -> int:
+        """The number of keys smaller than `key`, i.e. its 0-based position when present."""
+        rank, node = 0, self._root
+        while node is not None:
+            if node.key < key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def select(self, index: int) -> Any:
+        """The key at the 0-based position `index` in sorted order."""
+        if not 0 <= index < len(self):
+            raise IndexError("OrderStatisticTree index out of range")
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.key
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def first(self, count: int) -> List[Any]:
+        """The `count` smallest keys in order, reading only those nodes and their ancestors."""
+        keys = []
+        for key in self:
+            if len(keys) >= count:
+                break
+            keys.append(key)
+        return keys
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from models.models import RATING_CRITERIA, build_aggregate
+from utils.data.timestamps import parse_timestamps
+
+# Time bucket frequencies accepted by RatingMatrix.time_bucket_stats
+_BUCKET_UNITS = {"hour": "datetime64[h]", "day": "datetime64[D]", "month": "datetime64[M]"}
+
+
+class RatingMatrix:
+    """
+    Columnar, in-memory view of the ratings table for vectorized analytics.
+
+    Each rating is one row: the employee as an integer code into `emp_ids`,
+    the four criteria as an int8 (n, 4) array with a boolean mask of which
+    scores are present, and the creation time as datetime64[us].
+    """
+
+    def __init__(self, emp_ids: List[UUID], emp_codes: np.ndarray, scores: np.ndarray, mask: np.ndarray, created_at: np.ndarray):
+        self.emp_ids = emp_ids
+        self.emp_codes = emp_codes
+        self.scores = scores
+        self.mask = mask
+        self.created_at = created_at
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "RatingMatrix":
+        """
+        Builds the matrix from raw rating rows (dicts with emp_id, the criteria
+        columns and optionally created_at). Rows without an emp_id are skipped.
+        """
+        rows = [row for row in rows if row.get("emp_id")]
+        codes, uniques = pd.factorize(pd.Series([row["emp_id"] for row in rows], dtype=object))
+
+        raw = np.array(
+            [[row.get(criterion) for criterion in RATING_CRITERIA] for row in rows],
+            dtype=float
+        ).reshape(len(rows), len(RATING_CRITERIA))
+        mask = ~np.isnan(raw)
+        scores = np.where(mask, raw, 0).astype(np.int8)
+
+        created_at = parse_timestamps([row.get("created_at") for row in rows])
+        emp_ids = [value if isinstance(value, UUID) else UUID(str(value)) for value in uniques]
+        return cls(emp_ids, codes.astype(np.int32), scores, mask, created_at)
+
+    def __len__(self) -> int:
+        return len(self.emp_codes)
+
+    # --- Vectorized group-by primitives ---
+
+    def _group_totals(self, groups: np.ndarray, num_groups: int, valid: Optional[np.ndarray] = None):
+        """
+        Returns (sums, counts, rating_counts) per group; sums and counts are
+        (num_groups, 4). When `valid` is given, `groups` covers only those rows.
+        """
+        if valid is not None:
+            scores, mask = self.scores[valid], self.mask[valid]
+        else:
+            scores, mask = self.scores, self.mask
+        sums = np.empty((num_groups, len(RATING_CRITERIA)), dtype=np.int64)
+        counts = np.empty((num_groups, len(RATING_CRITERIA)), dtype=np.int64)
+        for idx in range(len(RATING_CRITERIA)):
+            sums[:, idx] = np.bincount(groups, weights=scores[:, idx], minlength=num_groups)
+            counts[:, idx] = np.bincount(groups, weights=mask[:, idx], minlength=num_groups)
+        rating_counts = np.bincount(groups, minlength=num_groups)
+        return sums, counts, rating_counts
+
+    def _group_histograms(self, groups: np.ndarray, num_groups: int) -> np.ndarray:
+        """Returns a (num_groups, 4, 5) array counting each 1-5 score per group and criterion."""
+        hist = np.empty((num_groups, len(RATING_CRITERIA), 5), dtype=np.int64)
+        for idx in range(len(RATING_CRITERIA)):
+            present = self.mask[:, idx] & (self.scores[:, idx] >= 1) & (self.scores[:, idx] <= 5)
+            keys = groups[present] * 5 + (self.scores[present, idx] - 1)
+            hist[:, idx, :] = np.bincount(keys, minlength=num_groups * 5).reshape(num_groups, 5)
+        return hist
+
+    @staticmethod
+    def _histogram_percentile(hist: np.ndarray, q: float) -> np.ndarray:
+        """Nearest-rank percentile (0-100) of 1-5 scores from histograms along the last axis; 0 where empty."""
+        totals = hist.sum(axis=-1)
+        rank = np.maximum(np.ceil(q / 100 * totals), 1)
+        below = (hist.cumsum(axis=-1) < rank[..., None]).sum(axis=-1)
+        return np.where(totals > 0, below + 1, 0)
+
+    @staticmethod
+    def _to_aggregates(keys: List[Any], sums: np.ndarray, counts: np.ndarray, rating_counts: np.ndarray, key_name: str = "emp_id") -> Dict[Any, Dict[str, Any]]:
+        result = {}
+        for idx, key in enumerate(keys):
+            if rating_counts[idx] == 0:
+                continue
+            aggregate = build_aggregate(
+                None,
+                dict(zip(RATING_CRITERIA, sums[idx].tolist())),
+                dict(zip(RATING_CRITERIA, counts[idx].tolist())),
+                int(rating_counts[idx])
+            )
+            del aggregate["emp_id"]
+            result[key] = {key_name: key, **aggregate}
+        return result
+
+    # --- Analytics ---
+
+    def employee_stats(self) -> Dict[UUID, Dict[str, Any]]:
+        """Sums, counts, criteria averages and overall score per rated employee."""
+        sums, counts, rating_counts = self._group_totals(self.emp_codes, len(self.emp_ids))
+        return self._to_aggregates(self.emp_ids, sums, counts, rating_counts)
+
+    def office_stats(self, office_by_emp: Dict[UUID, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Sums, counts, criteria averages and overall score per office.
+
+        Args:
+            office_by_emp: Maps emp_id to office name; ratings of unknown employees are ignored.
+        """
+        offices = sorted({office for office in office_by_emp.values() if office})
+        office_codes = {office: idx for idx, office in enumerate(offices)}
+        # Translate employee codes to office codes with one lookup array
+        emp_to_office = np.array([office_codes.get(office_by_emp.get(emp_id), -1) for emp_id in self.emp_ids], dtype=np.int32)
+        groups = emp_to_office[self.emp_codes] if len(self.emp_ids) else np.empty(0, dtype=np.int32)
+        valid = groups >= 0
+        sums, counts, rating_counts = self._group_totals(groups[valid], len(offices), valid)
+        return self._to_aggregates(offices, sums, counts, rating_counts, key_name="office")
+
+    def criterion_means(self) -> Dict[str, float]:
+        """Mean of each criterion over all ratings, ignoring missing scores."""
+        counts = self.mask.sum(axis=0)
+        sums = self.scores.sum(axis=0, dtype=np.int64)
+        return {
+            criterion: float(sums[idx] / counts[idx]) if counts[idx] else 0
+            for idx, criterion in enumerate(RATING_CRITERIA)
+        }
+
+    def criterion_distribution(self) -> Dict[str, List[int]]:
+        """Number of 1, 2, 3, 4 and 5 scores given for each criterion."""
+        hist = self._group_histograms(np.zeros(len(self), dtype=np.int32), 1)[0]
+        return {criterion: hist[idx].tolist() for idx, criterion in enumerate(RATING_CRITERIA)}
+
+    def employee_histograms(self) -> Dict[UUID, Dict[str, List[int]]]:
+        """Counts of 1-5 scores per criterion for each rated employee."""
+        hist = self._group_histograms(self.emp_codes, len(self.emp_ids))
+        return {
+            emp_id: {criterion: hist[idx, c_idx].tolist() for c_idx, criterion in enumerate(RATING_CRITERIA)}
+            for idx, emp_id in enumerate(self.emp_ids)
+        }
+
+    def employee_percentiles(self, q: float) -> Dict[UUID, Dict[str, int]]:
+        """The q-th percentile (0-100, nearest rank) of each criterion per rated employee."""
+        hist = self._group_histograms(self.emp_codes, len(self.emp_ids))
+        values = self._histogram_percentile(hist, q)
+        return {
+            emp_id: dict(zip(RATING_CRITERIA, values[idx].tolist()))
+            for idx, emp_id in enumerate(self.emp_ids)
+            if hist[idx].any()
+        }
+
+    def employee_day_totals(self) -> List[Dict[str, Any]]:
+        """
+        Rating count, per-criterion sums and counts, and 1-5 histograms for
+        every (day, employee) pair with ratings, the rows of the daily rollup.
+        """
+        valid = ~np.isnat(self.created_at)
+        days = self.created_at[valid].astype("datetime64[D]")
+        day_labels, day_codes = np.unique(days, return_inverse=True)
+        pairs = day_codes.astype(np.int64) * max(len(self.emp_ids), 1) + self.emp_codes[valid]
+        pair_labels, groups = np.unique(pairs, return_inverse=True)
+        groups = groups.astype(np.int32)
+
+        sums, counts, rating_counts = self._group_totals(groups, len(pair_labels), valid)
+        subset = RatingMatrix(self.emp_ids, self.emp_codes[valid], self.scores[valid], self.mask[valid], self.created_at[valid])
+        hist = subset._group_histograms(groups, len(pair_labels))
+
+        rows = []
+        for idx, pair in enumerate(pair_labels.tolist()):
+            day_code, emp_code = divmod(pair, max(len(self.emp_ids), 1))
+            rows.append({
+                "day": str(day_labels[day_code]),
+                "emp_id": str(self.emp_ids[emp_code]),
+                "rating_count": int(rating_counts[idx]),
+                "sums": dict(zip(RATING_CRITERIA, sums[idx].tolist())),
+                "counts": dict(zip(RATING_CRITERIA, counts[idx].tolist())),
+                "histograms": {criterion: hist[idx, c_idx].tolist() for c_idx, criterion in enumerate(RATING_CRITERIA)},
+            })
+        return rows
+
+    def time_bucket_stats(self, freq: str = "day") -> pd.DataFrame:
+        """
+        Rating counts and criteria means per time bucket.
+
+        Args:
+            freq: One of "hour", "day", "week" (starting Monday) or "month".
+
+        Returns:
+            A DataFrame indexed by bucket start with a rating_count column, one
+            column per criterion mean and an overall column.
+        """
+        valid = ~np.isnat(self.created_at)
+        if freq == "week":
+            days = self.created_at[valid].astype("datetime64[D]")
+            # 1970-01-01 was a Thursday, shift so buckets start on Monday
+            buckets = days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+        elif freq in _BUCKET_UNITS:
+            buckets = self.created_at[valid].astype(_BUCKET_UNITS[freq])
+        else:
+            raise ValueError(f"Unsupported time bucket frequency: {freq}")
+
+        labels, groups = np.unique(buckets, return_inverse=True)
+        sums, counts, rating_counts = self._group_totals(groups.astype(np.int32), len(labels), valid)
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+        frame = pd.DataFrame(means, columns=list(RATING_CRITERIA), index=pd.DatetimeIndex(labels.astype("datetime64[us]"), name="bucket"))
+        frame.insert(0, "rating_count", rating_counts)
+        frame["overall"] = frame[list(RATING_CRITERIA)].mean(axis=1)
+        return frame
@@ -0,0 +1,51 @@
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+
+import numpy as np
+
+from models.models import RATING_CRITERIA, build_aggregate
+from utils.data.timestamps import parse_timestamps
+
+
+def count_by_day(pages: Iterable[List[Dict[str, Any]]], column: str) -> Counter:
+    """Counts rows per local calendar day of their `column` timestamp, page by page."""
+    totals = Counter()
+    for page in pages:
+        days = parse_timestamps([row.get(column) for row in page]).astype("datetime64[D]")
+        labels, counts = np.unique(days[~np.isnat(days)], return_counts=True)
+        totals.update(dict(zip((str(label) for label in labels), counts.tolist())))
+    return totals
+
+
+def day_strings(start: date, end: date) -> List[str]:
+    """ISO dates from start to end inclusive."""
+    return [str(day) for day in np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)]
+
+
+def combine_employee_days(rows: Iterable[Dict[str, Any]]) -> Dict[UUID, Dict[str, Any]]:
+    """
+    Sums daily employee rating rollup rows into one aggregate per employee
+    (see build_aggregate), with the 1-5 histograms under "histograms".
+    """
+    totals: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        total = totals.setdefault(row["emp_id"], {
+            "rating_count": 0,
+            "sums": dict.fromkeys(RATING_CRITERIA, 0),
+            "counts": dict.fromkeys(RATING_CRITERIA, 0),
+            "histograms": {criterion: [0] * 5 for criterion in RATING_CRITERIA},
+        })
+        total["rating_count"] += row["rating_count"]
+        for criterion in RATING_CRITERIA:
+            total["sums"][criterion] += row["sums"].get(criterion, 0)
+            total["counts"][criterion] += row["counts"].get(criterion, 0)
+            for idx, value in enumerate(row["histograms"].get(criterion, [0] * 5)):
+                total["histograms"][criterion][idx] += value
+
+    aggregates = {}
+    for emp_id, total in totals.items():
+        emp_uuid = UUID(str(emp_id))
+        aggregates[emp_uuid] = {**build_aggregate(emp_uuid, total["sums"], total["counts"], total["rating_count"]), "histograms": total["histograms"]}
+    return aggregates
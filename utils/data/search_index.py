@@ -0,0 +1,276 @@
+import bisect
+import json
+import math
+import os
+import threading
+import uuid
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+import numpy as np
+
+from utils.data.text import tokenize
+from utils.data.timestamps import parse_timestamps, to_local
+
+# BM25 term-frequency saturation and document-length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weight of a term matched only by prefix ("mabil" -> "mabilis") relative to an exact match
+PREFIX_WEIGHT = 0.6
+# Most frequent completions a prefix expands to, which bounds the cost of short prefixes
+MAX_PREFIX_EXPANSIONS = 50
+# created_at of documents without a timestamp
+_NO_TIME = np.iinfo(np.int64).min
+
+
+def _local_us(value: datetime) -> int:
+    """Microseconds since the epoch in local wall-clock time, the frame documents are timed in."""
+    return int(np.datetime64(to_local(value).replace(tzinfo=None), "us").astype(np.int64))
+
+
+class CommentIndex:
+    """
+    In-process inverted index over rating comments with BM25 ranking.
+
+    Every comment is one document with its rating id, employee and creation
+    time. Each term maps to a posting list of (document, term frequency) kept
+    in compact arrays, and the vocabulary is a sorted list so a prefix is a
+    bisect range. A search touches only the posting lists of its terms, never
+    the documents themselves, and filters candidates with vectorized lookups.
+
+    Documents are appended with `add`; the index is safe to search from many
+    threads while one thread adds. `save`/`load` persist it as one .npz file.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.terms: List[str] = []  # sorted vocabulary
+        self.postings: Dict[str, array] = {}  # term -> document ids
+        self.frequencies: Dict[str, array] = {}  # term -> term frequency per posting
+        self.rating_ids = bytearray()  # 16 bytes per document
+        self.emp_ids: List[str] = []
+        self._emp_codes: Dict[str, int] = {}
+        self.doc_emp = array("i")
+        self.doc_time = array("q")  # microseconds since the epoch, local time
+        self.doc_length = array("i")
+        self.total_length = 0
+        # Rating ids (and times) of documents at or after the watermark, which a sync may see again
+        self._recent: Dict[str, int] = {}
+        # Every comment created up to this time (microseconds, local) is indexed
+        self.watermark: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_emp)
+
+    # --- Indexing ---
+
+    def add(self, rating_id: Any, emp_id: Any, created_at: Any, comments: str) -> bool:
+        """Indexes one comment; returns False if it was empty or is already indexed."""
+        return self.add_rows([{"rating_id": rating_id, "emp_id": emp_id, "created_at": created_at, "comments": comments}]) == 1
+
+    def add_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Indexes rating rows (rating_id, emp_id, created_at, comments); returns how many were added."""
+        rows = [row for row in rows if row.get("comments")]
+        # A missing created_at (NaT) becomes the smallest int64, which is _NO_TIME
+        timestamps = parse_timestamps([row.get("created_at") for row in rows]).astype(np.int64)
+        added = 0
+        for row, time_us in zip(rows, timestamps.tolist()):
+            added += self._add(str(row["rating_id"]), row.get("emp_id"), time_us, tokenize(row["comments"]))
+        return added
+
+    def _add(self, key: str, emp_id: Any, time_us: int, tokens: List[str]) -> bool:
+        if not tokens:
+            return False
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        with self._lock:
+            # Older than the watermark means a previous sync already indexed it
+            if key in self._recent or (self.watermark is not None and time_us < self.watermark):
+                return False
+            doc = len(self.doc_emp)
+            self.rating_ids += uuid.UUID(key).bytes
+            emp_key = str(emp_id) if emp_id else ""
+            if emp_key not in self._emp_codes:
+                self._emp_codes[emp_key] = len(self.emp_ids)
+                self.emp_ids.append(emp_key)
+            self.doc_emp.append(self._emp_codes[emp_key])
+            self.doc_time.append(time_us)
+            self.doc_length.append(len(tokens))
+            self.total_length += len(tokens)
+            for term, count in counts.items():
+                if term not in self.postings:
+                    bisect.insort(self.terms, term)
+                    self.postings[term] = array("i")
+                    self.frequencies[term] = array("i")
+                self.postings[term].append(doc)
+                self.frequencies[term].append(count)
+            self._recent[key] = time_us
+        return True
+
+    def advance_watermark(self, watermark: datetime):
+        """Records that every comment created up to `watermark` is indexed (naive values are local time)."""
+        watermark_us = _local_us(watermark)
+        with self._lock:
+            if self.watermark is not None and watermark_us <= self.watermark:
+                return
+            self.watermark = watermark_us
+            # A sync from the watermark can only see documents at or after it again
+            self._recent = {key: time_us for key, time_us in self._recent.items() if time_us >= watermark_us}
+
+    @property
+    def watermark_datetime(self) -> Optional[datetime]:
+        """The watermark as an aware local time, for range reads from the database."""
+        return None if self.watermark is None else to_local(np.datetime64(self.watermark, "us").astype(datetime))
+
+    # --- Search ---
+
+    def _expand(self, token: str) -> List[tuple]:
+        """The (term, weight) pairs a query token matches: itself and its completions."""
+        start = bisect.bisect_left(self.terms, token)
+        end = bisect.bisect_left(self.terms, token + "\uffff")
+        completions = self.terms[start:end]
+        if len(completions) > MAX_PREFIX_EXPANSIONS:
+            completions = sorted(completions, key=lambda term: -len(self.postings[term]))[:MAX_PREFIX_EXPANSIONS]
+        return [(term, 1.0 if term == token else PREFIX_WEIGHT) for term in completions]
+
+    def search(
+        self,
+        query: str,
+        emp_ids: Optional[Iterable[Any]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Ranks the comments matching every word of the query (each word also
+        matches as a prefix) by BM25.
+
+        Args:
+            query: Free text; stopwords are ignored.
+            emp_ids: Only comments about these employees.
+            start: Only comments created at or after this time.
+            end: Only comments created at or before this time.
+            page: 1-based page number.
+            page_size: Results per page.
+
+        Returns:
+            {"total": matching comments, "page", "page_size", "results": [{"rating_id", "emp_id", "score"}]}.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        empty = {"total": 0, "page": page, "page_size": page_size, "results": []}
+        if not tokens:
+            return empty
+
+        with self._lock:
+            num_docs = len(self.doc_emp)
+            if not num_docs:
+                return empty
+            avg_length = self.total_length / num_docs
+            lengths = np.frombuffer(self.doc_length, dtype=np.int32)[:num_docs]
+
+            docs, scores = None, None
+            for token in tokens:
+                ids, contributions = [], []
+                for term, weight in self._expand(token):
+                    postings = np.frombuffer(self.postings[term], dtype=np.int32)
+                    tf = np.frombuffer(self.frequencies[term], dtype=np.int32).astype(np.float64)
+                    idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[postings] / avg_length)
+                    ids.append(postings)
+                    contributions.append(weight * idf * tf * (BM25_K1 + 1) / (tf + norm))
+                if not ids:
+                    return empty
+                if len(ids) == 1:
+                    # Posting lists are in document order already
+                    token_docs, token_scores = ids[0], contributions[0]
+                else:
+                    # A document matching several completions of one token keeps its best one
+                    token_docs, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+                    token_scores = np.zeros(len(token_docs))
+                    np.maximum.at(token_scores, inverse, np.concatenate(contributions))
+                if docs is None:
+                    docs, scores = token_docs, token_scores
+                else:
+                    docs, left, right = np.intersect1d(docs, token_docs, assume_unique=True, return_indices=True)
+                    scores = scores[left] + token_scores[right]
+                if not len(docs):
+                    return empty
+
+            keep = np.ones(len(docs), dtype=bool)
+            if emp_ids is not None:
+                codes = [self._emp_codes[str(emp_id)] for emp_id in emp_ids if str(emp_id) in self._emp_codes]
+                keep &= np.isin(np.frombuffer(self.doc_emp, dtype=np.int32)[docs], codes)
+            times = np.frombuffer(self.doc_time, dtype=np.int64)[docs]
+            if start is not None:
+                keep &= times >= _local_us(start)
+            if end is not None:
+                keep &= (times <= _local_us(end)) & (times != _NO_TIME)
+            docs, scores, times = docs[keep], scores[keep], times[keep]
+
+            # Best score first, newest first among equal scores. Only the matches
+            # that can reach this page are sorted, not every match.
+            offset = (max(page, 1) - 1) * page_size
+            candidates = np.arange(len(docs))
+            if offset + page_size < len(docs):
+                threshold = np.partition(scores, len(docs) - offset - page_size)[len(docs) - offset - page_size]
+                candidates = np.flatnonzero(scores >= threshold)
+            order = candidates[np.lexsort((-times[candidates], -scores[candidates]))]
+            results = []
+            for idx in order[offset:offset + page_size]:
+                doc = int(docs[idx])
+                results.append({
+                    "rating_id": UUID(bytes=bytes(self.rating_ids[doc * 16:(doc + 1) * 16])),
+                    "emp_id": UUID(self.emp_ids[self.doc_emp[doc]]) if self.emp_ids[self.doc_emp[doc]] else None,
+                    "score": float(scores[idx]),
+                })
+        return {"total": int(len(docs)), "page": page, "page_size": page_size, "results": results}
+
+    # --- Persistence ---
+
+    def save(self, path: str):
+        """Writes the index to `path` (.npz) atomically."""
+        with self._lock:
+            terms = list(self.terms)
+            offsets = np.cumsum([0] + [len(self.postings[term]) for term in terms])
+            arrays = {
+                "terms": np.array(terms, dtype=str),
+                "offsets": offsets,
+                "postings": np.concatenate([np.array(self.postings[t], dtype=np.int32) for t in terms]) if terms else np.empty(0, np.int32),
+                "frequencies": np.concatenate([np.array(self.frequencies[t], dtype=np.int32) for t in terms]) if terms else np.empty(0, np.int32),
+                "rating_ids": np.frombuffer(bytes(self.rating_ids), dtype=np.uint8),
+                "emp_ids": np.array(self.emp_ids, dtype=str),
+                "doc_emp": np.frombuffer(self.doc_emp, dtype=np.int32).copy(),
+                "doc_time": np.frombuffer(self.doc_time, dtype=np.int64).copy(),
+                "doc_length": np.frombuffer(self.doc_length, dtype=np.int32).copy(),
+                "meta": np.array(json.dumps({"watermark": self.watermark, "recent": self._recent})),
+            }
+            temp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CommentIndex":
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            offsets, postings, frequencies = data["offsets"], data["postings"], data["frequencies"]
+            index.terms = terms
+            for idx, term in enumerate(terms):
+                index.postings[term] = array("i", postings[offsets[idx]:offsets[idx + 1]].tobytes())
+                index.frequencies[term] = array("i", frequencies[offsets[idx]:offsets[idx + 1]].tobytes())
+            index.rating_ids = bytearray(data["rating_ids"].tobytes())
+            index.emp_ids = data["emp_ids"].tolist()
+            index._emp_codes = {emp_id: code for code, emp_id in enumerate(index.emp_ids)}
+            index.doc_emp = array("i", data["doc_emp"].tobytes())
+            index.doc_time = array("q", data["doc_time"].tobytes())
+            index.doc_length = array("i", data["doc_length"].tobytes())
+            index.total_length = int(data["doc_length"].sum())
+            meta = json.loads(str(data["meta"]))
+        index.watermark = meta["watermark"]
+        index._recent = meta["recent"]
+        return index
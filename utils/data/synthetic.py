@@ -0,0 +1,177 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from models.models import RATING_CRITERIA
+
+# City hall offices; earlier entries get more walk-ins (see OFFICE_WEIGHTS)
+OFFICES = [
+    "Business Permits and Licensing Office", "City Treasurer's Office", "City Civil Registrar",
+    "City Assessor's Office", "City Health Office", "City Social Welfare and Development Office",
+    "Office of the City Mayor", "City Engineering Office", "City Agriculture Office",
+    "Human Resource Management Office", "City Planning and Development Office", "City Disaster Risk Reduction and Management Office",
+]
+# Zipf-like office popularity: the permit and treasury counters see most of the traffic
+OFFICE_WEIGHTS = 1 / np.arange(1, len(OFFICES) + 1) ** 1.1
+
+POSITIONS = ["Clerk", "Administrative Aide", "Administrative Assistant", "Cashier", "Records Officer", "Frontline Officer", "Supervisor"]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Kristine", "Paolo", "Angelica", "Ramon", "Liza", "Carlo", "Jenny", "Noel", "Grace", "Rommel", "Joy"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Aquino", "Villanueva", "Ramos", "Castillo", "Navarro", "Soriano", "Pascual", "Manalo"]
+
+# Relative walk-ins per hour of day (office hours 8:00-17:00, peaks mid-morning and after lunch)
+HOUR_WEIGHTS = np.zeros(24)
+HOUR_WEIGHTS[8:17] = [6, 10, 9, 7, 3, 8, 7, 5, 2]
+# Monday is busiest, weekends only see the few offices open on Saturday
+WEEKDAY_WEIGHTS = np.array([1.3, 1.1, 1.0, 1.0, 1.1, 0.2, 0.02])
+
+COMMENT_WORDS = (
+    "mabilis maayos salamat po the staff was very helpful accommodating friendly mabait magalang "
+    "matagal pila long queue slow process clear instructions malinis comfortable efficient service "
+    "sana mas mabilis next time thank you approachable professional requirements explained well "
+    "medyo magulo confusing kulang upuan waited too long excellent good job keep it up"
+).split()
+# Zipf word frequencies so a few words dominate, like real feedback
+WORD_WEIGHTS = 1 / np.arange(1, len(COMMENT_WORDS) + 1) ** 0.9
+
+# Fixed end of the generated history so a seed always yields the same rows
+DEFAULT_END = datetime(2025, 6, 30)
+
+
+def _uuids(rng: np.random.Generator, count: int) -> List[str]:
+    raw = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+    return [str(uuid.UUID(bytes=row.tobytes(), version=4)) for row in raw]
+
+
+def _weights(values: np.ndarray) -> np.ndarray:
+    return values / values.sum()
+
+
+def generate_dataset(backend, rows: int = 10_000, seed: int = 42, days: int = 180, end: datetime = None, chunk_size: int = 20_000) -> Dict[str, int]:
+    """
+    Fills a backend with a deterministic, realistically skewed dataset.
+
+    Every registration creates one client, one queue and (for most clients)
+    one rating. Offices and employees follow a Zipf-like popularity, arrivals
+    cluster on weekday office-hour peaks, service times are log-normal with a
+    few queues left open, scores lean positive per employee, and comments
+    have a long tail of lengths over an English/Filipino vocabulary.
+
+    Args:
+        backend: The StorageBackend to insert into (usually an SQLiteBackend).
+        rows: Number of registrations (clients and queues); scales 1k to 1M.
+        seed: Random seed, the same seed always produces the same data.
+        days: Length of the history ending at `end`.
+        end: End of the history, defaults to DEFAULT_END.
+        chunk_size: Rows inserted per request, which bounds memory use.
+
+    Returns:
+        The number of rows written per table.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or DEFAULT_END
+    start = end - timedelta(days=days)
+
+    # --- Reference data ---
+    offices = [{"office_id": office_id, "name": name} for office_id, name in zip(_uuids(rng, len(OFFICES)), OFFICES)]
+
+    num_employees = int(np.clip(rows // 500, 20, 2000))
+    emp_ids = _uuids(rng, num_employees)
+    emp_office = rng.choice(len(OFFICES), size=num_employees, p=_weights(OFFICE_WEIGHTS))
+    employees = [
+        {
+            "emp_id": emp_id,
+            "first_name": FIRST_NAMES[rng.integers(len(FIRST_NAMES))],
+            "last_name": LAST_NAMES[rng.integers(len(LAST_NAMES))],
+            "office": OFFICES[emp_office[idx]],
+            "position": POSITIONS[rng.integers(len(POSITIONS))],
+            "created_at": start.isoformat(),
+        }
+        for idx, emp_id in enumerate(emp_ids)
+    ]
+    backend.table("offices").insert(offices, returning="minimal").execute()
+    backend.table("employees").insert(employees, returning="minimal").execute()
+
+    # Each employee's share of walk-ins: office popularity times a Zipf rank within the office
+    emp_weight = OFFICE_WEIGHTS[emp_office] * rng.zipf(2.0, size=num_employees).clip(max=20)
+    emp_weight = _weights(emp_weight)
+    # Per-employee service quality shifts their score distribution
+    emp_quality = rng.normal(0.6, 0.5, size=num_employees)
+
+    # Calendar of every possible arrival hour, weighted by weekday and hour of day
+    hours = np.arange(days * 24)
+    hour_starts = np.datetime64(start, "h") + hours.astype("timedelta64[h]")
+    weekday = (hour_starts.astype("datetime64[D]").astype(np.int64) + 3) % 7
+    hour_weight = _weights(WEEKDAY_WEIGHTS[weekday] * HOUR_WEIGHTS[hours % 24])
+
+    # Arrival times for the whole history, sorted so queue ids grow with time like the real sequence
+    arrival_hour = rng.choice(len(hours), size=rows, p=hour_weight)
+    arrivals = np.sort(hour_starts[arrival_hour].astype("datetime64[us]") + rng.integers(0, 3600 * 10**6, size=rows).astype("timedelta64[us]"))
+
+    counts = {"offices": len(offices), "employees": num_employees, "clients": 0, "queues": 0, "ratings": 0}
+    for chunk_start in range(0, rows, chunk_size):
+        size = min(chunk_size, rows - chunk_start)
+
+        client_ids = _uuids(rng, size)
+        created = arrivals[chunk_start:chunk_start + size]
+
+        service_seconds = rng.lognormal(mean=np.log(600), sigma=0.7, size=size).astype(np.int64)
+        ended = created + (service_seconds * 10**6).astype("timedelta64[us]")
+        still_open = rng.random(size) < 0.01
+        created_iso = np.datetime_as_string(created, unit="us")
+        ended_iso = np.datetime_as_string(ended, unit="us")
+
+        queue_ids = np.arange(chunk_start + 1, chunk_start + size + 1)
+        backend.table("clients").insert([
+            {
+                "client_id": client_ids[i],
+                "first_name": FIRST_NAMES[rng.integers(len(FIRST_NAMES))],
+                "last_name": LAST_NAMES[rng.integers(len(LAST_NAMES))],
+                "created_at": created_iso[i],
+            }
+            for i in range(size)
+        ], returning="minimal").execute()
+        backend.table("queues").insert([
+            {
+                "queue_id": int(queue_ids[i]),
+                "client_id": client_ids[i],
+                "created_at": created_iso[i],
+                "ended_at": None if still_open[i] else ended_iso[i],
+            }
+            for i in range(size)
+        ], returning="minimal").execute()
+
+        # About 85% of clients leave a rating, a few skip individual criteria
+        rated = np.flatnonzero(rng.random(size) < 0.85)
+        rated_emp = rng.choice(num_employees, size=len(rated), p=emp_weight)
+        raw_scores = 4 + emp_quality[rated_emp, None] * 0.5 + rng.normal(0, 0.9, size=(len(rated), 4))
+        scores = np.clip(np.rint(raw_scores), 1, 5).astype(int)
+        skipped = rng.random((len(rated), 4)) < 0.03
+        rating_ids = _uuids(rng, len(rated))
+
+        # Long-tail comments: most are empty, lengths follow a Pareto tail
+        has_comment = rng.random(len(rated)) < 0.4
+        comment_length = np.clip(rng.pareto(1.5, size=len(rated)) * 4 + 1, 1, 120).astype(int)
+
+        ratings = []
+        for j, i in enumerate(rated):
+            comment = None
+            if has_comment[j]:
+                comment = " ".join(rng.choice(COMMENT_WORDS, size=comment_length[j], p=_weights(WORD_WEIGHTS)))
+            row = {
+                "rating_id": rating_ids[j],
+                "queue_id": int(queue_ids[i]),
+                "emp_id": emp_ids[rated_emp[j]],
+                "comments": comment,
+                "created_at": ended_iso[i] if not still_open[i] else created_iso[i],
+            }
+            for c_idx, criterion in enumerate(RATING_CRITERIA):
+                row[criterion] = None if skipped[j, c_idx] else int(scores[j, c_idx])
+            ratings.append(row)
+        backend.table("ratings").insert(ratings, returning="minimal").execute()
+
+        counts["clients"] += size
+        counts["queues"] += size
+        counts["ratings"] += len(ratings)
+    return counts
@@ -0,0 +1,48 @@
+import re
+from collections import Counter
+from typing import Iterable, List
+
+# Common English and Filipino (Tagalog) function words, plus Taglish fillers
+# seen in kiosk feedback, which would otherwise dominate every word cloud
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+FILIPINO_STOPWORDS = frozenset("""
+ako ang ano anong at ay ba bakit dahil daw din dito doon e eh ha hindi iba ibang ikaw ito iyan iyon ka kami kanila
+kanilang kanya kay kayo kaya ko kung lang lamang mag may mga mo na naman natin nang ng ni nila nito niya noon o oo
+pa pag para pero po rin sa saan sang siya sila sino tayo tulad yan yun yung namin kasi sana po opo ho nga talaga
+""".split())
+
+STOPWORDS = ENGLISH_STOPWORDS | FILIPINO_STOPWORDS
+
+# Letters (including ñ and accented vowels) with inner apostrophes or hyphens, e.g. "mag-aral"
+_TOKEN = re.compile(r"[a-zñáéíóú]+(?:['-][a-zñáéíóú]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a comment into lowercase words without stopwords, numbers or
+    single letters.
+
+    Args:
+        text: A free-text comment in English, Filipino or a mix of both.
+
+    Returns:
+        The remaining words in order of appearance.
+    """
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def term_counts(comments: Iterable[str]) -> Counter:
+    """Word frequencies over many comments."""
+    counts = Counter()
+    for comment in comments:
+        counts.update(tokenize(comment))
+    return counts
@@ -0,0 +1,50 @@
+import warnings
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from core.config import TIMEZONE
+
+
+def local_now() -> datetime:
+    """The current time, aware and in the local timezone, so day and month bounds built from it are local."""
+    return datetime.now(ZoneInfo(TIMEZONE))
+
+
+def to_local(value: datetime) -> datetime:
+    """
+    Returns an aware datetime in the local timezone. Naive values are taken as
+    local wall-clock time, like parse_timestamps does.
+
+    Bounds sent to the database must be aware: Postgres reads a naive
+    timestamp as UTC, which shifts local windows by the UTC offset.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo(TIMEZONE))
+    return value.astimezone(ZoneInfo(TIMEZONE))
+
+
+def parse_timestamps(values) -> np.ndarray:
+    """
+    Parses timestamps from the database into a datetime64[us] array of local
+    wall-clock time, so hours and days line up with the counters' schedule.
+
+    Args:
+        values: A sequence of ISO-8601 strings, datetimes or None.
+
+    Returns:
+        A NumPy datetime64[us] array with NaT where a value is missing.
+    """
+    series = pd.Series(values, dtype=object)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        parsed = pd.to_datetime(series, format="ISO8601", errors="coerce")
+    if parsed.dtype == object:
+        # Mixed UTC offsets, normalise everything to UTC first
+        parsed = pd.to_datetime(series, format="ISO8601", errors="coerce", utc=True)
+    # Naive values were written with datetime.now() on a local server and are kept as-is
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert(TIMEZONE).dt.tz_localize(None)
+    return parsed.to_numpy(dtype="datetime64[us]")
@@ -1,10 +1,14 @@
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
+import io
+from typing import TYPE_CHECKING
 
+# Plotly, matplotlib and wordcloud are imported by the functions that draw with
+# them: together they take longer to import than most pages take to render
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+    import plotly.graph_objects as go
 
-def create_bar_chart(avg_ratings: dict) -> go.Figure:
+
+def create_bar_chart(avg_ratings: dict) -> "go.Figure":
     """
     Creates a minimalist horizontal bar chart from average ratings,
     excluding the 'overall' rating.
@@ -16,6 +20,8 @@ def create_bar_chart(avg_ratings: dict) -> go.Figure:
     Returns:
         A Plotly Figure object for the horizontal bar chart.
     """
+    import plotly.express as px
+
     # Filter out the 'overall' rating if it exists
     filtered_ratings = {k: v for k, v in avg_ratings.items() if k.lower() != 'overall'}
 
@@ -56,7 +62,7 @@ def create_bar_chart(avg_ratings: dict) -> go.Figure:
     return fig
 
 
-def create_word_cloud(comments: list) -> plt.Figure:
+def create_word_cloud(comments: list) -> "plt.Figure":
     """
     Creates a word cloud from a list of comments using shades of green.
 
@@ -66,6 +72,9 @@ def create_word_cloud(comments: list) -> plt.Figure:
     Returns:
         A Matplotlib Figure object for the word cloud.
     """
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
     text = ' '.join(comments)
     # Create wordcloud with a green colormap
     wordcloud = WordCloud(
@@ -79,3 +88,29 @@ def create_word_cloud(comments: list) -> plt.Figure:
     ax.axis('off') # Hide axes
     return fig
 
+
+
+def render_word_cloud_png(frequencies: dict, width: int = 800, height: int = 400) -> bytes:
+    """
+    Renders a word cloud from precomputed word frequencies straight to PNG
+    bytes, using shades of green.
+
+    Args:
+        frequencies: A dictionary mapping words to their counts.
+        width: Image width in pixels.
+        height: Image height in pixels.
+
+    Returns:
+        The PNG image as bytes, ready for st.image or a cache.
+    """
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=width,
+        height=height,
+        background_color='white',
+        colormap='Greens'
+    ).generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
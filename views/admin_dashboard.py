@@ -1,8 +1,10 @@
 import streamlit as st
 import os
 import pandas as pd
-import random
 import plotly.express as px
+from datetime import date, datetime, timedelta
+from utils.data.ranking import aggregate_score, top_k
+from utils.data.timestamps import local_now, to_local
 
 # Assuming AdminService is a valid class and doesn't need mocking for this example
 # from services.admin_service import AdminService
@@ -31,15 +33,48 @@ with logout_col:
     pass # Commented out for mock data example
 
 
+# Days of ratings behind the rating panels
+RATING_WINDOW_DAYS = 30
+
+
+# --- Services (Cached) ---
+@st.cache_resource
+def get_dashboard_services():
+    from services.employee_service import AsyncEmployeeService
+    from services.rollup_service import AsyncRollupService
+    return AsyncEmployeeService(), AsyncRollupService()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_dashboard_data(today):
+    """A handful of small, independent reads, made concurrently: the employee count and names, and the daily rollups."""
+    from core import aio
+    from utils.data.office_metrics import office_metrics
+    employee_service, rollup_service = get_dashboard_services()
+    rating_start = today - timedelta(days=RATING_WINDOW_DAYS - 1)
+    employees, activity, aggregates = aio.run(aio.gather(
+        employee_service.get_all_employees(),
+        rollup_service.get_daily_activity(),
+        rollup_service.get_employee_aggregates(rating_start, today),
+    ))
+    names = {emp.emp_id: f"{emp.first_name} {emp.last_name}" for emp in employees}
+    offices = office_metrics(employees, aggregates)
+    return len(employees), names, activity, aggregates, offices
+
+
+today = date.today()
+num_employees, employee_names, daily_activity, employee_aggregates, office_stats = fetch_dashboard_data(today)
+week_start = today - timedelta(days=today.weekday())
+
 with st.container(key="employee_container"):
 
     emp_metric_col, client_metric_col, rating_metric_col, processed_queues_metric_col = st.columns(4)
 
-    # Mock Data for Metrics
-    num_employees = 150
-    num_clients = 500
-    processed_queues_this_week = 1200
-    avg_rating = 4.5
+    num_clients = int(daily_activity["clients"].sum())
+    this_week = daily_activity.loc[pd.Timestamp(week_start):pd.Timestamp(today)]
+    processed_queues_this_week = int(this_week["closed_queues"].sum())
+    rated_overall = [aggregate["overall"] for aggregate in employee_aggregates.values() if aggregate["rating_count"]]
+    avg_rating = round(sum(rated_overall) / len(rated_overall), 2) if rated_overall else "N/A"
 
     # Number of Employees
     emp_metric_col.metric(label="No. of Employees", value=num_employees, border=True)
@@ -47,31 +82,38 @@ with st.container(key="employee_container"):
     client_metric_col.metric(label="No. of Clients", value=num_clients, border=True)
     # Number of Processed Queues this week (mon to sunday)
     processed_queues_metric_col.metric(label="Processed Queues this week", value=processed_queues_this_week, border=True)
-    # Average Rating for all Employees
-    rating_metric_col.metric(label="Emp Avg Rating", value=avg_rating, border=True)
+    # Average Rating for all Employees over the rating window
+    rating_metric_col.metric(label=f"Emp Avg Rating ({RATING_WINDOW_DAYS} days)", value=avg_rating, border=True)
 
 
     weekly_queue_count_col, emp_rating_distribution_col, top_rated_employees_col = st.columns(3)
 
-    # Mock Data for Charts
     # Weekly Queue Count
     week_days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    queue_counts = [random.randint(100, 300) for _ in range(7)]
-    weekly_queue_df = pd.DataFrame({'Day': week_days, 'Queue Count': queue_counts})
-
-    # Employee Rating Distribution
-    ratings = [random.randint(1, 5) for _ in range(num_employees)]
-    rating_distribution = pd.DataFrame({'Rating': ratings})
-    rating_distribution = rating_distribution['Rating'].value_counts().reset_index()
-    rating_distribution.columns = ['Rating', 'Count']
-    rating_distribution = rating_distribution.sort_values('Rating')
-
-
-    # Top Rated Employees
-    employee_names = [f'Employee {i}' for i in range(1, num_employees + 1)]
-    employee_ratings = [round(random.uniform(4.0, 5.0), 2) for _ in range(num_employees)]
-    employee_df = pd.DataFrame({'Employee Name': employee_names, 'Rating': employee_ratings})
-    top_employees = employee_df.sort_values('Rating', ascending=False).head(10)
+    week_activity = daily_activity.reindex(pd.date_range(week_start, periods=7, freq="D"), fill_value=0)
+    weekly_queue_df = pd.DataFrame({'Day': week_days, 'Queue Count': week_activity["queues"].to_numpy()})
+
+    # Employee Rating Distribution: employees by their rounded overall rating
+    rating_distribution = pd.Series([round(overall) for overall in rated_overall], dtype=int).value_counts()
+    rating_distribution = rating_distribution.reindex(range(1, 6), fill_value=0).rename_axis('Rating').reset_index(name='Count')
+
+    # Top Rated Employees, ranked like the Employees page: by Bayesian score, so a few ratings cannot outrank many
+    top_aggregates = top_k(
+        ((emp_id, aggregate) for emp_id, aggregate in employee_aggregates.items() if aggregate["rating_count"]),
+        10, key=lambda item: aggregate_score(item[1])
+    )
+    top_employees = pd.DataFrame(
+        [
+            {
+                'Employee Name': employee_names.get(emp_id, str(emp_id)),
+                'Score': round(aggregate_score(aggregate), 2),
+                'Average Rating': round(aggregate["overall"], 2),
+                'Ratings': aggregate["rating_count"],
+            }
+            for emp_id, aggregate in top_aggregates
+        ],
+        columns=['Employee Name', 'Score', 'Average Rating', 'Ratings']
+    )
 
 
     # Weekly Queue Count (plotly bar chart)
@@ -88,6 +130,112 @@ with st.container(key="employee_container"):
 
     # Top Rated Employees (plotly horizontal bar chart)
     with top_rated_employees_col:
-        st.subheader("Top 10 Employees by Rating")
-        fig_top_employees = px.bar(top_employees.sort_values('Rating'), x='Rating', y='Employee Name', orientation='h', title='Top 10 Employees by Rating')
-        st.plotly_chart(fig_top_employees, use_container_width=True)
\ No newline at end of file
+        st.subheader("Top 10 Employees by Score")
+        fig_top_employees = px.bar(
+            top_employees.iloc[::-1], x='Score', y='Employee Name', orientation='h', title='Top 10 Employees by Score',
+            hover_data=['Average Rating', 'Ratings']
+        )
+        st.plotly_chart(fig_top_employees, use_container_width=True)
+
+
+# --- Office Ranking ---
+with st.container(key="office_ranking_container"):
+    st.subheader(f"Office Ranking ({RATING_WINDOW_DAYS} days)")
+    office_df = pd.DataFrame(
+        [
+            {
+                'Rank': stats["rank"],
+                'Office': office,
+                'Employees': stats["num_employees"],
+                'Rated Employees': stats["rated_employees"],
+                'Ratings': stats["rating_count"],
+                'Average Rating': round(stats["overall"], 2) if stats["rating_count"] else None,
+                'Score': round(stats["score"], 2) if stats["score"] is not None else None,
+            }
+            for office, stats in office_stats.items()
+        ],
+        columns=['Rank', 'Office', 'Employees', 'Rated Employees', 'Ratings', 'Average Rating', 'Score']
+    )
+    if office_df.empty:
+        st.info("No offices to rank yet.")
+    else:
+        office_chart_col, office_table_col = st.columns(2)
+        with office_chart_col:
+            rated_office_df = office_df.dropna(subset=['Score'])
+            st.plotly_chart(px.bar(rated_office_df.iloc[::-1], x='Score', y='Office', orientation='h', title='Offices by Score'), use_container_width=True)
+        with office_table_col:
+            st.dataframe(office_df, hide_index=True, use_container_width=True)
+
+
+# --- Queue Service Times ---
+@st.cache_resource
+def get_queue_service():
+    from services.queue_service import QueueService
+    return QueueService()
+
+
+@st.cache_data(ttl=600, show_spinner="Computing queue statistics...")
+def fetch_queue_stats(start_date, end_date):
+    """Streams the queues in the range once and returns the summary and per-group tables."""
+    # Local days, sent as aware bounds so the database does not read them as UTC
+    start = to_local(datetime.combine(start_date, datetime.min.time()))
+    end = to_local(datetime.combine(end_date, datetime.max.time()))
+    stats = get_queue_service().get_queue_stats(start, end)
+    return stats.summary(), stats.by_hour(), stats.by_weekday(), stats.by_office()
+
+
+with st.container(key="queue_stats_container"):
+    st.subheader("Queue Service Times")
+    today = local_now().date()
+    date_range = st.date_input("Queues created between", value=(today - timedelta(days=30), today), key="queue_stats_range")
+
+    if isinstance(date_range, tuple) and len(date_range) == 2:
+        summary, by_hour, by_weekday, by_office = fetch_queue_stats(*date_range)
+
+        def minutes(seconds):
+            return f"{seconds / 60:.1f} min" if seconds is not None else "N/A"
+
+        queues_col, p50_col, p90_col, p99_col = st.columns(4)
+        queues_col.metric(label="Queues", value=summary["queues"], border=True)
+        p50_col.metric(label="Median Service Time", value=minutes(summary["p50"]), border=True)
+        p90_col.metric(label="P90 Service Time", value=minutes(summary["p90"]), border=True)
+        p99_col.metric(label="P99 Service Time", value=minutes(summary["p99"]), border=True)
+
+        if summary["queues"]:
+            percentile_columns = ["p50_minutes", "p90_minutes", "p99_minutes"]
+            hour_col, weekday_col = st.columns(2)
+            with hour_col:
+                office_hours = by_hour[by_hour["arrivals"] > 0]
+                st.plotly_chart(px.bar(office_hours, x="hour", y="arrivals", title="Arrivals by Hour of Day"), use_container_width=True)
+                st.plotly_chart(px.line(office_hours, x="hour", y=percentile_columns, markers=True, title="Service Time by Hour (minutes)"), use_container_width=True)
+            with weekday_col:
+                st.plotly_chart(px.bar(by_weekday, x="weekday", y="arrivals", title="Arrivals by Day of Week"), use_container_width=True)
+                st.plotly_chart(px.line(by_weekday, x="weekday", y=percentile_columns, markers=True, title="Service Time by Day (minutes)"), use_container_width=True)
+
+            st.markdown("**Service Time by Office**")
+            st.dataframe(
+                by_office.rename(columns={"office": "Office", "arrivals": "Arrivals", "closed": "Served", "p50_minutes": "P50 (min)", "p90_minutes": "P90 (min)", "p99_minutes": "P99 (min)"}),
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info("No queues in this date range.")
+
+
+# --- Backend Requests ---
+with st.expander("Backend Requests (this server process)"):
+    from core.db import get_backend
+    from core.metrics import get_metrics
+
+    breaker = getattr(get_backend(), "breaker", None)
+    if breaker is not None:
+        st.caption(f"Circuit breaker: {breaker.state.replace('_', '-')}")
+    request_rows = get_metrics().snapshot()
+    if request_rows:
+        st.dataframe(
+            pd.DataFrame(request_rows).drop(columns=["histogram"]),
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.info("No backend requests recorded yet.")
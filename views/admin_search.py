@@ -0,0 +1,80 @@
+import streamlit as st
+
+if not st.session_state.get("admin"):
+    st.warning("You do not have permission to view this page.")
+    st.switch_page("views/user_content.py")
+
+from datetime import date, datetime, time, timedelta
+
+from services.comment_search_service import CommentSearchService
+from services.employee_service import EmployeeService
+from services.rating_service import RatingService
+
+from components.footer import display_footer
+
+RESULTS_PER_PAGE = 20
+
+
+# --- Shared Index (one per server process) ---
+@st.cache_resource
+def get_comment_search_service() -> CommentSearchService:
+    """Loads or builds the comment index once, then keeps it current from the rating hook."""
+    service = CommentSearchService()
+    service.sync()
+    RatingService.add_listener(service)
+    return service
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_employee_choices():
+    employees = EmployeeService().get_all_employees()
+    names = {emp.emp_id: f"{emp.first_name} {emp.last_name}" for emp in employees}
+    offices = sorted({emp.office for emp in employees if emp.office})
+    return names, offices
+
+
+search_service = get_comment_search_service()
+employee_names, offices = fetch_employee_choices()
+
+with st.container(key="feedback_search_container"):
+    st.subheader("Feedback Search")
+
+    query = st.text_input("Search comments", placeholder="e.g. mabilis serbisyo", key="feedback_search_query")
+    office_col, employee_col, range_col = st.columns(3)
+    office = office_col.selectbox("Office", ["All offices"] + offices, key="feedback_search_office")
+    selected_employees = employee_col.multiselect(
+        "Employees", list(employee_names), format_func=lambda emp_id: employee_names[emp_id], key="feedback_search_employees"
+    )
+    today = date.today()
+    date_range = range_col.date_input("Submitted between", value=(today - timedelta(days=365), today), key="feedback_search_range")
+
+    if query:
+        start, end = (date_range[0], date_range[-1]) if isinstance(date_range, tuple) and date_range else (None, None)
+        # A new search starts again from its first page
+        search_key = (query, office, tuple(selected_employees), start, end)
+        if st.session_state.get("feedback_search_key") != search_key:
+            st.session_state["feedback_search_key"] = search_key
+            st.session_state["feedback_search_page"] = 1
+        page = st.session_state["feedback_search_page"]
+        found = search_service.search(
+            query,
+            emp_ids=selected_employees or None,
+            office=None if office == "All offices" else office,
+            start=datetime.combine(start, time.min) if start else None,
+            end=datetime.combine(end, time.max) if end else None,
+            page=page,
+            page_size=RESULTS_PER_PAGE,
+        )
+        num_pages = max(1, -(-found["total"] // RESULTS_PER_PAGE))
+        st.caption(f"{found['total']} matching comments")
+
+        for result in found["results"]:
+            with st.container(border=True):
+                st.markdown(result["comments"])
+                created_at = str(result["created_at"] or "")[:16].replace("T", " ")
+                st.caption(f"{employee_names.get(result['emp_id'], 'Unknown employee')} · {created_at}")
+
+        if num_pages > 1:
+            st.number_input("Page", min_value=1, max_value=num_pages, step=1, key="feedback_search_page")
+
+    display_footer()
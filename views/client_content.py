@@ -91,14 +91,10 @@ with feed_col.container(key="form_container_1"):
             # Handle registration logic here
             client_id = uuid.uuid4()
             client = Client(client_id=client_id, first_name=first_name, last_name=last_name)
-            created_client, queue_id = client_service.create_client(client)
-            if created_client:
-                queue = queue_service.create_queue(created_client.client_id)
-                if queue:
-                    st.session_state.registered_queue_id = queue.queue_id
-                    rating_form(queue_obj = queue)  # Open the dialog
-                else:
-                    st.error("Failed to create a queue number.")
+            created_client, queue = client_service.register_client_with_queue(client)
+            if created_client and queue:
+                st.session_state.registered_queue_id = queue.queue_id
+                rating_form(queue_obj = queue)  # Open the dialog
             else:
                 st.error("Failed to register client.")
 
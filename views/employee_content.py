@@ -1,12 +1,18 @@
 import streamlit as st
-import pandas as pd
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 
 # Assuming these services and visualization module exist and work correctly
 # Ensure the paths are correct based on your project structure
-from services.employee_service import EmployeeService
-from services.rating_service import RatingService
+from services.employee_service import AsyncEmployeeService, EmployeeService
+from services.rating_service import AsyncRatingService, RatingService
+from services.comment_terms_service import CommentTermsService
+from services.leaderboard_service import LeaderboardService
+from models.models import RATING_CRITERIA, OfficeEmployeePage
+from core.config import WORD_CLOUD_CACHE_DIR, WORD_CLOUD_CACHE_SIZE, WORD_CLOUD_MAX_WORDS
+from utils.data.image_cache import ImageCache
+from utils.data.office_metrics import office_metrics
+from utils.data.prepare import prepare_employee_data_async, prepare_office_page_table
 import utils.data.visualize as viz # Assumes viz module contains create_bar_chart and create_word_cloud
 
 from components.footer import display_footer
@@ -19,67 +25,83 @@ def get_employee_service() -> EmployeeService:
     return EmployeeService()
 
 @st.cache_resource
-def get_rating_service() -> RatingService:
-    """Caches the RatingService instance."""
-    return RatingService()
+def get_async_services() -> Tuple[AsyncEmployeeService, AsyncRatingService]:
+    """Caches the async services behind the concurrent page data reads."""
+    return AsyncEmployeeService(), AsyncRatingService()
+
+@st.cache_resource
+def get_comment_terms_service() -> CommentTermsService:
+    """Caches the CommentTermsService instance."""
+    return CommentTermsService()
+
+@st.cache_resource
+def get_word_cloud_cache() -> ImageCache:
+    """One LRU cache of rendered word clouds shared by every session."""
+    return ImageCache(WORD_CLOUD_CACHE_SIZE, WORD_CLOUD_CACHE_DIR or None)
+
+@st.cache_resource
+def get_leaderboard_service() -> LeaderboardService:
+    """One leaderboard per process, told about ratings written here as they happen."""
+    leaderboard = LeaderboardService()
+    RatingService.add_listener(leaderboard)
+    return leaderboard
 
 employee_service = get_employee_service()
-rating_service = get_rating_service()
+comment_terms_service = get_comment_terms_service()
+leaderboard_service = get_leaderboard_service()
 
 
 # --- Data Fetching and Preparation (Cached) ---
-# Cache data that doesn't change during the session
-@st.cache_data
-def fetch_and_prepare_employee_data() -> Tuple[List[Any], Dict[UUID, Any], Dict[str, UUID], List[Dict[str, Any]], Dict[UUID, Dict[str, Any]]]:
+# Keyed on data versions, so a new rating replaces only the entries built from the
+# leaderboard. Counts come from the rating summaries; rating rows are not downloaded.
+@st.cache_data(ttl=300, max_entries=4)
+def fetch_and_prepare_employee_data(leaderboard_version: int) -> Tuple[List[Any], Dict[UUID, Any], Dict[str, UUID], List[Dict[str, Any]], Dict[UUID, Dict[str, Any]]]:
     """
-    Fetches all employees, calculates all employees' average ratings,
-    and prepares data structures for efficient lookup and ranking.
+    Fetches all employees and prepares data structures for efficient lookup
+    and ranking from the incrementally maintained leaderboard. The employees
+    and the ranking are read concurrently.
     """
-    employees = employee_service.get_all_employees()
-    employee_dict = {emp.emp_id: emp for emp in employees}
-    employee_name_to_id = {f"{emp.first_name} {emp.last_name}, {emp.position}": emp.emp_id for emp in employees}
-
-    # Calculate average rating for each employee using the existing method
-    all_avg_ratings_list = []
-    for emp in employees:
-        avg_ratings = rating_service.calculate_employee_average_rating(emp.emp_id)
-        # Ensure avg_ratings is a dictionary and include emp_id
-        if isinstance(avg_ratings, dict):
-            avg_ratings['emp_id'] = emp.emp_id
-            all_avg_ratings_list.append(avg_ratings)
-        # Optional: Add logging or warning if unexpected data is returned
-        # elif avg_ratings is not None:
-        #      st.warning(f"Unexpected return type from calculate_employee_average_rating for employee {emp.emp_id}: {type(avg_ratings)}")
-
-
-    # Sort employees by overall average rating in descending order to determine rank
-    # Handle cases where 'overall' might be missing or None
-    ranked_employees_data = sorted(
-        all_avg_ratings_list,
-        key=lambda x: x.get('overall', 0) if x.get('overall') is not None else -1, # Use 0 or -1 for sorting None values
-        reverse=True
-    )
-
-    # Create a dictionary for quick lookup of average ratings by emp_id
-    avg_ratings_by_id = {item['emp_id']: item for item in all_avg_ratings_list if 'emp_id' in item}
-
-    # Add rank to each employee's data for easy access in the lookup dictionary
-    for rank, emp_data in enumerate(ranked_employees_data):
-        emp_id = emp_data.get('emp_id')
-        if emp_id and emp_id in avg_ratings_by_id: # Ensure the employee data is in the lookup dict
-             avg_ratings_by_id[emp_id]['rank'] = rank + 1
-
-    return employees, employee_dict, employee_name_to_id, ranked_employees_data, avg_ratings_by_id
-
-@st.cache_data
-def fetch_employee_ratings(employee_id: UUID) -> pd.DataFrame:
-     """Fetches detailed ratings for a specific employee and caches it."""
-     return pd.DataFrame(rating_service.get_employee_ratings(employee_id))
-
-@st.cache_data
-def fetch_employee_comments(employee_id: UUID) -> List[str]:
-     """Fetches comments for a specific employee and caches them."""
-     return rating_service.get_employee_comments(employee_id)
+    from core import aio
+    async_employee_service, async_rating_service = get_async_services()
+    return aio.run(prepare_employee_data_async(async_employee_service, async_rating_service, leaderboard_service))
+
+@st.cache_data(ttl=300, max_entries=4)
+def fetch_office_metrics(leaderboard_version: int) -> Dict[str, Dict[str, Any]]:
+     """Counts, weighted averages and rank of every office, grouped from the cached employee data without another request."""
+     employees, _, _, _, avg_ratings_by_id = fetch_and_prepare_employee_data(leaderboard_version)
+     return office_metrics(employees, avg_ratings_by_id)
+
+# Employees per page of the Offices tab
+OFFICE_PAGE_SIZE = 25
+# Offices tab sort choices -> EmployeeRepository.get_office_drilldown sort keys
+OFFICE_SORT_OPTIONS = {
+    "Overall Rating": "overall",
+    "Number of Ratings": "rating_count",
+    "Criteria 1": "first_criteria",
+    "Criteria 2": "second_criteria",
+    "Criteria 3": "third_criteria",
+    "Criteria 4": "fourth_criteria",
+    "Name": "name",
+}
+
+@st.cache_data(ttl=300, max_entries=64)
+def fetch_office_page(office: str, sort: str, descending: bool, page: int, leaderboard_version: int) -> OfficeEmployeePage:
+     """One sorted page of an office's employees with their rating aggregates, in one request; cached per ratings version."""
+     return employee_service.get_office_drilldown(office, sort, descending, page, OFFICE_PAGE_SIZE)
+
+def fetch_word_cloud(employee_id: UUID) -> Optional[bytes]:
+     """
+     Returns the employee's word cloud as PNG bytes, or None without comments.
+     Only the small term-frequency row is read; the image is rendered once per
+     terms version and served from the cache afterwards.
+     """
+     terms = comment_terms_service.get_terms(employee_id)
+     if not terms.terms:
+          return None
+     return get_word_cloud_cache().get_or_create(
+          f"{employee_id}:{terms.version}",
+          lambda: viz.render_word_cloud_png(terms.top_terms(WORD_CLOUD_MAX_WORDS))
+     )
 
 
 # --- Main App Layout ---
@@ -87,8 +109,8 @@ _, feed_col, _ = st.columns([1, 19, 1])
 
 with feed_col.container(key="employee_container"):
 
-    # Fetch and prepare all necessary employee data once per session
-    employees, employee_dict, employee_name_to_id, ranked_employees_data, avg_ratings_by_id = fetch_and_prepare_employee_data()
+    # Recomputed only when a rating summary changed since the cached version
+    employees, employee_dict, employee_name_to_id, ranked_employees_data, avg_ratings_by_id = fetch_and_prepare_employee_data(leaderboard_service.current_version())
 
     # --- Display Top Performers ---
     top_3_employees_data = ranked_employees_data[:3]
@@ -127,19 +149,18 @@ with feed_col.container(key="employee_container"):
             # Use the employee_name_to_id dictionary for efficient lookup
             selected_employee_id = employee_name_to_id[selected_employee_name]
 
-            # Fetch detailed data for the selected employee (cached per employee ID)
-            employee_ratings_df = fetch_employee_ratings(selected_employee_id)
-            # Get pre-calculated average ratings and rank from the cached dictionary
+            # Get pre-calculated average ratings and the rating count from the cached dictionary
             selected_avg_ratings = avg_ratings_by_id.get(selected_employee_id, {})
-            selected_employee_rank = selected_avg_ratings.get('rank', 'N/A')
+            num_ratings = selected_avg_ratings.get('rating_count', 0)
+            # An O(log n) lookup in the leaderboard; employees without ratings keep their place after the rated ones
+            selected_employee_rank = leaderboard_service.rank(selected_employee_id) or selected_avg_ratings.get('rank', 'N/A')
 
-            if employee_ratings_df.empty:
+            if not num_ratings:
                 st.info("No ratings available for this employee.")
             else:
                 # --- Display Metrics ---
                 col1, col2, col3 = st.columns(3)
 
-                num_ratings = len(employee_ratings_df)
                 # Use pre-fetched overall average rating
                 avg_rating = selected_avg_ratings.get('overall', 'N/A')
 
@@ -157,10 +178,10 @@ with feed_col.container(key="employee_container"):
                 col1, col2 = st.columns([2, 1])
 
                 with col1:
-                    # Prepare data for the bar chart, excluding 'overall' and 'rank'
+                    # Prepare data for the bar chart, keeping only the criteria averages
                     criteria_avg_ratings = {
-                        k: v for k, v in selected_avg_ratings.items()
-                        if k.lower() != 'overall' and k != 'rank' and isinstance(v, (int, float)) # Ensure value is numeric
+                        k: selected_avg_ratings[k] for k in RATING_CRITERIA
+                        if isinstance(selected_avg_ratings.get(k), (int, float)) # Ensure value is numeric
                     }
                     if criteria_avg_ratings:
                         # Pass the prepared dictionary to the visualization function
@@ -170,51 +191,47 @@ with feed_col.container(key="employee_container"):
                         st.info("No criteria ratings available for visualization.")
 
                 with col2:
-                    # Fetch comments (cached per employee ID)
-                    comments = fetch_employee_comments(selected_employee_id)
-                    if comments:
-                        word_cloud_fig = viz.create_word_cloud(comments)
-                        st.pyplot(word_cloud_fig)
+                    # Word cloud from the employee's comment term frequencies
+                    word_cloud_png = fetch_word_cloud(selected_employee_id)
+                    if word_cloud_png:
+                        st.image(word_cloud_png, use_container_width=True)
                     else:
                         st.info("No comments available to generate a word cloud.")
 
 
     with by_office_tab:
 
-        # Select an office
-        selected_office = st.selectbox("Select Office", options=list(set(emp.office for emp in employees)), index=None, placeholder="Choose an office...")
+        # Select an office, listed best ranked first
+        office_stats = fetch_office_metrics(leaderboard_service.current_version())
+        selected_office = st.selectbox("Select Office", options=list(office_stats), index=None, placeholder="Choose an office...")
 
         if selected_office:
-            # Filter employees by the selected office
-            employees_in_office = [emp for emp in employees if emp.office == selected_office]
-
-            # Prepare data for the DataFrame
-            data = []
-            for emp in employees_in_office:
-                emp_id = emp.emp_id
-                if emp_id in avg_ratings_by_id:
-                    ratings = avg_ratings_by_id[emp_id]
-                    num_ratings = len(fetch_employee_ratings(emp_id))
-                    
-                    # Ensure ratings are floats or set to None
-                    criteria_1 = ratings.get('first_criteria')
-                    criteria_2 = ratings.get('second_criteria')
-                    criteria_3 = ratings.get('third_criteria')
-                    criteria_4 = ratings.get('fourth_criteria')
-                    
-                    data.append({
-                        "Name": f"{emp.first_name} {emp.last_name}",
-                        "Position": emp.position,
-                        "Number of Ratings": num_ratings,
-                        "Criteria 1": float(criteria_1) if criteria_1 is not None and isinstance(criteria_1, (int, float)) else 0.0,
-                        "Criteria 2": float(criteria_2) if criteria_2 is not None and isinstance(criteria_2, (int, float)) else 0.0,
-                        "Criteria 3": float(criteria_3) if criteria_3 is not None and isinstance(criteria_3, (int, float)) else 0.0,
-                        "Criteria 4": float(criteria_4) if criteria_4 is not None and isinstance(criteria_4, (int, float)) else 0.0,
-                        "Overall Rating": ratings.get('overall', 'N/A')
-                    })
-
-            # Create a DataFrame
-            df = pd.DataFrame(data)
+            selected_office_stats = office_stats[selected_office]
+            rated_offices = sum(1 for stats in office_stats.values() if stats["rank"] is not None)
+            employees_col, ratings_col, office_avg_col, office_rank_col = st.columns(4)
+            employees_col.metric(label="Employees", value=selected_office_stats["num_employees"], border=True)
+            ratings_col.metric(label="Ratings", value=selected_office_stats["rating_count"], border=True)
+            office_avg_col.metric(label="Average Rating", value=f"{selected_office_stats['overall']:.2f}" if selected_office_stats["rating_count"] else "N/A", border=True)
+            office_rank_col.metric(label="Office Rank", value=f"{selected_office_stats['rank']} of {rated_offices}" if selected_office_stats["rank"] else "N/A", border=True)
+
+            sort_col, order_col, page_col = st.columns([2, 1, 1])
+            sort_label = sort_col.selectbox("Sort by", options=list(OFFICE_SORT_OPTIONS), key="office_sort")
+            order = order_col.selectbox("Order", options=["Descending", "Ascending"], key="office_order")
+            # Another office or order starts again from its first page
+            page_key = (selected_office, sort_label, order)
+            if st.session_state.get("office_page_key") != page_key:
+                st.session_state["office_page_key"] = page_key
+                st.session_state["office_page"] = 1
+
+            # Only the rows of this page, with counts and averages computed in the database
+            office_page = fetch_office_page(selected_office, OFFICE_SORT_OPTIONS[sort_label], order == "Descending", int(st.session_state["office_page"]), leaderboard_service.current_version())
+            if office_page.page > office_page.page_count:
+                # Past the end, e.g. after employees left the office: back to the first page
+                st.session_state["office_page"] = 1
+                office_page = fetch_office_page(selected_office, OFFICE_SORT_OPTIONS[sort_label], order == "Descending", 1, leaderboard_service.current_version())
+            page_col.number_input("Page", min_value=1, max_value=office_page.page_count, step=1, key="office_page")
+            st.caption(f"Page {office_page.page} of {office_page.page_count} ({office_page.total} employees)")
+            df = prepare_office_page_table(office_page)
 
             # Display the DataFrame using Streamlit's data editor
             st.data_editor(df, use_container_width=True,
@@ -0,0 +1,58 @@
+import streamlit as st
+
+from core.config import QUEUE_BOARD_REFRESH, QUEUE_EVENTS, QUEUE_RESYNC_INTERVAL
+from services.active_queue_index import ActiveQueueIndex
+from services.queue_service import QueueService
+
+from components.footer import display_footer
+
+# Queue numbers shown on the board, oldest first
+BOARD_SIZE = 24
+
+
+# --- Shared Index (one per server process) ---
+@st.cache_resource
+def get_active_queue_index() -> ActiveQueueIndex:
+    """
+    Subscribes to hooks and change events first, then seeds the index with one
+    read; changes heard in between are held by the index and replayed on the
+    read. Without change events the index is re-read periodically instead.
+    """
+    index = ActiveQueueIndex()
+    QueueService.add_listener(index)
+    if QUEUE_EVENTS == "realtime":
+        from core.events import SupabaseRealtimeSource
+        SupabaseRealtimeSource(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"], "queues").start(
+            index.apply_event, on_resync=lambda: index.resync(QueueService().get_active_queues)
+        )
+    index.seed(QueueService().get_active_queues())
+    if QUEUE_EVENTS != "realtime" and QUEUE_RESYNC_INTERVAL > 0:
+        from core.jobs import PeriodicJob
+        PeriodicJob("resync-queue-board", lambda: index.resync(QueueService().get_active_queues), QUEUE_RESYNC_INTERVAL).start()
+    return index
+
+
+index = get_active_queue_index()
+
+_, board_col, _ = st.columns([1, 5, 1])
+with board_col.container(key="queue_board_container"):
+    st.subheader("Now Serving")
+
+    # Redraws only read the in-memory index, so any number of lobby screens cost no database reads
+    @st.fragment(run_every=QUEUE_BOARD_REFRESH)
+    def queue_board():
+        queues = index.snapshot()
+        st.metric("Clients waiting", len(queues))
+        if not queues:
+            st.info("No clients in line.")
+            return
+        columns = st.columns(6)
+        for position, queue in enumerate(queues[:BOARD_SIZE]):
+            with columns[position % 6].container(border=True):
+                st.markdown(f"### {queue.queue_id}")
+        if len(queues) > BOARD_SIZE:
+            st.caption(f"and {len(queues) - BOARD_SIZE} more in line")
+
+    queue_board()
+
+    display_footer()